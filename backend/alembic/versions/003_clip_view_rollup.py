@@ -0,0 +1,43 @@
+"""Add daily clip view rollup table
+
+Revision ID: 003
+Revises: 002
+Create Date: 2024-01-03 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Daily per-user, per-clip view counts (kept up to date by interaction ingestion)
+    op.create_table(
+        'clip_view_daily',
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('clip_id', sa.String(), nullable=False),
+        sa.Column('view_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('user_id', 'day', 'clip_id'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['clip_id'], ['clips.id'], ondelete='CASCADE')
+    )
+    
+    # Backfill from existing raw interactions
+    op.execute(
+        """
+        INSERT INTO clip_view_daily (user_id, day, clip_id, view_count)
+        SELECT user_id, CAST(created_at AS DATE), clip_id, COUNT(*)
+        FROM clip_interactions
+        WHERE action = 'viewed'
+        GROUP BY user_id, CAST(created_at AS DATE), clip_id
+        """
+    )
+
+
+def downgrade():
+    op.drop_table('clip_view_daily')
@@ -0,0 +1,209 @@
+import logging
+from typing import Any, Dict, List, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000  # Whisper input rate
+
+
+def frame_energy_db(
+    audio: np.ndarray,
+    sample_rate: int = SAMPLE_RATE,
+    frame_ms: float = 30.0
+) -> np.ndarray:
+    """
+    RMS energy of consecutive non-overlapping frames, in dBFS
+
+    audio is float32 PCM in [-1, 1]; a trailing partial frame is dropped.
+    """
+    frame_len = max(int(sample_rate * frame_ms / 1000), 1)
+    n_frames = len(audio) // frame_len
+    if n_frames == 0:
+        return np.empty(0, dtype=np.float32)
+
+    frames = audio[:n_frames * frame_len].reshape(n_frames, frame_len).astype(np.float32)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    return (20.0 * np.log10(np.maximum(rms, 1e-10))).astype(np.float32)
+
+
+def _runs(mask: np.ndarray) -> List[Tuple[int, int]]:
+    """(start, end) index pairs of every run of True in mask"""
+    padded = np.concatenate([[False], mask, [False]])
+    edges = np.flatnonzero(np.diff(padded.astype(np.int8)))
+    return list(zip(edges[0::2].tolist(), edges[1::2].tolist()))
+
+
+def find_silences(
+    audio: np.ndarray,
+    sample_rate: int = SAMPLE_RATE,
+    silence_db: float = -40.0,
+    min_silence_seconds: float = 0.5,
+    frame_ms: float = 30.0
+) -> List[Tuple[int, int]]:
+    """
+    Locate runs of silence at least min_silence_seconds long
+
+    Returns:
+        (start_sample, end_sample) of every silent run, in order
+    """
+    energy = frame_energy_db(audio, sample_rate, frame_ms)
+    frame_len = max(int(sample_rate * frame_ms / 1000), 1)
+    min_frames = max(int(min_silence_seconds * 1000 / frame_ms), 1)
+
+    return [
+        (start * frame_len, end * frame_len)
+        for start, end in _runs(energy < silence_db)
+        if end - start >= min_frames
+    ]
+
+
+def plan_chunks(
+    audio: np.ndarray,
+    sample_rate: int = SAMPLE_RATE,
+    target_seconds: float = 120.0,
+    max_seconds: float = 180.0,
+    silence_db: float = -40.0,
+    min_silence_seconds: float = 0.5
+) -> List[Tuple[int, int]]:
+    """
+    Split audio into chunks of roughly target_seconds, cutting inside silences
+
+    Each cut is placed in the middle of the silence closest to the target
+    length so no word is split. When there is no silence before
+    max_seconds the chunk is cut hard at max_seconds.
+
+    Returns:
+        (start_sample, end_sample) of every chunk, covering the whole audio
+    """
+    total = len(audio)
+    target = int(target_seconds * sample_rate)
+    limit = int(max_seconds * sample_rate)
+    cut_points = np.array(
+        [(start + end) // 2 for start, end in find_silences(
+            audio, sample_rate, silence_db, min_silence_seconds
+        )],
+        dtype=np.int64
+    )
+
+    chunks = []
+    start = 0
+    while total - start > limit:
+        candidates = cut_points[(cut_points > start) & (cut_points <= start + limit)]
+        if len(candidates):
+            end = int(candidates[np.argmin(np.abs(candidates - (start + target)))])
+        else:
+            end = start + limit
+        chunks.append((start, end))
+        start = end
+    if start < total:
+        chunks.append((start, total))
+
+    logger.info(
+        f"Planned {len(chunks)} audio chunks over {total / sample_rate:.1f}s "
+        f"({len(cut_points)} silence gaps)"
+    )
+    return chunks
+
+
+def detect_speech_regions(
+    audio: np.ndarray,
+    sample_rate: int = SAMPLE_RATE,
+    threshold_db: float = -45.0,
+    min_speech_seconds: float = 0.25,
+    padding_seconds: float = 0.3,
+    merge_gap_seconds: float = 0.5,
+    frame_ms: float = 30.0
+) -> List[Tuple[int, int]]:
+    """
+    Energy-based voice activity detection
+
+    Frames louder than threshold_db are active. Active runs shorter than
+    min_speech_seconds (clicks, bumps) are discarded, the rest are padded
+    by padding_seconds on both sides so word onsets and tails survive, and
+    regions closer than merge_gap_seconds are merged.
+
+    Returns:
+        (start_sample, end_sample) of every speech region, in order
+    """
+    energy = frame_energy_db(audio, sample_rate, frame_ms)
+    frame_len = max(int(sample_rate * frame_ms / 1000), 1)
+    min_frames = max(int(min_speech_seconds * 1000 / frame_ms), 1)
+    padding = int(padding_seconds * sample_rate)
+    merge_gap = int(merge_gap_seconds * sample_rate)
+
+    regions: List[Tuple[int, int]] = []
+    for start, end in _runs(energy > threshold_db):
+        if end - start < min_frames:
+            continue
+        start = max(start * frame_len - padding, 0)
+        end = min(end * frame_len + padding, len(audio))
+        if regions and start - regions[-1][1] <= merge_gap:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((start, end))
+    return regions
+
+
+def compact_speech(
+    audio: np.ndarray,
+    regions: List[Tuple[int, int]],
+    sample_rate: int = SAMPLE_RATE,
+    gap_seconds: float = 0.6
+) -> Tuple[np.ndarray, List[Tuple[float, float, float]]]:
+    """
+    Concatenate speech regions, separated by short silent gaps
+
+    The gaps keep unrelated regions from being decoded as one sentence and
+    leave silences for plan_chunks to cut in.
+
+    Returns:
+        (compact_audio, mapping) where mapping holds one
+        (compact_start, original_start, duration) tuple in seconds per region
+    """
+    gap = np.zeros(int(gap_seconds * sample_rate), dtype=np.float32)
+    pieces = []
+    mapping = []
+    position = 0
+    for i, (start, end) in enumerate(regions):
+        if i:
+            pieces.append(gap)
+            position += len(gap)
+        pieces.append(audio[start:end].astype(np.float32))
+        mapping.append((position / sample_rate, start / sample_rate, (end - start) / sample_rate))
+        position += end - start
+
+    compact = np.concatenate(pieces) if pieces else np.empty(0, dtype=np.float32)
+    return compact, mapping
+
+
+def remap_time(t: float, mapping: List[Tuple[float, float, float]]) -> float:
+    """Map a timestamp in compacted audio back to the original audio"""
+    if not mapping:
+        return t
+    starts = [compact_start for compact_start, _, _ in mapping]
+    index = max(int(np.searchsorted(starts, t, side="right")) - 1, 0)
+    compact_start, original_start, duration = mapping[index]
+    # Times inside an inserted gap snap to the end of the preceding region
+    return original_start + min(max(t - compact_start, 0.0), duration)
+
+
+def remap_segments(
+    segments: List[Dict[str, Any]],
+    mapping: List[Tuple[float, float, float]]
+) -> List[Dict[str, Any]]:
+    """Copy transcript segments (and their words) with timestamps in original time"""
+    remapped = []
+    for segment in segments:
+        segment = dict(
+            segment,
+            start=remap_time(segment["start"], mapping),
+            end=remap_time(segment["end"], mapping)
+        )
+        if segment.get("words"):
+            segment["words"] = [
+                dict(word, start=remap_time(word["start"], mapping), end=remap_time(word["end"], mapping))
+                for word in segment["words"]
+            ]
+        remapped.append(segment)
+    return remapped
@@ -2,63 +2,183 @@ import logging
 import torch
 from PIL import Image
 from transformers import CLIPProcessor, CLIPModel
-from typing import List, Union
+from typing import Dict, List, Optional, Union
 import numpy as np
 
+from app.ai.inference_backends import (
+    ClipImageFeatures,
+    ClipTextFeatures,
+    OnnxGraph,
+    onnx_model_path,
+    quantize_dynamic_int8,
+    validate_backend,
+)
+from app.core.config import settings
+
 logger = logging.getLogger(__name__)
 
 
 class CLIPEmbedder:
-    def __init__(self, model_name: str = "openai/clip-vit-base-patch32"):
+    def __init__(self, model_name: str = "openai/clip-vit-base-patch32", backend: Optional[str] = None):
+        """
+        Initialize CLIP model
+        
+        backend (default CLIP_BACKEND) selects how forward passes run:
+        - torch: fp32 PyTorch eager
+        - torch-int8: dynamically quantized Linear layers (CPU only)
+        - onnx: exported vision/text graphs under ONNX Runtime (CPU only),
+          cached in ONNX_MODEL_DIR
+        Every encode_* method behaves the same on each backend. If the
+        requested backend cannot be set up, the model falls back to torch.
+        """
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         logger.info(f"Loading CLIP model on {self.device}")
         
+        self.model_name = model_name
         self.model = CLIPModel.from_pretrained(model_name).to(self.device)
         self.processor = CLIPProcessor.from_pretrained(model_name)
         self.model.eval()
+        self.embedding_dim = self.model.config.projection_dim
+        
+        self.backend = "torch"
+        self._vision_graph = None
+        self._text_graph = None
+        self._init_backend(validate_backend(backend or settings.CLIP_BACKEND))
+        
+        # Pixel normalisation for frames that arrive already resized (encode_frames)
+        image_processor = getattr(self.processor, "image_processor", self.processor)
+        self.image_size = self.model.config.vision_config.image_size
+        self._pixel_mean = np.asarray(image_processor.image_mean, dtype=np.float32).reshape(1, 3, 1, 1)
+        self._pixel_std = np.asarray(image_processor.image_std, dtype=np.float32).reshape(1, 3, 1, 1)
+    
+    def _init_backend(self, backend: str) -> None:
+        if backend == "torch":
+            return
+        if self.device != "cpu":
+            logger.warning(f"CLIP backend {backend} is CPU-only, keeping torch on {self.device}")
+            return
+        
+        try:
+            if backend == "torch-int8":
+                self.model = quantize_dynamic_int8(self.model)
+            elif backend == "onnx":
+                size = self.model.config.vision_config.image_size
+                tokens = self.processor(text=["warm up"], return_tensors="pt", padding=True)
+                self._vision_graph = OnnxGraph(
+                    ClipImageFeatures(self.model),
+                    {"pixel_values": torch.zeros(1, 3, size, size)},
+                    onnx_model_path(self.model_name, "vision"),
+                    dynamic_axes={"pixel_values": {0: "batch"}},
+                    num_threads=settings.ONNX_NUM_THREADS
+                )
+                self._text_graph = OnnxGraph(
+                    ClipTextFeatures(self.model),
+                    {"input_ids": tokens["input_ids"], "attention_mask": tokens["attention_mask"]},
+                    onnx_model_path(self.model_name, "text"),
+                    dynamic_axes={
+                        "input_ids": {0: "batch", 1: "sequence"},
+                        "attention_mask": {0: "batch", 1: "sequence"},
+                    },
+                    num_threads=settings.ONNX_NUM_THREADS
+                )
+            self.backend = backend
+            logger.info(f"CLIP inference backend: {backend}")
+        except Exception as e:
+            logger.error(f"Could not initialise CLIP backend {backend}, using torch: {e}")
+    
+    def _image_features(self, pixel_values: torch.Tensor) -> np.ndarray:
+        """Unit-norm float32 image embeddings on the active backend"""
+        if self._vision_graph is not None:
+            return self._vision_graph(pixel_values=pixel_values.numpy()).astype(np.float32)
+        
+        with torch.no_grad():
+            image_features = self.model.get_image_features(pixel_values=pixel_values.to(self.device))
+            image_features = image_features / image_features.norm(dim=-1, keepdim=True)
+        return image_features.cpu().numpy().astype(np.float32)
+    
+    def _text_features(self, inputs: Dict[str, torch.Tensor]) -> np.ndarray:
+        """Unit-norm float32 text embeddings on the active backend"""
+        if self._text_graph is not None:
+            return self._text_graph(
+                input_ids=inputs["input_ids"].numpy().astype(np.int64),
+                attention_mask=inputs["attention_mask"].numpy().astype(np.int64)
+            ).astype(np.float32)
+        
+        with torch.no_grad():
+            text_features = self.model.get_text_features(
+                **{k: v.to(self.device) for k, v in inputs.items()}
+            )
+            text_features = text_features / text_features.norm(dim=-1, keepdim=True)
+        return text_features.cpu().numpy().astype(np.float32)
     
     def encode_image(self, image_path: str) -> np.ndarray:
-        """Generate embedding for a single image"""
+        """
+        Generate embedding for a single image
+        
+        Raises when the image cannot be loaded or encoded, so a failed frame
+        is never indexed as a zero vector.
+        """
         try:
             image = Image.open(image_path).convert("RGB")
             inputs = self.processor(images=image, return_tensors="pt")
-            inputs = {k: v.to(self.device) for k, v in inputs.items()}
-            
-            with torch.no_grad():
-                image_features = self.model.get_image_features(**inputs)
-                # Normalize embedding
-                image_features = image_features / image_features.norm(dim=-1, keepdim=True)
             
-            return image_features.cpu().numpy().flatten()
+            return self._image_features(inputs["pixel_values"]).flatten()
         except Exception as e:
-            logger.error(f"Image encoding failed: {e}")
-            return np.zeros(512)  # Return zero vector on failure
+            logger.error(f"Image encoding failed for {image_path}: {e}")
+            raise
     
-    def encode_images_batch(self, image_paths: List[str], batch_size: int = 8) -> np.ndarray:
-        """Generate embeddings for multiple images in batches"""
-        embeddings = []
+    def preprocess_frames(self, frames: np.ndarray) -> np.ndarray:
+        """
+        Scale and normalise decoded RGB frames into CLIP pixel values
         
-        for i in range(0, len(image_paths), batch_size):
-            batch_paths = image_paths[i:i + batch_size]
-            batch_embeddings = [self.encode_image(path) for path in batch_paths]
-            embeddings.extend(batch_embeddings)
+        frames is a uint8 array of shape (n, image_size, image_size, 3),
+        already resized and centre-cropped (e.g. by FrameSource). Pure NumPy,
+        so it can run on worker threads alongside inference.
+        
+        Returns:
+            float32 array of shape (n, 3, image_size, image_size)
+        """
+        pixels = frames.transpose(0, 3, 1, 2).astype(np.float32, order="C")
+        pixels *= 1.0 / 255.0
+        pixels -= self._pixel_mean
+        pixels /= self._pixel_std
+        return pixels
+    
+    def encode_pixels(self, pixels: np.ndarray) -> np.ndarray:
+        """
+        Run preprocessed pixel values through the vision tower in one forward pass
         
-        return np.array(embeddings)
+        Returns:
+            float32 array of shape (n, embedding_dim) with unit-norm rows
+        """
+        return self._image_features(torch.from_numpy(pixels))
+    
+    def encode_frames(self, frames: np.ndarray) -> np.ndarray:
+        """Generate unit-norm embeddings for decoded RGB frames (see preprocess_frames)"""
+        return self.encode_pixels(self.preprocess_frames(frames))
     
     def encode_text(self, text: str) -> np.ndarray:
         """Generate embedding for text query"""
+        return self.encode_texts([text])[0]
+    
+    def encode_texts(self, texts: List[str]) -> np.ndarray:
+        """
+        Generate embeddings for several text queries in one forward pass
+        
+        Raises when encoding fails, like encode_image, so a failed query is
+        never searched or cached as a zero vector.
+        
+        Returns:
+            float32 array of shape (len(texts), embedding_dim) with unit-norm
+            rows
+        """
         try:
-            inputs = self.processor(text=[text], return_tensors="pt", padding=True)
-            inputs = {k: v.to(self.device) for k, v in inputs.items()}
-            
-            with torch.no_grad():
-                text_features = self.model.get_text_features(**inputs)
-                text_features = text_features / text_features.norm(dim=-1, keepdim=True)
+            inputs = self.processor(text=list(texts), return_tensors="pt", padding=True)
             
-            return text_features.cpu().numpy().flatten()
+            return self._text_features(inputs)
         except Exception as e:
-            logger.error(f"Text encoding failed: {e}")
-            return np.zeros(512)
+            logger.error(f"Text encoding failed for {len(texts)} queries: {e}")
+            raise
     
     def compute_similarity(self, image_embedding: np.ndarray, text_embedding: np.ndarray) -> float:
         """Compute cosine similarity between image and text embeddings"""
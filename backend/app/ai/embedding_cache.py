@@ -0,0 +1,192 @@
+import hashlib
+import logging
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(text: str) -> str:
+    """Canonical form of a query: NFKC, lower case, collapsed whitespace"""
+    return " ".join(unicodedata.normalize("NFKC", text).lower().split())
+
+
+class QueryEmbeddingCache:
+    """
+    Two-tier cache of query embeddings
+
+    Tier one is an in-process LRU with a TTL; tier two, when redis_url is
+    set, is shared by every API replica. Keys combine the normalized query
+    text with a model id and a cache version, so changing the model, its
+    inference backend or QUERY_CACHE_VERSION never serves stale vectors.
+    Values are stored as float16 bytes (half the memory, negligible cosine
+    drift) and returned as float32.
+
+    Redis is strictly best effort: it is queried with a short timeout and,
+    after an error, skipped for redis_retry_seconds.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        ttl_seconds: float = 3600.0,
+        redis_url: str = "",
+        redis_ttl_seconds: int = 86400,
+        version: str = "1",
+        redis_retry_seconds: float = 30.0
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.redis_ttl_seconds = redis_ttl_seconds
+        self.version = version
+        self.redis_retry_seconds = redis_retry_seconds
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._redis = None
+        self._redis_disabled_until = 0.0
+        if redis_url:
+            import redis
+
+            self._redis = redis.Redis.from_url(redis_url, socket_timeout=0.05, socket_connect_timeout=0.05)
+
+        self._local_hits = 0
+        self._redis_hits = 0
+        self._misses = 0
+        self._redis_errors = 0
+        self._evictions = 0
+
+    def key(self, text: str, model_id: str) -> str:
+        digest = hashlib.sha1(normalize_query(text).encode("utf-8")).hexdigest()
+        return f"qemb:v{self.version}:{model_id}:{digest}"
+
+    def get_or_compute(
+        self,
+        text: str,
+        model_id: str,
+        compute: Callable[[str], np.ndarray]
+    ) -> np.ndarray:
+        """
+        Return the cached embedding for text, computing and storing it on a miss
+
+        compute receives the normalized query, so every spelling variant
+        that shares a cache key also shares the same vector. All-zero
+        vectors (Sentence-BERT's failure fallback) are returned but not cached.
+        """
+        key = self.key(text, model_id)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        embedding = np.asarray(compute(normalize_query(text)), dtype=np.float32)
+        if np.any(embedding):
+            self.put(key, embedding)
+        return embedding
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, payload = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._local_hits += 1
+                    return _decode(payload)
+                del self._entries[key]
+
+        payload = self._redis_get(key)
+        if payload is not None:
+            self._store_local(key, payload)
+            self._redis_hits += 1
+            return _decode(payload)
+
+        self._misses += 1
+        return None
+
+    def put(self, key: str, embedding: np.ndarray) -> None:
+        payload = np.asarray(embedding, dtype=np.float16).tobytes()
+        self._store_local(key, payload)
+        self._redis_set(key, payload)
+
+    def clear(self) -> None:
+        """Drop the in-process tier (Redis entries expire on their own)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._local_hits + self._redis_hits + self._misses
+        return {
+            "entries": len(self._entries),
+            "local_hits": self._local_hits,
+            "redis_hits": self._redis_hits,
+            "misses": self._misses,
+            "hit_rate": round((self._local_hits + self._redis_hits) / lookups, 4) if lookups else 0.0,
+            "evictions": self._evictions,
+            "redis_enabled": self._redis is not None,
+            "redis_errors": self._redis_errors,
+        }
+
+    def _store_local(self, key: str, payload: bytes) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def _redis_available(self) -> bool:
+        return self._redis is not None and time.monotonic() >= self._redis_disabled_until
+
+    def _redis_get(self, key: str) -> Optional[bytes]:
+        if not self._redis_available():
+            return None
+        try:
+            return self._redis.get(key)
+        except Exception as e:
+            self._redis_failed(e)
+            return None
+
+    def _redis_set(self, key: str, payload: bytes) -> None:
+        if not self._redis_available():
+            return
+        try:
+            self._redis.set(key, payload, ex=self.redis_ttl_seconds)
+        except Exception as e:
+            self._redis_failed(e)
+
+    def _redis_failed(self, error: Exception) -> None:
+        self._redis_errors += 1
+        self._redis_disabled_until = time.monotonic() + self.redis_retry_seconds
+        logger.warning(f"Query embedding cache Redis tier unavailable for {self.redis_retry_seconds:.0f}s: {error}")
+
+
+def _decode(payload: bytes) -> np.ndarray:
+    return np.frombuffer(payload, dtype=np.float16).astype(np.float32)
+
+
+_query_embedding_cache: Optional[QueryEmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_query_embedding_cache() -> QueryEmbeddingCache:
+    """Process-wide query embedding cache configured from settings"""
+    global _query_embedding_cache
+    if _query_embedding_cache is None:
+        with _cache_lock:
+            if _query_embedding_cache is None:
+                _query_embedding_cache = QueryEmbeddingCache(
+                    max_entries=settings.QUERY_CACHE_MAX_ENTRIES,
+                    ttl_seconds=settings.QUERY_CACHE_TTL_SECONDS,
+                    redis_url=settings.QUERY_CACHE_REDIS_URL,
+                    redis_ttl_seconds=settings.QUERY_CACHE_REDIS_TTL_SECONDS,
+                    version=settings.QUERY_CACHE_VERSION
+                )
+    return _query_embedding_cache
@@ -0,0 +1,177 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class VisualEmbeddingPipeline:
+    """
+    Bounded producer/consumer pipeline for CLIP frame embedding
+
+    A feeder thread pulls (frames, tag) batches from the source and hands
+    them to preprocess_workers threads that normalise them into pixel
+    tensors (CLIPEmbedder.preprocess_frames). Ready batches wait, in input
+    order, in a queue of at most queue_size entries, and the consuming
+    thread runs inference (CLIPEmbedder.encode_pixels) with torch limited to
+    inference_threads for the duration of the run. Decoding, preprocessing and inference therefore
+    overlap instead of taking turns on the same thread.
+
+    stats() reports throughput (frames/s), queue depth and how long the
+    consumer waited for input (consumer_stall_seconds, the pipeline is
+    input-bound) or the feeder waited for space (producer_stall_seconds,
+    inference-bound).
+    """
+
+    def __init__(
+        self,
+        clip_model,
+        preprocess_workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        inference_threads: Optional[int] = None
+    ):
+        self.clip_model = clip_model
+        self.preprocess_workers = preprocess_workers or settings.EMBEDDING_PREPROCESS_WORKERS
+        self.queue_size = queue_size or settings.EMBEDDING_QUEUE_SIZE
+        self.inference_threads = (
+            settings.EMBEDDING_INFERENCE_THREADS if inference_threads is None else inference_threads
+        )
+        self._reset_stats()
+
+    def run(self, batches: Iterable[Tuple[np.ndarray, Any]]) -> Iterator[Tuple[np.ndarray, Any]]:
+        """
+        Embed every (frames, tag) batch; yields (embeddings, tag) in input order
+
+        frames must stay valid until the batch is yielded back (pass copies
+        of reusable buffers). Batches that fail to preprocess or encode are
+        logged and skipped.
+        """
+        self._reset_stats()
+        # torch's thread count is process-wide; restored once the run ends so
+        # other models in the process (Whisper, SBERT) keep their setting
+        previous_threads = None
+        if self.inference_threads:
+            import torch
+
+            previous_threads = torch.get_num_threads()
+            torch.set_num_threads(self.inference_threads)
+
+        ready: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        pool = ThreadPoolExecutor(max_workers=self.preprocess_workers, thread_name_prefix="clip-preprocess")
+        feeder = threading.Thread(
+            target=self._feed,
+            args=(batches, pool, ready, stop),
+            name="clip-feeder",
+            daemon=True
+        )
+
+        self._started = time.perf_counter()
+        feeder.start()
+        try:
+            while True:
+                wait_start = time.perf_counter()
+                self._depth_samples += 1
+                self._depth_total += ready.qsize()
+                item = ready.get()
+                if item is None:
+                    return
+
+                future, tag, frame_count = item
+                try:
+                    pixels = future.result()
+                except Exception as e:
+                    self._failed_batches += 1
+                    logger.error(f"Frame preprocessing failed for {frame_count} frames: {e}")
+                    continue
+                finally:
+                    self._consumer_stall += time.perf_counter() - wait_start
+
+                inference_start = time.perf_counter()
+                try:
+                    embeddings = self.clip_model.encode_pixels(pixels)
+                except Exception as e:
+                    self._failed_batches += 1
+                    logger.error(f"Frame encoding failed for {frame_count} frames: {e}")
+                    continue
+                finally:
+                    self._inference_seconds += time.perf_counter() - inference_start
+
+                self._frames += frame_count
+                self._batches += 1
+                yield embeddings, tag
+        finally:
+            self._finished = time.perf_counter()
+            stop.set()
+            feeder.join(timeout=5.0)
+            pool.shutdown(wait=False, cancel_futures=True)
+            if previous_threads is not None:
+                torch.set_num_threads(previous_threads)
+
+    def stats(self) -> Dict[str, Any]:
+        end = self._finished or time.perf_counter()
+        elapsed = end - self._started if self._started else 0.0
+        return {
+            "frames": self._frames,
+            "batches": self._batches,
+            "failed_batches": self._failed_batches,
+            "elapsed_seconds": round(elapsed, 3),
+            "frames_per_second": round(self._frames / elapsed, 2) if elapsed > 0 else 0.0,
+            "inference_seconds": round(self._inference_seconds, 3),
+            "consumer_stall_seconds": round(self._consumer_stall, 3),
+            "producer_stall_seconds": round(self._producer_stall, 3),
+            "queue_depth_max": self._depth_max,
+            "queue_depth_mean": round(self._depth_total / self._depth_samples, 2) if self._depth_samples else 0.0,
+        }
+
+    def _feed(self, batches, pool: ThreadPoolExecutor, ready: "queue.Queue", stop: threading.Event) -> None:
+        source = iter(batches)
+        try:
+            for frames, tag in source:
+                if stop.is_set():
+                    return
+                future = pool.submit(self.clip_model.preprocess_frames, frames)
+                if not self._put(ready, (future, tag, len(frames)), stop):
+                    return
+                self._depth_max = max(self._depth_max, ready.qsize())
+        except Exception as e:
+            logger.error(f"Frame source failed: {e}")
+        finally:
+            # Closing a generator source on early exit runs its cleanup
+            # (e.g. stopping FrameSource's decoder and its FFmpeg processes)
+            close = getattr(source, "close", None)
+            if close is not None:
+                close()
+            self._put(ready, None, stop)
+
+    def _put(self, ready: "queue.Queue", item, stop: threading.Event) -> bool:
+        wait_start = time.perf_counter()
+        try:
+            while not stop.is_set():
+                try:
+                    ready.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            self._producer_stall += time.perf_counter() - wait_start
+
+    def _reset_stats(self) -> None:
+        self._frames = 0
+        self._batches = 0
+        self._failed_batches = 0
+        self._inference_seconds = 0.0
+        self._consumer_stall = 0.0
+        self._producer_stall = 0.0
+        self._depth_max = 0
+        self._depth_total = 0
+        self._depth_samples = 0
+        self._started = 0.0
+        self._finished = 0.0
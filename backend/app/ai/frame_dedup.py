@@ -0,0 +1,82 @@
+import logging
+from typing import Dict, Any, Optional, Union
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+
+def dhash(image: Union[str, np.ndarray], hash_size: int = 8) -> Optional[int]:
+    """
+    Difference hash of an image (hash_size * hash_size bits)
+
+    image is a file path or an RGB uint8 array. It is shrunk to a
+    (hash_size + 1) x hash_size grayscale thumbnail and each bit records
+    whether a pixel is brighter than its right neighbour, which survives
+    re-encoding, small noise and exposure shifts.
+
+    Returns:
+        The hash as an int, or None if the image could not be read
+    """
+    try:
+        if isinstance(image, str):
+            with Image.open(image) as opened:
+                gray = opened.convert("L")
+        else:
+            gray = Image.fromarray(image).convert("L")
+        pixels = np.asarray(gray.resize((hash_size + 1, hash_size), Image.BILINEAR), dtype=np.int16)
+    except Exception as e:
+        logger.warning(f"Could not hash frame {image if isinstance(image, str) else 'array'}: {e}")
+        return None
+
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+class NearDuplicateFilter:
+    """
+    Streaming near-duplicate detector for frames arriving in time order
+
+    keep() compares each frame with the last retained one. A frame whose
+    dHash is within max_distance bits is rejected and the retained frame's
+    'end_time' is extended over it, so the retained frame carries the span
+    of everything it replaces. Frames are only compared within a scene:
+    the first frame of a new 'scene_number' is always kept, so no span
+    crosses a scene boundary. Frames that cannot be hashed are kept.
+    """
+
+    def __init__(self, max_distance: int = 5, hash_size: int = 8):
+        self.max_distance = max_distance
+        self.hash_size = hash_size
+        self.total = 0
+        self.kept = 0
+        self._last_frame: Optional[Dict[str, Any]] = None
+        self._last_hash: Optional[int] = None
+
+    def keep(self, image: Union[str, np.ndarray], frame: Dict[str, Any]) -> bool:
+        """Return True if frame should be kept; frame is a dict with 'start_time'/'end_time' (and 'scene_number')"""
+        self.total += 1
+        frame_hash = dhash(image, self.hash_size)
+        if (
+            self._last_frame is not None
+            and self._last_frame.get("scene_number") == frame.get("scene_number")
+            and frame_hash is not None
+            and self._last_hash is not None
+            and (frame_hash ^ self._last_hash).bit_count() <= self.max_distance
+        ):
+            self._last_frame["end_time"] = max(self._last_frame["end_time"], frame["end_time"])
+            return False
+
+        self._last_frame = frame
+        self._last_hash = frame_hash
+        self.kept += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "kept": self.kept,
+            "dropped": self.total - self.kept,
+            "dedup_ratio": (self.total - self.kept) / self.total if self.total else 0.0,
+        }
+
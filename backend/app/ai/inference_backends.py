@@ -0,0 +1,180 @@
+import logging
+import os
+from typing import Any, Dict, List, Optional, Union
+import numpy as np
+import torch
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# "torch": fp32 eager; "torch-int8": dynamically quantized Linear layers;
+# "onnx": exported graph run under ONNX Runtime (CPU)
+BACKENDS = ("torch", "torch-int8", "onnx")
+
+
+def validate_backend(backend: str) -> str:
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend: {backend} (expected one of {BACKENDS})")
+    return backend
+
+
+def quantize_dynamic_int8(module: torch.nn.Module) -> torch.nn.Module:
+    """Copy of module with every Linear layer quantized to int8 weights (CPU only)"""
+    return torch.ao.quantization.quantize_dynamic(module, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def onnx_model_path(model_name: str, graph: str) -> str:
+    """Where the exported graph for model_name lives under ONNX_MODEL_DIR"""
+    return os.path.join(settings.ONNX_MODEL_DIR, f"{model_name.replace('/', '--')}-{graph}.onnx")
+
+
+class OnnxGraph:
+    """
+    A torch module exported once to ONNX and executed with ONNX Runtime
+
+    The export is written to path the first time (atomically, so parallel
+    workers can race safely) and reused afterwards. Calling the graph with
+    NumPy inputs returns its first output.
+    """
+
+    def __init__(
+        self,
+        module: torch.nn.Module,
+        example_inputs: Dict[str, torch.Tensor],
+        path: str,
+        dynamic_axes: Dict[str, Dict[int, str]],
+        num_threads: int = 0
+    ):
+        import onnxruntime as ort
+
+        if not os.path.exists(path):
+            self._export(module, example_inputs, path, dynamic_axes)
+
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.path = path
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [graph_input.name for graph_input in self.session.get_inputs()]
+
+    def __call__(self, **inputs: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {name: inputs[name] for name in self.input_names})[0]
+
+    @staticmethod
+    def _export(module, example_inputs, path, dynamic_axes) -> None:
+        logger.info(f"Exporting ONNX graph: {path}")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        module.eval()
+        with torch.no_grad():
+            torch.onnx.export(
+                module,
+                tuple(example_inputs.values()),
+                tmp_path,
+                input_names=list(example_inputs),
+                output_names=["embeddings"],
+                dynamic_axes=dict(dynamic_axes, embeddings={0: "batch"}),
+                opset_version=17
+            )
+        os.replace(tmp_path, path)
+
+
+class ClipImageFeatures(torch.nn.Module):
+    """Unit-norm CLIP image embeddings from pixel values (export wrapper)"""
+
+    def __init__(self, clip_model):
+        super().__init__()
+        self.clip_model = clip_model
+
+    def forward(self, pixel_values):
+        features = self.clip_model.get_image_features(pixel_values=pixel_values)
+        return features / features.norm(dim=-1, keepdim=True)
+
+
+class ClipTextFeatures(torch.nn.Module):
+    """Unit-norm CLIP text embeddings from token ids (export wrapper)"""
+
+    def __init__(self, clip_model):
+        super().__init__()
+        self.clip_model = clip_model
+
+    def forward(self, input_ids, attention_mask):
+        features = self.clip_model.get_text_features(input_ids=input_ids, attention_mask=attention_mask)
+        return features / features.norm(dim=-1, keepdim=True)
+
+
+class _SentenceEmbedding(torch.nn.Module):
+    """Full SentenceTransformer forward (transformer, pooling, normalisation) for export"""
+
+    def __init__(self, sentence_transformer):
+        super().__init__()
+        self.sentence_transformer = sentence_transformer
+
+    def forward(self, input_ids, attention_mask):
+        features = {"input_ids": input_ids, "attention_mask": attention_mask}
+        return self.sentence_transformer(features)["sentence_embedding"]
+
+
+class OnnxSentenceTransformer:
+    """
+    ONNX Runtime stand-in for a SentenceTransformer
+
+    Exposes the subset of the SentenceTransformer API that
+    SentenceBERTEmbedder uses (encode, get_sentence_embedding_dimension),
+    so the embedder's encode_* methods work unchanged on either backend.
+    """
+
+    def __init__(self, sentence_transformer, path: str, num_threads: int = 0):
+        self.tokenizer = sentence_transformer.tokenizer
+        self.max_seq_length = sentence_transformer.max_seq_length
+        self._dimension = sentence_transformer.get_sentence_embedding_dimension()
+
+        example = self.tokenizer(["warm up"], return_tensors="pt")
+        self.graph = OnnxGraph(
+            _SentenceEmbedding(sentence_transformer),
+            {"input_ids": example["input_ids"], "attention_mask": example["attention_mask"]},
+            path,
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+            },
+            num_threads=num_threads
+        )
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self._dimension
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        convert_to_numpy: bool = True,
+        normalize_embeddings: bool = False,
+        show_progress_bar: Optional[bool] = None,
+        **kwargs: Any
+    ) -> np.ndarray:
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+
+        batches = []
+        for i in range(0, len(sentences), batch_size):
+            tokens = self.tokenizer(
+                sentences[i:i + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np"
+            )
+            batches.append(self.graph(
+                input_ids=tokens["input_ids"].astype(np.int64),
+                attention_mask=tokens["attention_mask"].astype(np.int64)
+            ))
+
+        embeddings = np.concatenate(batches) if batches else np.empty((0, self._dimension), dtype=np.float32)
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            embeddings = embeddings / norms
+        return embeddings[0] if single else embeddings
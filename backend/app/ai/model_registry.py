@@ -0,0 +1,191 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ModelHandle:
+    """A loaded model shared by every caller in the process"""
+
+    def __init__(self, key: str, model: Any, load_seconds: float, memory_bytes: int):
+        self.key = key
+        self.model = model
+        self.load_seconds = load_seconds
+        self.memory_bytes = memory_bytes
+        self.warmup_seconds = 0.0
+        # Held by callers whose inference path is not re-entrant (e.g. Whisper)
+        self.lock = threading.RLock()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "key": self.key,
+            "type": type(self.model).__name__,
+            "load_seconds": round(self.load_seconds, 3),
+            "warmup_seconds": round(self.warmup_seconds, 3),
+            "memory_mb": round(self.memory_bytes / (1024 * 1024), 1),
+        }
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of AI models
+
+    Each model is loaded at most once per process, no matter how many tasks,
+    requests or threads ask for it. Loading is guarded by a per-key lock so
+    concurrent first callers wait for a single load instead of racing.
+    """
+
+    def __init__(self):
+        self._handles: Dict[str, ModelHandle] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+
+    def get_handle(
+        self,
+        key: str,
+        factory: Callable[[], Any],
+        warmup: Optional[Callable[[Any], None]] = None
+    ) -> ModelHandle:
+        """Return the handle for key, loading and warming the model on first use"""
+        handle = self._handles.get(key)
+        if handle is not None:
+            return handle
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            handle = self._handles.get(key)
+            if handle is not None:
+                return handle
+
+            logger.info(f"Loading model into registry: {key}")
+            start = time.perf_counter()
+            model = factory()
+            load_seconds = time.perf_counter() - start
+
+            handle = ModelHandle(key, model, load_seconds, _model_memory_bytes(model))
+
+            if warmup is not None:
+                start = time.perf_counter()
+                try:
+                    warmup(model)
+                except Exception as e:
+                    logger.warning(f"Warm-up failed for {key}: {e}")
+                handle.warmup_seconds = time.perf_counter() - start
+
+            self._handles[key] = handle
+            logger.info(
+                f"Model {key} ready in {handle.load_seconds:.2f}s "
+                f"(warm-up {handle.warmup_seconds:.2f}s, {handle.memory_bytes / 1e6:.0f} MB)"
+            )
+            return handle
+
+    def get(
+        self,
+        key: str,
+        factory: Callable[[], Any],
+        warmup: Optional[Callable[[Any], None]] = None
+    ) -> Any:
+        """Return the shared model instance for key"""
+        return self.get_handle(key, factory, warmup).model
+
+    def is_loaded(self, key: str) -> bool:
+        return key in self._handles
+
+    def stats(self) -> Dict[str, Any]:
+        """Load time, warm-up time and memory of every loaded model"""
+        handles = list(self._handles.values())
+        return {
+            "models": [handle.stats() for handle in handles],
+            "total_memory_mb": round(sum(h.memory_bytes for h in handles) / (1024 * 1024), 1),
+        }
+
+    def clear(self) -> None:
+        """Drop every loaded model (mainly for tests)"""
+        with self._lock:
+            self._handles.clear()
+            self._key_locks.clear()
+
+
+def _model_memory_bytes(model: Any) -> int:
+    """Bytes held by the parameters and buffers of the wrapped torch module"""
+    module = getattr(model, "model", model)
+    try:
+        tensors = list(module.parameters()) + list(module.buffers())
+    except AttributeError:
+        return 0
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+model_registry = ModelRegistry()
+
+
+def clip_model_id() -> str:
+    """Registry key of the configured CLIP model (also used in query cache keys)"""
+    return f"clip:{settings.CLIP_MODEL_NAME}:{settings.CLIP_BACKEND}"
+
+
+def text_model_id() -> str:
+    """Registry key of the configured Sentence-BERT model"""
+    return f"sbert:{settings.SBERT_MODEL_NAME}:{settings.SBERT_BACKEND}"
+
+
+def get_clip_embedder():
+    from app.ai.clip_model import CLIPEmbedder
+
+    return model_registry.get(
+        clip_model_id(),
+        lambda: CLIPEmbedder(settings.CLIP_MODEL_NAME),
+        warmup=lambda model: model.encode_text("warm up"),
+    )
+
+
+def get_text_embedder():
+    from app.ai.sentence_bert import SentenceBERTEmbedder
+
+    return model_registry.get(
+        text_model_id(),
+        lambda: SentenceBERTEmbedder(settings.SBERT_MODEL_NAME),
+        warmup=lambda model: model.encode("warm up"),
+    )
+
+
+def get_whisper_handle(model_size: Optional[str] = None) -> ModelHandle:
+    """
+    Shared Whisper handle; hold handle.lock around transcribe()
+
+    Whisper's decoding keeps per-call state on the model (kv-cache hooks),
+    so concurrent transcriptions on one instance must be serialised.
+    """
+    from app.ai.whisper_model import WhisperTranscriber
+
+    model_size = model_size or settings.WHISPER_MODEL_SIZE
+    return model_registry.get_handle(
+        f"whisper:{model_size}",
+        lambda: WhisperTranscriber(model_size=model_size),
+        # One second of silence is enough to initialise the decoder
+        warmup=lambda model: model.model.transcribe(np.zeros(16000, dtype=np.float32), fp16=False),
+    )
+
+
+def get_whisper_transcriber(model_size: Optional[str] = None):
+    """The shared WhisperTranscriber (transcribe through get_whisper_handle to take its lock)"""
+    return get_whisper_handle(model_size).model
+
+
+def preload_worker_models() -> None:
+    """Load every ingestion model; called once per Celery worker process"""
+    start = time.perf_counter()
+    get_clip_embedder()
+    get_whisper_transcriber()
+    get_text_embedder()
+    logger.info(
+        f"Preloaded worker models in {time.perf_counter() - start:.2f}s: {model_registry.stats()}"
+    )
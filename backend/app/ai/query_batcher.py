@@ -0,0 +1,193 @@
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class QueryEncodeBatcher:
+    """
+    Dynamic micro-batching for query-time text encoding
+
+    Concurrent callers (the search branches on executor threads) submit one
+    query each; a single worker thread collects whatever arrives within
+    max_wait_ms of the first pending query, up to max_batch queries, and
+    encodes them with one call to encode_batch. Each caller's future is
+    resolved with its own row of the result, so under load many requests
+    share a forward pass while an idle service adds at most max_wait_ms.
+
+    encode_batch takes a list of texts and returns an array with one
+    embedding per text. stats() reports a histogram of batch sizes.
+    """
+
+    def __init__(
+        self,
+        encode_batch: Callable[[List[str]], np.ndarray],
+        max_batch: int = 32,
+        max_wait_ms: float = 5.0,
+        name: str = "query-encoder"
+    ):
+        self.encode_batch = encode_batch
+        self.max_batch = max(1, max_batch)
+        self.max_wait_ms = max_wait_ms
+        self.name = name
+
+        self._pending: "queue.Queue" = queue.Queue()
+        self._stop = threading.Event()
+        self._worker = threading.Thread(target=self._run, name=name, daemon=True)
+        self._worker.start()
+
+        self._batch_sizes: Counter = Counter()
+        self._items = 0
+        self._failed_batches = 0
+        self._inference_seconds = 0.0
+        self._queue_wait_seconds = 0.0
+
+    def submit(self, text: str) -> Future:
+        """Queue text for the next batch; the future resolves to its embedding"""
+        future: Future = Future()
+        if self._stop.is_set():
+            future.set_exception(RuntimeError(f"{self.name} batcher is stopped"))
+            return future
+        self._pending.put((text, future, time.perf_counter()))
+        return future
+
+    def encode(self, text: str, timeout: Optional[float] = None) -> np.ndarray:
+        """Blocking form of submit()"""
+        return self.submit(text).result(timeout=timeout)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Finish the queries already submitted, then stop the worker"""
+        self._stop.set()
+        self._pending.put(None)
+        self._worker.join(timeout=timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        batches = sum(self._batch_sizes.values())
+        return {
+            "name": self.name,
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait_ms,
+            "batches": batches,
+            "queries": self._items,
+            "failed_batches": self._failed_batches,
+            "mean_batch_size": round(self._items / batches, 2) if batches else 0.0,
+            "batch_size_histogram": {str(size): count for size, count in sorted(self._batch_sizes.items())},
+            "mean_queue_wait_ms": round(self._queue_wait_seconds * 1000 / self._items, 3) if self._items else 0.0,
+            "mean_inference_ms": round(self._inference_seconds * 1000 / batches, 3) if batches else 0.0,
+        }
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            if batch:
+                self._encode(batch)
+            if self._stop.is_set() and self._pending.empty():
+                return
+
+    def _collect(self) -> List[tuple]:
+        """Block for one query, then gather more until max_batch or max_wait_ms"""
+        first = self._pending.get()
+        if first is None:
+            return self._drain()
+
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._pending.get(timeout=remaining) if remaining > 0 else self._pending.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Stopping: encode what we have, the drain picks up the rest
+                self._pending.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _drain(self) -> List[tuple]:
+        batch = []
+        while len(batch) < self.max_batch:
+            try:
+                item = self._pending.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                batch.append(item)
+        return batch
+
+    def _encode(self, batch: Sequence[tuple]) -> None:
+        texts = [text for text, _, _ in batch]
+        started = time.perf_counter()
+        self._queue_wait_seconds += sum(started - submitted for _, _, submitted in batch)
+        try:
+            embeddings = np.asarray(self.encode_batch(texts), dtype=np.float32)
+            if len(embeddings) != len(texts):
+                raise ValueError(f"encode_batch returned {len(embeddings)} embeddings for {len(texts)} texts")
+        except Exception as e:
+            self._failed_batches += 1
+            logger.error(f"{self.name} batch of {len(texts)} queries failed: {e}")
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+        finally:
+            self._inference_seconds += time.perf_counter() - started
+            self._batch_sizes[len(texts)] += 1
+            self._items += len(texts)
+
+        for (_, future, _), embedding in zip(batch, embeddings):
+            future.set_result(embedding)
+
+
+_batchers: Dict[str, QueryEncodeBatcher] = {}
+_batchers_lock = threading.Lock()
+
+
+def _get_batcher(name: str, encode_batch_factory: Callable[[], Callable[[List[str]], np.ndarray]]) -> QueryEncodeBatcher:
+    batcher = _batchers.get(name)
+    if batcher is not None:
+        return batcher
+    with _batchers_lock:
+        batcher = _batchers.get(name)
+        if batcher is None:
+            batcher = QueryEncodeBatcher(
+                encode_batch_factory(),
+                max_batch=settings.QUERY_BATCH_MAX_SIZE,
+                max_wait_ms=settings.QUERY_BATCH_MAX_WAIT_MS,
+                name=name
+            )
+            _batchers[name] = batcher
+    return batcher
+
+
+def get_clip_query_batcher() -> QueryEncodeBatcher:
+    """Process-wide batcher for CLIP text queries"""
+    from app.ai.model_registry import get_clip_embedder
+
+    return _get_batcher("clip-query", lambda: get_clip_embedder().encode_texts)
+
+
+def get_text_query_batcher() -> QueryEncodeBatcher:
+    """Process-wide batcher for Sentence-BERT queries"""
+    from app.ai.model_registry import get_text_embedder
+
+    return _get_batcher("sbert-query", lambda: get_text_embedder().encode)
+
+
+def query_batcher_stats() -> List[Dict[str, Any]]:
+    return [batcher.stats() for batcher in list(_batchers.values())]
+
+
+def stop_query_batchers() -> None:
+    with _batchers_lock:
+        for batcher in _batchers.values():
+            batcher.stop()
+        _batchers.clear()
@@ -1,23 +1,59 @@
 import logging
 import numpy as np
 from sentence_transformers import SentenceTransformer
-from typing import List, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from app.ai.inference_backends import (
+    OnnxSentenceTransformer,
+    onnx_model_path,
+    quantize_dynamic_int8,
+    validate_backend,
+)
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
 
 class SentenceBERTEmbedder:
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", backend: Optional[str] = None):
         """
         Initialize Sentence-BERT model
         
         Popular models:
         - all-MiniLM-L6-v2: Fast, 384 dimensions
         - all-mpnet-base-v2: High quality, 768 dimensions
+        
+        backend (default SBERT_BACKEND) is "torch", "torch-int8" or "onnx";
+        see CLIPEmbedder. The encode_* methods are identical on each.
         """
         logger.info(f"Loading Sentence-BERT model: {model_name}")
+        self.model_name = model_name
         self.model = SentenceTransformer(model_name)
         self.embedding_dim = self.model.get_sentence_embedding_dimension()
+        
+        self.backend = "torch"
+        self._init_backend(validate_backend(backend or settings.SBERT_BACKEND))
+    
+    def _init_backend(self, backend: str) -> None:
+        if backend == "torch":
+            return
+        if self.model.device.type != "cpu":
+            logger.warning(f"Sentence-BERT backend {backend} is CPU-only, keeping torch on {self.model.device}")
+            return
+        
+        try:
+            if backend == "torch-int8":
+                self.model = quantize_dynamic_int8(self.model)
+            elif backend == "onnx":
+                self.model = OnnxSentenceTransformer(
+                    self.model,
+                    onnx_model_path(self.model_name, "sentence"),
+                    num_threads=settings.ONNX_NUM_THREADS
+                )
+            self.backend = backend
+            logger.info(f"Sentence-BERT inference backend: {backend}")
+        except Exception as e:
+            logger.error(f"Could not initialise Sentence-BERT backend {backend}, using torch: {e}")
     
     def encode(self, text: Union[str, List[str]]) -> np.ndarray:
         """Generate embeddings for text"""
@@ -41,6 +77,75 @@ class SentenceBERTEmbedder:
             else:
                 return np.zeros((len(text), self.embedding_dim))
     
+    def encode_batch(
+        self,
+        texts: List[str],
+        batch_size: Optional[int] = None,
+        output_dtype: str = "float32"
+    ) -> np.ndarray:
+        """
+        Embed many texts in one pass with length-bucketed batches
+        
+        Texts are sorted by length so each batch pads to similar lengths,
+        encoded with a single model call, and returned in input order as a
+        contiguous (len(texts), embedding_dim) matrix.
+        
+        output_dtype:
+        - float32: full precision (default)
+        - float16: half the memory, for caches and local indexes
+        - int8: symmetric quantization of the unit-normalized embeddings
+          (value * 127); divide by 127 to recover approximate floats
+        """
+        if output_dtype not in ("float32", "float16", "int8"):
+            raise ValueError(f"Unsupported output dtype: {output_dtype}")
+        
+        if not texts:
+            return np.empty((0, self.embedding_dim), dtype=output_dtype)
+        
+        # Length buckets: neighbouring texts in a batch have similar lengths
+        order = np.argsort([len(t) for t in texts], kind="stable")
+        sorted_embeddings = self.model.encode(
+            [texts[i] for i in order],
+            batch_size=batch_size or settings.SBERT_BATCH_SIZE,
+            convert_to_numpy=True,
+            normalize_embeddings=output_dtype == "int8",
+            show_progress_bar=False
+        )
+        
+        embeddings = np.empty((len(texts), self.embedding_dim), dtype=np.float32)
+        embeddings[order] = sorted_embeddings
+        
+        if output_dtype == "float16":
+            return embeddings.astype(np.float16)
+        if output_dtype == "int8":
+            return np.clip(np.round(embeddings * 127), -127, 127).astype(np.int8)
+        return embeddings
+    
+    def encode_segments(
+        self,
+        segments: List[Dict[str, Any]],
+        batch_size: Optional[int] = None,
+        output_dtype: str = "float32"
+    ) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+        """
+        Embed transcript segments (Whisper 'segments' dicts) in one pass
+        
+        Segments from several videos can be passed together. Segments with
+        empty text are skipped.
+        
+        Returns:
+            (embeddings, segments) where row i of embeddings belongs to
+            segments[i]
+        """
+        kept = [seg for seg in segments if seg.get("text", "").strip()]
+        embeddings = self.encode_batch(
+            [seg["text"] for seg in kept],
+            batch_size=batch_size,
+            output_dtype=output_dtype
+        )
+        logger.info(f"Encoded {len(kept)} transcript segments")
+        return embeddings, kept
+    
     def compute_similarity(self, text1: str, text2: str) -> float:
         """Compute semantic similarity between two texts"""
         embeddings = self.encode([text1, text2])
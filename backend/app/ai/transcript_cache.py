@@ -0,0 +1,110 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, Optional
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def audio_cache_key(audio: np.ndarray, **params: Any) -> str:
+    """
+    Cache key for a transcription of audio with the given options
+
+    The key hashes the decoded samples themselves, so the same soundtrack
+    hits the cache no matter which file, URL or retry it came from.
+    """
+    digest = hashlib.sha256(np.ascontiguousarray(audio, dtype=np.float32).tobytes())
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class TranscriptCache:
+    """
+    Transcription results stored as JSON files, one per cache key
+
+    Writes go through a temporary file and an atomic rename, so concurrent
+    workers never read a partial result. With max_bytes set, every write is
+    followed by a sweep that deletes the least recently used entries (by
+    file mtime, which a hit refreshes) until the directory fits.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 0):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable transcript cache entry {path}: {e}")
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return result
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(result, f, default=float)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not write transcript cache entry {path}: {e}")
+            return
+
+        if self.max_bytes > 0:
+            self.sweep()
+
+    def sweep(self) -> int:
+        """Delete least recently used entries until the cache fits max_bytes; returns entries removed"""
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                # Another worker evicted it first
+                pass
+            total -= size
+
+        if removed:
+            self.evictions += removed
+            logger.info(f"Evicted {removed} transcript cache entries from {self.directory}")
+        return removed
+
+    def _path(self, key: str) -> str:
+        # Two-level fan-out keeps directories small
+        return os.path.join(self.directory, key[:2], f"{key}.json")
@@ -1,9 +1,149 @@
 import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple, Union
+import numpy as np
 import whisper
-from typing import Dict, Any, List
+
+from app.ai.audio_segmentation import (
+    SAMPLE_RATE,
+    compact_speech,
+    detect_speech_regions,
+    plan_chunks,
+    remap_segments,
+)
+from app.ai.transcript_cache import TranscriptCache, audio_cache_key
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Model loaded once in each chunk worker process
+_worker_model = None
+
+# Chunk worker pool shared by every transcription in this process
+_chunk_pool: Optional[ProcessPoolExecutor] = None
+_chunk_pool_config: Optional[Tuple[str, int]] = None
+_chunk_pool_lock = threading.Lock()
+
+_cache: Optional[TranscriptCache] = None
+
+
+def _transcript_cache() -> Optional[TranscriptCache]:
+    """Process-wide transcript cache, or None when TRANSCRIPT_CACHE_DIR is empty"""
+    global _cache
+    if not settings.TRANSCRIPT_CACHE_DIR:
+        return None
+    if _cache is None or _cache.directory != settings.TRANSCRIPT_CACHE_DIR:
+        _cache = TranscriptCache(settings.TRANSCRIPT_CACHE_DIR, max_bytes=settings.TRANSCRIPT_CACHE_MAX_BYTES)
+    return _cache
+
+
+def _get_chunk_pool(model_size: str, workers: int) -> Optional[ProcessPoolExecutor]:
+    """
+    Process-wide pool of chunk workers, created on first use and then reused
+
+    Workers load the Whisper model once in their initializer, so only the
+    first long video pays for spawning them. Each worker keeps a full model
+    resident for the life of the process (WHISPER_CHUNK_WORKERS models on top
+    of the registry's copy). Returns None where child
+    processes cannot be started (daemonic processes such as Celery prefork
+    children); callers then transcribe serially.
+    """
+    global _chunk_pool, _chunk_pool_config
+    if multiprocessing.current_process().daemon:
+        logger.warning(
+            "Chunked transcription needs child processes, which daemonic workers cannot start; "
+            "transcribing serially (run the worker with a non-daemonic pool or set WHISPER_CHUNK_WORKERS=1)"
+        )
+        return None
+
+    with _chunk_pool_lock:
+        config = (model_size, workers)
+        if _chunk_pool is not None and _chunk_pool_config != config:
+            _chunk_pool.shutdown(wait=False, cancel_futures=True)
+            _chunk_pool = None
+        if _chunk_pool is None:
+            num_threads = max((os.cpu_count() or 1) // workers, 1)
+            _chunk_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_chunk_worker,
+                initargs=(model_size, num_threads)
+            )
+            _chunk_pool_config = config
+            logger.info(f"Started {workers} Whisper {model_size} chunk workers")
+        return _chunk_pool
+
+
+def _discard_chunk_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a pool that failed (e.g. a worker died) so the next call starts fresh"""
+    global _chunk_pool
+    with _chunk_pool_lock:
+        if _chunk_pool is pool:
+            _chunk_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _init_chunk_worker(model_size: str, num_threads: int) -> None:
+    global _worker_model
+    import torch
+
+    torch.set_num_threads(num_threads)
+    _worker_model = whisper.load_model(model_size)
+
+
+def _transcribe_chunk(
+    audio: np.ndarray,
+    offset: float,
+    language: Optional[str],
+    word_timestamps: bool
+) -> Tuple[List[Dict[str, Any]], str]:
+    """Transcribe one chunk in a worker; returns global-time segments and the chunk language"""
+    result = _worker_model.transcribe(
+        audio,
+        language=language,
+        task="transcribe",
+        word_timestamps=word_timestamps,
+        fp16=False
+    )
+    return shift_segments(result["segments"], offset), result["language"]
+
+
+def shift_segments(segments: List[Dict[str, Any]], offset: float) -> List[Dict[str, Any]]:
+    """Copy segments (and their words) with offset seconds added to every timestamp"""
+    shifted = []
+    for segment in segments:
+        segment = dict(segment, start=segment["start"] + offset, end=segment["end"] + offset)
+        if segment.get("words"):
+            segment["words"] = [
+                dict(word, start=word["start"] + offset, end=word["end"] + offset)
+                for word in segment["words"]
+            ]
+        shifted.append(segment)
+    return shifted
+
+
+def merge_chunk_segments(chunks: List[Tuple[List[Dict[str, Any]], str]]) -> Dict[str, Any]:
+    """
+    Join per-chunk results (segments already in global time) into one result
+
+    The reported language is the one covering the most transcribed time.
+    """
+    segments = []
+    language_seconds: Dict[str, float] = {}
+    for chunk_segments, language in chunks:
+        for segment in chunk_segments:
+            segments.append(dict(segment, id=len(segments)))
+            language_seconds[language] = language_seconds.get(language, 0.0) + segment["end"] - segment["start"]
+
+    return {
+        "text": "".join(segment["text"] for segment in segments),
+        "segments": segments,
+        "language": max(language_seconds, key=language_seconds.get) if language_seconds else "unknown"
+    }
+
 
 class WhisperTranscriber:
     def __init__(self, model_size: str = "base"):
@@ -13,66 +153,194 @@ class WhisperTranscriber:
         model_size: tiny, base, small, medium, large, large-v2, large-v3
         """
         logger.info(f"Loading Whisper {model_size} model")
+        self.model_size = model_size
         self.model = whisper.load_model(model_size)
     
-    def transcribe(self, audio_path: str, language: str = None) -> Dict[str, Any]:
+    def transcribe(
+        self,
+        audio: Union[str, np.ndarray, None],
+        language: str = None,
+        word_timestamps: bool = False,
+        workers: Optional[int] = None,
+        chunk_seconds: Optional[float] = None,
+        min_duration: Optional[float] = None,
+        vad: Optional[bool] = None,
+        use_cache: bool = True
+    ) -> Dict[str, Any]:
         """
-        Transcribe audio file
+        Transcribe an audio file or 16 kHz mono float32 samples
+        
+        This is the single transcription entry point: language detection
+        happens inside the decode (pass language to skip it) and word
+        timings are included in the same pass when word_timestamps is set.
+        Samples streamed by VideoProcessor.extract_media(decode_audio=True)
+        or decode_audio avoid a temporary WAV file and a second decode.
+        
+        Results are cached by a hash of the decoded audio and the options
+        (TRANSCRIPT_CACHE_DIR, bounded by TRANSCRIPT_CACHE_MAX_BYTES), so retries and re-indexing of the same
+        soundtrack skip Whisper entirely.
+        
+        With vad enabled (WHISPER_VAD_ENABLED) an energy pre-pass keeps only
+        speech regions, so silence and quiet background are never decoded
+        and cannot produce hallucinated segments; timestamps are mapped back
+        to the original audio afterwards.
+        
+        With more than one worker (WHISPER_CHUNK_WORKERS, 1 by default), audio
+        of at least min_duration is cut in the middle of silences into chunks
+        of about chunk_seconds and transcribed in a process pool that holds
+        one Whisper model per process.
         
         Returns:
             {
                 'text': full transcription,
-                'segments': list of segments with timestamps,
-                'language': detected language
+                'segments': list of segments with timestamps (and 'words'
+                            when word_timestamps is set),
+                'language': detected language,
+                'vad': {'total_seconds', 'speech_seconds', 'skipped_fraction'}
+                       when the VAD pre-pass ran
             }
         """
+        if vad is None:
+            vad = settings.WHISPER_VAD_ENABLED
+        
+        source = audio if isinstance(audio, str) else "decoded audio"
+        try:
+            if isinstance(audio, str):
+                audio = whisper.load_audio(audio)
+        except Exception as e:
+            logger.error(f"Transcription failed: {e}")
+            return {"text": "", "segments": [], "language": "unknown"}
+        
+        if audio is None or len(audio) == 0:
+            return {"text": "", "segments": [], "language": "unknown"}
+        
+        cache = _transcript_cache() if use_cache else None
+        cache_key = None
+        if cache is not None:
+            cache_key = audio_cache_key(
+                audio,
+                model=self.model_size,
+                language=language,
+                word_timestamps=word_timestamps,
+                vad=[vad, settings.WHISPER_VAD_THRESHOLD_DB, settings.WHISPER_VAD_PADDING_SECONDS] if vad else False
+            )
+            cached = cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Transcript cache hit for {source}: {len(cached['segments'])} segments")
+                return cached
+        
+        mapping = None
+        vad_stats = None
+        if vad:
+            regions = detect_speech_regions(
+                audio,
+                threshold_db=settings.WHISPER_VAD_THRESHOLD_DB,
+                padding_seconds=settings.WHISPER_VAD_PADDING_SECONDS
+            )
+            total_seconds = len(audio) / SAMPLE_RATE
+            speech_seconds = sum(end - start for start, end in regions) / SAMPLE_RATE
+            vad_stats = {
+                "total_seconds": round(total_seconds, 2),
+                "speech_seconds": round(speech_seconds, 2),
+                "skipped_fraction": round(1 - speech_seconds / total_seconds, 4) if total_seconds else 0.0,
+            }
+            logger.info(f"VAD for {source}: {vad_stats}")
+            
+            if regions:
+                audio, mapping = compact_speech(audio, regions)
+        
+        if vad and mapping is None:
+            result = {"text": "", "segments": [], "language": language or "unknown"}
+        else:
+            result = self._transcribe_samples(
+                audio, language, word_timestamps, workers, chunk_seconds, min_duration
+            )
+            if result is None:
+                return {"text": "", "segments": [], "language": "unknown"}
+        
+        if mapping is not None:
+            result["segments"] = remap_segments(result["segments"], mapping)
+        if vad_stats is not None:
+            result["vad"] = vad_stats
+        
+        if cache is not None:
+            cache.put(cache_key, result)
+        
+        logger.info(f"Transcribed {source}: {len(result['segments'])} segments")
+        return result
+    
+    def _transcribe_samples(
+        self,
+        audio: np.ndarray,
+        language: Optional[str],
+        word_timestamps: bool,
+        workers: Optional[int],
+        chunk_seconds: Optional[float],
+        min_duration: Optional[float]
+    ) -> Optional[Dict[str, Any]]:
+        """Transcribe 16 kHz samples, in parallel chunks when long enough; None on failure"""
+        workers = workers or settings.WHISPER_CHUNK_WORKERS
+        chunk_seconds = chunk_seconds or settings.WHISPER_CHUNK_SECONDS
+        if min_duration is None:
+            min_duration = settings.WHISPER_PARALLEL_MIN_SECONDS
+        
+        chunks = []
+        if workers > 1 and len(audio) / SAMPLE_RATE >= min_duration:
+            chunks = plan_chunks(audio, target_seconds=chunk_seconds, max_seconds=chunk_seconds * 1.5)
+        
+        if len(chunks) >= 2:
+            pool = _get_chunk_pool(self.model_size, workers)
+            if pool is not None:
+                try:
+                    futures = [
+                        pool.submit(
+                            _transcribe_chunk, audio[start:end], start / SAMPLE_RATE, language, word_timestamps
+                        )
+                        for start, end in chunks
+                    ]
+                    result = merge_chunk_segments([future.result() for future in futures])
+                    logger.info(f"Transcribed {len(chunks)} chunks on {workers} processes")
+                    return result
+                except Exception as e:
+                    _discard_chunk_pool(pool)
+                    logger.warning(
+                        f"Chunked transcription of {len(chunks)} chunks failed, "
+                        f"falling back to a single serial pass: {e}"
+                    )
+        
         try:
-            result = self.model.transcribe(
-                audio_path,
+            return self.model.transcribe(
+                audio,
                 language=language,
                 task="transcribe",
+                word_timestamps=word_timestamps,
                 fp16=False  # Set to True if using GPU
             )
-            
-            logger.info(f"Transcribed {audio_path}: {len(result['segments'])} segments")
-            return result
-            
         except Exception as e:
             logger.error(f"Transcription failed: {e}")
-            return {
-                "text": "",
-                "segments": [],
-                "language": "unknown"
-            }
+            return None
     
-    def transcribe_with_word_timestamps(self, audio_path: str) -> List[Dict[str, Any]]:
+    def transcribe_with_word_timestamps(self, audio: Union[str, np.ndarray]) -> List[Dict[str, Any]]:
         """Transcribe with word-level timestamps"""
-        try:
-            result = self.model.transcribe(
-                audio_path,
-                word_timestamps=True
-            )
-            
-            words = []
-            for segment in result["segments"]:
-                for word_info in segment.get("words", []):
-                    words.append({
-                        "word": word_info["word"],
-                        "start": word_info["start"],
-                        "end": word_info["end"],
-                        "probability": word_info.get("probability", 0.0)
-                    })
-            
-            return words
-            
-        except Exception as e:
-            logger.error(f"Word-level transcription failed: {e}")
-            return []
+        result = self.transcribe(audio, word_timestamps=True)
+        
+        words = []
+        for segment in result["segments"]:
+            for word_info in segment.get("words", []):
+                words.append({
+                    "word": word_info["word"],
+                    "start": word_info["start"],
+                    "end": word_info["end"],
+                    "probability": word_info.get("probability", 0.0)
+                })
+        
+        return words
     
-    def detect_language(self, audio_path: str) -> str:
-        """Detect the language of the audio"""
+    def detect_language(self, audio: Union[str, np.ndarray]) -> str:
+        """Detect the language of the audio (a file path or 16 kHz float32 samples)"""
         try:
-            audio = whisper.load_audio(audio_path)
+            if isinstance(audio, str):
+                audio = whisper.load_audio(audio)
             audio = whisper.pad_or_trim(audio)
             
             mel = whisper.log_mel_spectrogram(audio).to(self.model.device)
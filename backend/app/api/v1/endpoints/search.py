@@ -3,7 +3,7 @@ import logging
 
 from app.schemas.search import SearchResponse
 from app.services.search_service import SearchService
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_current_user, get_search_service
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -12,9 +12,9 @@ logger = logging.getLogger(__name__)
 async def search_videos(
     query: str,
     limit: int = 20,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    service: SearchService = Depends(get_search_service)
 ):
-    service = SearchService()
     results = await service.search(query, current_user["id"], limit)
     return results
 
@@ -22,8 +22,8 @@ async def search_videos(
 async def find_similar_clips(
     clip_id: str,
     limit: int = 10,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    service: SearchService = Depends(get_search_service)
 ):
-    service = SearchService()
     results = await service.find_similar(clip_id, current_user["id"], limit)
     return results
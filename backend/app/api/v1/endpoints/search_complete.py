@@ -1,14 +1,16 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import List, Optional
 import logging
 
 from app.schemas.search_complete import (
     SearchResponse,
     SearchFilters,
     SearchHistoryItem,
-    TrackViewRequest
+    TrackViewRequest,
+    TrackViewBatchRequest
 )
 from app.services.search_service_complete import SearchService
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_current_user, get_complete_search_service
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -19,7 +21,8 @@ async def search_videos(
     query: str,
     limit: int = 20,
     video_ids: Optional[List[str]] = Query(None),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    service: SearchService = Depends(get_complete_search_service)
 ):
     """
     Search videos using natural language
@@ -35,7 +38,6 @@ async def search_videos(
     if video_ids:
         filters = SearchFilters(video_ids=video_ids)
     
-    service = SearchService()
     results = await service.search(query, current_user["id"], filters, limit)
     return results
 
@@ -43,10 +45,10 @@ async def search_videos(
 @router.get("/history", response_model=List[SearchHistoryItem])
 async def get_search_history(
     limit: int = 50,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    service: SearchService = Depends(get_complete_search_service)
 ):
     """Get user's search history"""
-    service = SearchService()
     history = await service.get_search_history(current_user["id"], limit)
     return history
 
@@ -54,7 +56,8 @@ async def get_search_history(
 @router.post("/track-view")
 async def track_clip_view(
     request: TrackViewRequest,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    service: SearchService = Depends(get_complete_search_service)
 ):
     """
     Track when user views a clip
@@ -64,7 +67,6 @@ async def track_clip_view(
     - User starts playing a clip
     - User watches a clip for X seconds
     """
-    service = SearchService()
     success = await service.track_clip_view(
         user_id=current_user["id"],
         clip_id=request.clip_id,
@@ -78,6 +80,30 @@ async def track_clip_view(
     return {"status": "tracked", "clip_id": request.clip_id}
 
 
+@router.post("/track-views")
+async def track_clip_views(
+    request: TrackViewBatchRequest,
+    current_user: dict = Depends(get_current_user),
+    service: SearchService = Depends(get_complete_search_service)
+):
+    """
+    Track several view events in one call
+    
+    Use this from clients that buffer clicks and watch-progress ticks
+    locally. Events are queued and inserted in batches.
+    """
+    accepted = await service.track_clip_views(
+        user_id=current_user["id"],
+        events=[event.model_dump() for event in request.events]
+    )
+    
+    return {
+        "status": "tracked",
+        "accepted": accepted,
+        "dropped": len(request.events) - accepted
+    }
+
+
 @router.get("/analytics/popular-clips")
 async def get_popular_clips(
     days: int = 7,
@@ -9,6 +9,94 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "change-this-in-production"
     CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:5173", "*"]
     
+    # AI models
+    CLIP_MODEL_NAME: str = "openai/clip-vit-base-patch32"
+    SBERT_MODEL_NAME: str = "all-MiniLM-L6-v2"
+    SBERT_BATCH_SIZE: int = 64
+    # Inference backend per model: "torch", "torch-int8" (dynamic quantization) or "onnx"
+    CLIP_BACKEND: str = "torch"
+    SBERT_BACKEND: str = "torch"
+    ONNX_MODEL_DIR: str = "/tmp/clipmind/onnx"
+    ONNX_NUM_THREADS: int = 0
+    WHISPER_MODEL_SIZE: str = "base"
+    # Audio longer than WHISPER_PARALLEL_MIN_SECONDS is transcribed in silence-aligned chunks
+    # when WHISPER_CHUNK_WORKERS > 1. Each chunk worker is a separate process holding its own
+    # Whisper model (on top of the registry's copy), so memory grows by one model per worker
+    # in every host process (e.g. per Celery worker): size it as cores / worker concurrency
+    WHISPER_CHUNK_WORKERS: int = 1
+    WHISPER_CHUNK_SECONDS: float = 120.0
+    WHISPER_PARALLEL_MIN_SECONDS: float = 300.0
+    # Energy VAD: only audio louder than the threshold (plus padding) reaches Whisper
+    WHISPER_VAD_ENABLED: bool = True
+    WHISPER_VAD_THRESHOLD_DB: float = -45.0
+    WHISPER_VAD_PADDING_SECONDS: float = 0.3
+    # Transcripts cached by audio content hash ("" disables), least recently used
+    # entries evicted beyond TRANSCRIPT_CACHE_MAX_BYTES (0 = unbounded)
+    TRANSCRIPT_CACHE_DIR: str = "/tmp/clipmind/transcripts"
+    TRANSCRIPT_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    PRELOAD_WORKER_MODELS: bool = True
+    
+    # Scene detection: with more than one worker, long videos are scored in keyframe-aligned
+    # chunks across that many processes per call. Celery children already run concurrently,
+    # so keep workers x worker concurrency within the core count
+    SCENE_DETECTION_WORKERS: int = 1
+    SCENE_DETECTION_CHUNK_SECONDS: float = 60.0
+    SCENE_DETECTION_PARALLEL_MIN_SECONDS: float = 300.0
+    
+    # Visual sampling (K frames per scene, optionally mean-pooled into one vector)
+    FRAMES_PER_SCENE: int = 3
+    POOL_SCENE_EMBEDDINGS: bool = False
+    # Near-duplicate frames (dHash Hamming distance <= max) are not embedded
+    FRAME_DEDUP_ENABLED: bool = True
+    FRAME_DEDUP_MAX_DISTANCE: int = 5
+    # Visual embedding pipeline (0 inference threads keeps torch's default)
+    EMBEDDING_PREPROCESS_WORKERS: int = 2
+    EMBEDDING_QUEUE_SIZE: int = 4
+    EMBEDDING_INFERENCE_THREADS: int = 0
+    
+    # Vector database ("pinecone" or "local")
+    VECTOR_STORE_BACKEND: str = "pinecone"
+    LOCAL_VECTOR_STORE_DIR: str = ""
+    # Local snapshots are merged and rewritten at most this often while writes arrive
+    LOCAL_VECTOR_STORE_FLUSH_SECONDS: float = 30.0
+    PINECONE_API_KEY: str = ""
+    PINECONE_ENVIRONMENT: str = "us-east-1-aws"
+    PINECONE_INDEX_NAME: str = "clipmind-embeddings"
+    
+    # One index per embedding model; names default to "<PINECONE_INDEX_NAME>-<modality>"
+    VISUAL_EMBEDDING_DIM: int = 512  # CLIP ViT-B/32
+    TEXT_EMBEDDING_DIM: int = 384  # all-MiniLM-L6-v2
+    PINECONE_VISUAL_INDEX_NAME: str = ""
+    PINECONE_TEXT_INDEX_NAME: str = ""
+    
+    # Search
+    SEARCH_WARMUP_ON_STARTUP: bool = True
+    # A failed warm-up is retried, doubling the delay up to the maximum
+    SEARCH_WARMUP_RETRY_SECONDS: float = 2.0
+    SEARCH_WARMUP_MAX_RETRY_SECONDS: float = 60.0
+    SEARCH_EXECUTOR_WORKERS: int = 8
+    SEARCH_BRANCH_TIMEOUT_MS: int = 1500
+    
+    # Query embedding cache: in-process LRU, plus Redis when a URL is set
+    # (bump QUERY_CACHE_VERSION to invalidate every cached vector)
+    QUERY_CACHE_MAX_ENTRIES: int = 10000
+    QUERY_CACHE_TTL_SECONDS: float = 3600.0
+    QUERY_CACHE_REDIS_URL: str = ""
+    QUERY_CACHE_REDIS_TTL_SECONDS: int = 86400
+    QUERY_CACHE_VERSION: str = "1"
+    
+    # Query encoder micro-batching: concurrent cache misses share one forward
+    # pass per model (waiting at most MAX_WAIT_MS for up to MAX_SIZE queries)
+    QUERY_BATCH_ENABLED: bool = True
+    QUERY_BATCH_MAX_SIZE: int = 32
+    QUERY_BATCH_MAX_WAIT_MS: float = 5.0
+    
+    # Write-behind analytics
+    ANALYTICS_BUFFER_MAX_SIZE: int = 10000
+    ANALYTICS_FLUSH_BATCH_SIZE: int = 500
+    ANALYTICS_FLUSH_INTERVAL_SECONDS: float = 2.0
+    INTERACTION_FLUSH_INTERVAL_SECONDS: float = 1.0
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
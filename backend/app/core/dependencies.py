@@ -1,7 +1,31 @@
-from fastapi import Depends
+from fastapi import Depends, HTTPException, Request
 from fastapi.security import HTTPBearer
 
 security = HTTPBearer(auto_error=False)
 
 async def get_current_user():
     return {"id": "user-1", "email": "demo@clipmind.com"}
+
+def _ready_service(request: Request, name: str):
+    service = getattr(request.app.state, name, None)
+    if service is None or not getattr(request.app.state, "search_ready", False):
+        raise HTTPException(status_code=503, detail="Search service is warming up")
+    return service
+
+def get_search_service(request: Request):
+    """Return the basic SearchService (app.services.search_service) built in the lifespan"""
+    return _ready_service(request, "search_service")
+
+def get_complete_search_service(request: Request):
+    """
+    Return the enriched SearchService (app.services.search_service_complete)
+    
+    The search_complete router is not mounted yet, so this service is not
+    imported or warmed up at startup; it is built on first use and kept on
+    app.state.
+    """
+    service = getattr(request.app.state, "complete_search_service", None)
+    if service is None:
+        from app.services.search_service_complete import SearchService
+        service = request.app.state.complete_search_service = SearchService()
+    return service
@@ -1,21 +1,71 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
+import asyncio
 import time
 import logging
 
 from app.api.v1.router import api_router
+from app.ai.query_batcher import query_batcher_stats, stop_query_batchers
 from app.core.config import settings
+from app.services.search_service import SearchService
+from app.services.search_analytics import write_buffers
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+async def _warm_up_search(app: FastAPI):
+    """
+    Load search models off the event loop, then mark the API ready
+    
+    A failed warm-up (e.g. the vector database is briefly unreachable) is
+    retried with exponential backoff, so the process recovers instead of
+    answering 503 until it is restarted.
+    """
+    delay = settings.SEARCH_WARMUP_RETRY_SECONDS
+    while True:
+        try:
+            await asyncio.to_thread(app.state.search_service.warm_up)
+            app.state.search_ready = True
+            return
+        except Exception as e:
+            logger.error(f"Search warm-up failed, retrying in {delay:.0f}s: {e}", exc_info=True)
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, settings.SEARCH_WARMUP_MAX_RETRY_SECONDS)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One SearchService per process, sharing the models in the model registry
+    app.state.search_service = SearchService()
+    app.state.search_ready = not settings.SEARCH_WARMUP_ON_STARTUP
+    for buffer in write_buffers:
+        buffer.start()
+    
+    warmup_task = None
+    if settings.SEARCH_WARMUP_ON_STARTUP:
+        warmup_task = asyncio.create_task(_warm_up_search(app))
+    
+    yield
+    
+    if warmup_task and not warmup_task.done():
+        warmup_task.cancel()
+    
+    # Write out any analytics and interactions still buffered
+    for buffer in write_buffers:
+        await asyncio.to_thread(buffer.stop)
+    await asyncio.to_thread(stop_query_batchers)
+
+
 app = FastAPI(
     title=settings.APP_NAME,
     version="0.1.0",
     description="AI-Powered Video Memory & Semantic Search Engine",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -49,6 +99,26 @@ async def root():
 async def health_check():
     return {"status": "healthy", "service": "clipmind-api"}
 
+@app.get("/ready")
+async def readiness_check():
+    """Report ready only once search models are loaded and warmed up"""
+    from app.ai.embedding_cache import get_query_embedding_cache
+    from app.ai.model_registry import model_registry
+    
+    if not getattr(app.state, "search_ready", False):
+        return JSONResponse(
+            status_code=503,
+            content={"status": "warming_up", "service": "clipmind-api"},
+        )
+    return {
+        "status": "ready",
+        "service": "clipmind-api",
+        "models": model_registry.stats(),
+        "query_embedding_cache": get_query_embedding_cache().stats(),
+        "query_batchers": query_batcher_stats(),
+        "write_buffers": [buffer.stats() for buffer in write_buffers],
+    }
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
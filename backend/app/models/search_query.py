@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Float, DateTime, Text, ForeignKey
+from sqlalchemy import Column, String, Integer, Float, Date, DateTime, Text, ForeignKey
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.models.base import Base
@@ -48,3 +48,13 @@ class ClipInteraction(Base):
     # Relationships
     user = relationship("User")
     clip = relationship("Clip")
+
+
+class ClipViewDaily(Base):
+    """Per-user, per-clip view counts bucketed by day (rollup of clip_interactions)"""
+    __tablename__ = "clip_view_daily"
+
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    clip_id = Column(String, ForeignKey("clips.id", ondelete="CASCADE"), primary_key=True)
+    view_count = Column(Integer, nullable=False, default=0, server_default="0")
@@ -18,3 +18,4 @@ class User(Base):
     videos = relationship("Video", back_populates="user", cascade="all, delete-orphan")
     projects = relationship("Project", back_populates="user", cascade="all, delete-orphan")
     compilations = relationship("Compilation", back_populates="user", cascade="all, delete-orphan")
+    search_queries = relationship("SearchQuery", back_populates="user", cascade="all, delete-orphan")
@@ -1,14 +1,17 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import logging
-import os
+import numpy as np
 
 # Import AI models and processors
-from app.workers.video_processor import VideoProcessor
+from app.workers.video_processor import AUDIO_SAMPLE_RATE, VideoProcessor
 from app.workers.scene_detector import SceneDetector
-from app.ai.clip_model import CLIPEmbedder
-from app.ai.whisper_model import WhisperTranscriber
-from app.ai.sentence_bert import SentenceBERTEmbedder
-from app.search.pinecone_client import PineconeClient
+from app.workers.frame_sampler import embed_scene_frames
+from app.ai.model_registry import (
+    get_clip_embedder,
+    get_text_embedder,
+    get_whisper_handle,
+)
+from app.search.vector_store import upsert_vectors_by_modality
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -22,14 +25,9 @@ class AIProcessingWorkflow:
     def __init__(self):
         self.video_processor = VideoProcessor()
         self.scene_detector = SceneDetector()
-        self.clip_model = CLIPEmbedder()
-        self.transcriber = WhisperTranscriber(model_size="base")
-        self.text_embedder = SentenceBERTEmbedder()
-        self.pinecone_client = PineconeClient(
-            api_key=settings.PINECONE_API_KEY,
-            environment=settings.PINECONE_ENVIRONMENT,
-            index_name=settings.PINECONE_INDEX_NAME
-        )
+        self.clip_model = get_clip_embedder()
+        self.whisper = get_whisper_handle()
+        self.text_embedder = get_text_embedder()
     
     async def execute(self, workflow_id: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """Execute complete AI processing pipeline"""
@@ -42,16 +40,19 @@ class AIProcessingWorkflow:
             # Step 1: Detect scenes
             scenes = await self._detect_scenes(video_url)
             
-            # Step 2: Extract and transcribe audio
-            transcript = await self._transcribe_audio(video_url)
+            # Step 2: Extract audio
+            media = await self._extract_media(video_url)
+            
+            # Step 3: Transcribe audio
+            transcript = await self._transcribe_audio(media["audio"])
             
-            # Step 3: Generate visual embeddings
+            # Step 4: Generate visual embeddings
             visual_embeddings = await self._generate_visual_embeddings(video_url, scenes)
             
-            # Step 4: Generate text embeddings
+            # Step 5: Generate text embeddings
             text_embeddings = await self._generate_text_embeddings(transcript)
             
-            # Step 5: Index everything in Pinecone
+            # Step 6: Index everything in Pinecone
             await self._index_embeddings(video_id, visual_embeddings, text_embeddings)
             
             return {
@@ -73,52 +74,41 @@ class AIProcessingWorkflow:
         scenes = self.scene_detector.detect_scenes_adaptive(video_url)
         return scenes
     
-    async def _transcribe_audio(self, video_url: str) -> Dict[str, Any]:
-        """Transcribe audio using Whisper"""
-        logger.info(f"Transcribing audio: {video_url}")
+    async def _extract_media(self, video_url: str) -> Dict[str, Any]:
+        """Decode 16 kHz mono audio for Whisper straight into memory"""
+        logger.info(f"Extracting audio: {video_url}")
         
-        # Extract audio first
-        audio_path = f"/tmp/{os.path.basename(video_url)}_audio.wav"
-        self.video_processor.extract_audio(video_url, audio_path)
-        
-        # Transcribe
-        transcript = self.transcriber.transcribe(audio_path)
+        return self.video_processor.extract_media(video_url, decode_audio=True)
+    
+    async def _transcribe_audio(self, audio: Optional[np.ndarray]) -> Dict[str, Any]:
+        """Transcribe audio using Whisper"""
+        if audio is None:
+            return {"text": "", "segments": [], "language": "unknown"}
         
-        # Cleanup
-        if os.path.exists(audio_path):
-            os.remove(audio_path)
+        logger.info(f"Transcribing {len(audio) / AUDIO_SAMPLE_RATE:.1f}s of audio")
         
-        return transcript
+        with self.whisper.lock:
+            return self.whisper.model.transcribe(audio)
     
     async def _generate_visual_embeddings(
         self,
         video_url: str,
         scenes: List[Dict[str, Any]]
     ) -> List[Dict[str, Any]]:
-        """Generate CLIP embeddings for video frames"""
-        logger.info(f"Generating visual embeddings: {video_url}")
-        
-        # Extract frames (1 per scene or 1 per second)
-        frames_dir = f"/tmp/{os.path.basename(video_url)}_frames"
-        frames = self.video_processor.extract_frames(video_url, frames_dir, fps=1)
-        
-        # Generate embeddings
-        embeddings = self.clip_model.encode_images_batch(frames, batch_size=8)
-        
-        # Combine with scene info
-        result = []
-        for i, (embedding, scene) in enumerate(zip(embeddings, scenes)):
-            result.append({
-                "scene_number": i,
-                "embedding": embedding,
-                "start_time": scene["start_time"],
-                "end_time": scene["end_time"]
-            })
-        
-        # Cleanup frames
-        if os.path.exists(frames_dir):
-            import shutil
-            shutil.rmtree(frames_dir)
+        """Generate CLIP embeddings for frames sampled inside each scene"""
+        logger.info(f"Generating visual embeddings for {len(scenes)} scenes")
+        
+        result, _ = embed_scene_frames(
+            self.video_processor,
+            self.clip_model,
+            video_url,
+            scenes,
+            frames_per_scene=settings.FRAMES_PER_SCENE,
+            pool=settings.POOL_SCENE_EMBEDDINGS,
+            duration=self.video_processor.extract_metadata(video_url).get("duration"),
+            dedup=settings.FRAME_DEDUP_ENABLED,
+            dedup_max_distance=settings.FRAME_DEDUP_MAX_DISTANCE
+        )
         
         return result
     
@@ -129,19 +119,20 @@ class AIProcessingWorkflow:
         """Generate Sentence-BERT embeddings for transcript"""
         logger.info(f"Generating text embeddings")
         
-        result = []
+        # Embed all segments in one batched pass
+        embeddings, segments = self.text_embedder.encode_segments(
+            transcript.get("segments", [])
+        )
         
-        # Generate embedding for each segment
-        for segment in transcript.get("segments", []):
-            embedding = self.text_embedder.encode(segment["text"])
-            result.append({
+        return [
+            {
                 "text": segment["text"],
                 "embedding": embedding,
                 "start_time": segment["start"],
                 "end_time": segment["end"]
-            })
-        
-        return result
+            }
+            for embedding, segment in zip(embeddings, segments)
+        ]
     
     async def _index_embeddings(
         self,
@@ -182,10 +173,7 @@ class AIProcessingWorkflow:
                 }
             })
         
-        # Upsert to Pinecone in batches
-        batch_size = 100
-        for i in range(0, len(vectors), batch_size):
-            batch = vectors[i:i + batch_size]
-            self.pinecone_client.upsert_vectors(batch)
+        # Upsert to Pinecone in batches, each modality into its own index
+        upsert_vectors_by_modality(vectors, batch_size=100)
         
         logger.info(f"Indexed {len(vectors)} vectors in Pinecone")
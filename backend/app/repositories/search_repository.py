@@ -1,10 +1,14 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc
-from typing import List, Optional
-from datetime import datetime
+from sqlalchemy import and_, desc, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import Dict, List, Optional, Tuple
+from collections import Counter
+from datetime import datetime, timedelta
 import time
 
-from app.models.search_query import SearchQuery, SearchResult, ClipInteraction
+from app.models.clip import Clip
+from app.models.video import Video
+from app.models.search_query import SearchQuery, SearchResult, ClipInteraction, ClipViewDaily
 import logging
 
 logger = logging.getLogger(__name__)
@@ -14,6 +18,30 @@ class SearchRepository:
     def __init__(self, db: Session):
         self.db = db
     
+    def get_clips_with_videos(
+        self,
+        clip_ids: List[str],
+        user_id: Optional[str] = None
+    ) -> Dict[str, Tuple[Clip, Video]]:
+        """
+        Load clips and their parent videos in a single joined query
+        
+        Returns a dict keyed by clip id. Clips whose video is missing (or not
+        owned by user_id, when given) are left out.
+        """
+        if not clip_ids:
+            return {}
+        
+        query = (
+            self.db.query(Clip, Video)
+            .join(Video, Clip.video_id == Video.id)
+            .filter(Clip.id.in_(set(clip_ids)))
+        )
+        if user_id is not None:
+            query = query.filter(Video.user_id == user_id)
+        
+        return {clip.id: (clip, video) for clip, video in query.all()}
+    
     def create_search_query(
         self,
         search_id: str,
@@ -65,6 +93,51 @@ class SearchRepository:
         logger.info(f"Saved {len(search_results)} search results")
         return search_results
     
+    def save_search_analytics_batch(self, searches: List[dict]) -> int:
+        """
+        Save many searches and their results with multi-row inserts and a
+        single commit
+        
+        searches format: [
+            {
+                'search_id': 'search_123', 'user_id': 'user-1',
+                'query_text': '...', 'results_count': 2,
+                'processing_time_ms': 85.0, 'created_at': datetime,
+                'results': [{'clip_id': 'clip_1', 'relevance_score': 0.9}]
+            }
+        ]
+        """
+        if not searches:
+            return 0
+        
+        query_rows = []
+        result_rows = []
+        for search in searches:
+            query_rows.append({
+                'id': search['search_id'],
+                'user_id': search['user_id'],
+                'query_text': search['query_text'],
+                'results_count': search['results_count'],
+                'processing_time_ms': search['processing_time_ms'],
+                'created_at': search['created_at'],
+            })
+            for rank, result in enumerate(search['results'], start=1):
+                result_rows.append({
+                    'id': f"{search['search_id']}_result_{rank}",
+                    'search_query_id': search['search_id'],
+                    'clip_id': result['clip_id'],
+                    'rank': rank,
+                    'relevance_score': result['relevance_score'],
+                })
+        
+        self.db.execute(insert(SearchQuery), query_rows)
+        if result_rows:
+            self.db.execute(insert(SearchResult), result_rows)
+        self.db.commit()
+        
+        logger.info(f"Saved {len(query_rows)} search queries and {len(result_rows)} results")
+        return len(query_rows)
+    
     def get_user_search_history(
         self,
         user_id: str,
@@ -88,22 +161,89 @@ class SearchRepository:
         search_query_id: Optional[str] = None,
         duration_seconds: Optional[float] = None
     ) -> ClipInteraction:
-        """Track user interaction with clip"""
-        interaction = ClipInteraction(
-            id=interaction_id,
-            user_id=user_id,
-            clip_id=clip_id,
-            search_query_id=search_query_id,
-            action=action,
-            duration_seconds=duration_seconds
-        )
+        """
+        Track a single user interaction with a clip
         
-        self.db.add(interaction)
-        self.db.commit()
-        self.db.refresh(interaction)
+        Goes through save_interactions_batch so views also update the
+        clip_view_daily rollup.
+        """
+        self.save_interactions_batch([{
+            'id': interaction_id,
+            'user_id': user_id,
+            'clip_id': clip_id,
+            'search_query_id': search_query_id,
+            'action': action,
+            'duration_seconds': duration_seconds,
+            'created_at': datetime.utcnow(),
+        }])
         
         logger.info(f"Interaction tracked: {action} on clip {clip_id}")
-        return interaction
+        return self.db.get(ClipInteraction, interaction_id)
+    
+    def save_interactions_batch(self, interactions: List[dict]) -> int:
+        """
+        Insert many interaction events with one multi-row insert and commit
+        
+        Each dict carries the ClipInteraction columns (id, user_id, clip_id,
+        search_query_id, action, duration_seconds, created_at). Searches are
+        persisted write-behind too, so an event can reference a search that
+        is not in search_queries yet; such references are stored as NULL
+        (the column's ON DELETE SET NULL state) rather than letting one
+        foreign key violation roll back the whole batch and its view rollups.
+        """
+        if not interactions:
+            return 0
+        
+        interactions = self._resolve_search_references(interactions)
+        self.db.execute(insert(ClipInteraction), interactions)
+        self._increment_view_rollups(interactions)
+        self.db.commit()
+        
+        logger.info(f"Inserted {len(interactions)} clip interactions")
+        return len(interactions)
+    
+    def _resolve_search_references(self, interactions: List[dict]) -> List[dict]:
+        """Copy of interactions with search_query_ids missing from search_queries set to None"""
+        referenced = {i['search_query_id'] for i in interactions if i.get('search_query_id')}
+        if not referenced:
+            return interactions
+        
+        existing = {
+            row.id for row in
+            self.db.query(SearchQuery.id).filter(SearchQuery.id.in_(referenced)).all()
+        }
+        missing = referenced - existing
+        if not missing:
+            return interactions
+        
+        logger.warning(
+            f"{len(missing)} searches referenced by clip interactions are not persisted; "
+            f"storing those interactions without a search link"
+        )
+        return [
+            dict(i, search_query_id=None) if i.get('search_query_id') in missing else i
+            for i in interactions
+        ]
+    
+    def _increment_view_rollups(self, interactions: List[dict]) -> None:
+        """Add the batch's view events to the daily clip_view_daily buckets"""
+        counts = Counter(
+            (i['user_id'], (i.get('created_at') or datetime.utcnow()).date(), i['clip_id'])
+            for i in interactions
+            if i['action'] == 'viewed'
+        )
+        if not counts:
+            return
+        
+        stmt = pg_insert(ClipViewDaily).values([
+            {'user_id': user_id, 'day': day, 'clip_id': clip_id, 'view_count': count}
+            for (user_id, day, clip_id), count in counts.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['user_id', 'day', 'clip_id'],
+            set_={'view_count': ClipViewDaily.view_count + stmt.excluded.view_count}
+        )
+        self.db.execute(stmt)
     
     def get_popular_clips(
         self,
@@ -111,31 +251,32 @@ class SearchRepository:
         days: int = 7,
         limit: int = 10
     ) -> List[dict]:
-        """Get most viewed clips for user in last N days"""
-        from datetime import timedelta
+        """
+        Get most viewed clips for user in the last N days
+        
+        Sums at most N daily buckets per clip from the clip_view_daily
+        rollup instead of counting raw interaction rows.
+        """
         from sqlalchemy import func
         
-        cutoff_date = datetime.utcnow() - timedelta(days=days)
+        first_day = (datetime.utcnow() - timedelta(days=max(days, 1) - 1)).date()
+        view_count = func.sum(ClipViewDaily.view_count).label('view_count')
         
         results = (
-            self.db.query(
-                ClipInteraction.clip_id,
-                func.count(ClipInteraction.id).label('view_count')
-            )
+            self.db.query(ClipViewDaily.clip_id, view_count)
             .filter(
                 and_(
-                    ClipInteraction.user_id == user_id,
-                    ClipInteraction.action == 'viewed',
-                    ClipInteraction.created_at >= cutoff_date
+                    ClipViewDaily.user_id == user_id,
+                    ClipViewDaily.day >= first_day
                 )
             )
-            .group_by(ClipInteraction.clip_id)
+            .group_by(ClipViewDaily.clip_id)
             .order_by(desc('view_count'))
             .limit(limit)
             .all()
         )
         
         return [
-            {'clip_id': r.clip_id, 'view_count': r.view_count}
+            {'clip_id': r.clip_id, 'view_count': int(r.view_count)}
             for r in results
         ]
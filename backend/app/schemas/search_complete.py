@@ -31,6 +31,7 @@ class SearchResponse(BaseModel):
     total_results: int
     clips: List[ClipResult]
     processing_time_ms: float
+    degraded_modalities: List[str] = []  # Branches that timed out or failed
 
 
 class SearchHistoryItem(BaseModel):
@@ -45,3 +46,7 @@ class TrackViewRequest(BaseModel):
     clip_id: str
     search_query_id: Optional[str] = None
     duration_seconds: Optional[float] = None
+
+
+class TrackViewBatchRequest(BaseModel):
+    events: List[TrackViewRequest]
@@ -0,0 +1,342 @@
+import atexit
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+from typing import List, Dict, Any, Optional
+import numpy as np
+
+from app.core.config import settings
+from app.search.vector_store import VectorStore
+
+logger = logging.getLogger(__name__)
+
+
+def _matches(metadata: Dict[str, Any], filter: Dict[str, Any]) -> bool:
+    """Evaluate a Pinecone-style metadata filter (equality, $eq, $ne, $in, $nin)"""
+    for field, condition in filter.items():
+        if field not in metadata:
+            return False
+        value = metadata[field]
+        if isinstance(condition, dict):
+            for op, operand in condition.items():
+                if op == "$eq" and value != operand:
+                    return False
+                if op == "$ne" and value == operand:
+                    return False
+                if op == "$in" and value not in operand:
+                    return False
+                if op == "$nin" and value in operand:
+                    return False
+                if op not in ("$eq", "$ne", "$in", "$nin"):
+                    raise ValueError(f"Unsupported filter operator: {op}")
+        elif value != condition:
+            return False
+    return True
+
+
+class _Namespace:
+    """Row-major float32 matrix of unit vectors plus ids and metadata"""
+
+    def __init__(self, dimension: int):
+        self.matrix = np.empty((0, dimension), dtype=np.float32)
+        self.ids: List[str] = []
+        self.metadata: List[Dict[str, Any]] = []
+        self.positions: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def upsert(self, ids: List[str], rows: np.ndarray, metadata: List[Dict[str, Any]]) -> None:
+        # Repeated ids within one batch: the last occurrence wins
+        latest: Dict[str, tuple] = {}
+        for vector_id, row, meta in zip(ids, rows, metadata):
+            latest[vector_id] = (row, meta)
+
+        updates = [
+            (self.positions[vector_id], row, meta)
+            for vector_id, (row, meta) in latest.items()
+            if vector_id in self.positions
+        ]
+        new_rows = [
+            (vector_id, row, meta)
+            for vector_id, (row, meta) in latest.items()
+            if vector_id not in self.positions
+        ]
+
+        # Grow the matrix first so a failure leaves ids and positions untouched
+        if new_rows:
+            self.matrix = np.vstack([self.matrix, np.stack([row for _, row, _ in new_rows])])
+            for offset, (vector_id, _, _) in enumerate(new_rows):
+                self.positions[vector_id] = len(self.ids) + offset
+            self.ids.extend(vector_id for vector_id, _, _ in new_rows)
+            self.metadata.extend(meta for _, _, meta in new_rows)
+
+        for position, row, meta in updates:
+            self.matrix[position] = row
+            self.metadata[position] = meta
+
+    def keep(self, mask: np.ndarray) -> None:
+        self.matrix = np.ascontiguousarray(self.matrix[mask])
+        self.ids = [vector_id for vector_id, k in zip(self.ids, mask) if k]
+        self.metadata = [meta for meta, k in zip(self.metadata, mask) if k]
+        self.positions = {vector_id: i for i, vector_id in enumerate(self.ids)}
+
+    def filter_mask(self, filter: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        if not filter:
+            return None
+        return np.fromiter((_matches(meta, filter) for meta in self.metadata), dtype=bool, count=len(self))
+
+
+class LocalVectorStore(VectorStore):
+    """
+    In-process vector index with the PineconeClient surface
+
+    Each namespace is a NumPy matrix of L2-normalised float32 rows, so cosine
+    similarity is one matrix-vector product and top-k selection uses
+    argpartition.
+
+    With persist_path set, writes are buffered and written out by flush(),
+    which runs on demand, at most every flush_interval_seconds while writes
+    arrive, and at interpreter exit. Several processes (API replicas, Celery
+    workers) may share one snapshot: flush() takes an exclusive file lock,
+    reloads the snapshot if another process replaced it, replays this
+    process's pending writes on top and writes the merged result. Queries
+    reload a changed snapshot, keeping pending local writes.
+    """
+
+    def __init__(
+        self,
+        dimension: Optional[int] = None,
+        persist_path: Optional[str] = None,
+        flush_interval_seconds: Optional[float] = None
+    ):
+        self.dimension = dimension
+        self.persist_path = persist_path
+        self.flush_interval_seconds = (
+            settings.LOCAL_VECTOR_STORE_FLUSH_SECONDS if flush_interval_seconds is None else flush_interval_seconds
+        )
+        self._namespaces: Dict[str, _Namespace] = {}
+        self._lock = threading.RLock()
+        self._snapshot_mtime = None
+        # Writes not yet in the snapshot, replayed when merging with other processes
+        self._pending: List[tuple] = []
+        self._last_flush = time.monotonic()
+
+        if persist_path:
+            if os.path.exists(persist_path):
+                self.load_snapshot(persist_path)
+            atexit.register(self.flush)
+
+    def upsert_vectors(
+        self,
+        vectors: List[Dict[str, Any]],
+        namespace: str = ""
+    ) -> bool:
+        """Insert or update vectors; rows are normalised before storage"""
+        if not vectors:
+            return True
+        try:
+            rows = _normalize(np.asarray([v['values'] for v in vectors], dtype=np.float32))
+            with self._lock:
+                if self.dimension is None:
+                    self.dimension = rows.shape[1]
+                if rows.shape[1] != self.dimension:
+                    raise ValueError(f"Vector dimension {rows.shape[1]} does not match index dimension {self.dimension}")
+
+                self._apply(("upsert", namespace, [v['id'] for v in vectors], rows,
+                             [dict(v.get('metadata') or {}) for v in vectors]))
+            self._maybe_flush()
+
+            logger.info(f"Upserted {len(vectors)} vectors to local index")
+            return True
+        except Exception as e:
+            logger.error(f"Vector upsert failed: {e}")
+            return False
+
+    def query(
+        self,
+        query_vector: np.ndarray,
+        top_k: int = 10,
+        filter: Optional[Dict[str, Any]] = None,
+        namespace: str = ""
+    ) -> List[Dict[str, Any]]:
+        """Cosine top-k over the namespace, restricted by the metadata filter"""
+        try:
+            self._reload_if_changed()
+            with self._lock:
+                ns = self._namespaces.get(namespace)
+                if ns is None or len(ns) == 0 or top_k <= 0:
+                    return []
+
+                query = _normalize(np.asarray(query_vector, dtype=np.float32).reshape(1, -1))[0]
+                scores = ns.matrix @ query
+
+                mask = ns.filter_mask(filter)
+                candidates = np.flatnonzero(mask) if mask is not None else None
+                if candidates is not None:
+                    scores = scores[candidates]
+
+                k = min(top_k, len(scores))
+                if k == 0:
+                    return []
+                top = np.argpartition(-scores, k - 1)[:k]
+                top = top[np.argsort(-scores[top], kind="stable")]
+                rows = candidates[top] if candidates is not None else top
+
+                matches = [
+                    {
+                        "id": ns.ids[row],
+                        "score": float(scores[i]),
+                        "metadata": ns.metadata[row]
+                    }
+                    for i, row in zip(top, rows)
+                ]
+
+            logger.info(f"Found {len(matches)} similar vectors")
+            return matches
+
+        except Exception as e:
+            logger.error(f"Vector query failed: {e}")
+            return []
+
+    def delete_by_metadata(self, filter: Dict[str, Any], namespace: str = "") -> bool:
+        """Delete vectors by metadata filter"""
+        try:
+            with self._lock:
+                self._apply(("delete", namespace, dict(filter)))
+            self._maybe_flush()
+            logger.info(f"Deleted vectors with filter: {filter}")
+            return True
+        except Exception as e:
+            logger.error(f"Vector deletion failed: {e}")
+            return False
+
+    def get_index_stats(self) -> Dict[str, Any]:
+        """Get index statistics"""
+        with self._lock:
+            namespaces = {
+                name: {"vector_count": len(ns)}
+                for name, ns in self._namespaces.items()
+            }
+            return {
+                "dimension": self.dimension,
+                "namespaces": namespaces,
+                "total_vector_count": sum(n["vector_count"] for n in namespaces.values()),
+            }
+
+    def save_snapshot(self, path: Optional[str] = None) -> None:
+        """Write all namespaces to a single .npz file (atomically replaced)"""
+        path = path or self.persist_path
+        if not path:
+            raise ValueError("No snapshot path configured")
+
+        with self._lock:
+            arrays = {}
+            manifest = {"dimension": self.dimension, "namespaces": []}
+            for i, (name, ns) in enumerate(self._namespaces.items()):
+                arrays[f"matrix_{i}"] = ns.matrix
+                manifest["namespaces"].append({
+                    "name": name,
+                    "ids": ns.ids,
+                    "metadata": ns.metadata,
+                })
+            arrays["manifest"] = np.frombuffer(json.dumps(manifest).encode("utf-8"), dtype=np.uint8)
+
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+            np.savez(tmp_path, **arrays)
+            os.replace(tmp_path, path)
+            if path == self.persist_path:
+                self._snapshot_mtime = os.stat(path).st_mtime_ns
+
+    def flush(self) -> None:
+        """Merge pending writes into the shared snapshot (no-op without persist_path)"""
+        if not self.persist_path:
+            return
+        with self._lock:
+            if not self._pending:
+                return
+            os.makedirs(os.path.dirname(os.path.abspath(self.persist_path)), exist_ok=True)
+            with open(f"{self.persist_path}.lock", "w") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    if self._snapshot_changed():
+                        self._reload()
+                    self.save_snapshot()
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+            logger.info(f"Flushed {len(self._pending)} pending writes to {self.persist_path}")
+            self._pending.clear()
+            self._last_flush = time.monotonic()
+
+    def load_snapshot(self, path: Optional[str] = None) -> None:
+        """Replace the in-memory index with the contents of a snapshot"""
+        path = path or self.persist_path
+        with np.load(path) as data:
+            manifest = json.loads(data["manifest"].tobytes().decode("utf-8"))
+            namespaces = {}
+            for i, entry in enumerate(manifest["namespaces"]):
+                ns = _Namespace(manifest["dimension"])
+                ns.matrix = np.ascontiguousarray(data[f"matrix_{i}"], dtype=np.float32)
+                ns.ids = entry["ids"]
+                ns.metadata = entry["metadata"]
+                ns.positions = {vector_id: j for j, vector_id in enumerate(ns.ids)}
+                namespaces[entry["name"]] = ns
+
+        with self._lock:
+            self.dimension = manifest["dimension"]
+            self._namespaces = namespaces
+            if path == self.persist_path:
+                self._snapshot_mtime = os.stat(path).st_mtime_ns
+
+        logger.info(f"Loaded local vector index snapshot: {path}")
+
+    def _apply(self, op: tuple) -> None:
+        """Apply an upsert or delete to the in-memory index (caller holds the lock)"""
+        _apply_op(self._namespaces, op, self.dimension)
+        if self.persist_path:
+            self._pending.append(op)
+
+    def _maybe_flush(self) -> None:
+        if self.persist_path and time.monotonic() - self._last_flush >= self.flush_interval_seconds:
+            self.flush()
+
+    def _snapshot_changed(self) -> bool:
+        try:
+            return os.stat(self.persist_path).st_mtime_ns != self._snapshot_mtime
+        except FileNotFoundError:
+            return False
+
+    def _reload(self) -> None:
+        """Load the shared snapshot and replay this process's pending writes on top"""
+        with self._lock:
+            self.load_snapshot()
+            for op in self._pending:
+                _apply_op(self._namespaces, op, self.dimension)
+
+    def _reload_if_changed(self) -> None:
+        """Pick up snapshots written by other processes (e.g. Celery workers)"""
+        if self.persist_path and self._snapshot_changed():
+            self._reload()
+
+
+def _apply_op(namespaces: Dict[str, _Namespace], op: tuple, dimension: int) -> None:
+    kind, name = op[0], op[1]
+    if kind == "upsert":
+        ns = namespaces.get(name)
+        if ns is None:
+            ns = namespaces[name] = _Namespace(dimension)
+        ns.upsert(op[2], op[3], op[4])
+    elif kind == "delete":
+        ns = namespaces.get(name)
+        if ns is not None and len(ns):
+            ns.keep(~ns.filter_mask(op[2]))
+
+
+def _normalize(rows: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(rows, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return np.ascontiguousarray(rows / norms, dtype=np.float32)
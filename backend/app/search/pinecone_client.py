@@ -2,11 +2,13 @@ import logging
 from typing import List, Dict, Any, Optional
 import numpy as np
 
+from app.search.vector_store import VectorStore
+
 logger = logging.getLogger(__name__)
 
 
-class PineconeClient:
-    def __init__(self, api_key: str, environment: str, index_name: str):
+class PineconeClient(VectorStore):
+    def __init__(self, api_key: str, environment: str, index_name: str, dimension: int = 512):
         """Initialize Pinecone client"""
         try:
             import pinecone
@@ -15,14 +17,15 @@ class PineconeClient:
             
             # Check if index exists, create if not
             if index_name not in pinecone.list_indexes():
-                logger.info(f"Creating Pinecone index: {index_name}")
+                logger.info(f"Creating Pinecone index: {index_name} ({dimension}-dim)")
                 pinecone.create_index(
                     name=index_name,
-                    dimension=512,  # CLIP embedding dimension
+                    dimension=dimension,
                     metric="cosine"
                 )
             
             self.index = pinecone.Index(index_name)
+            self.dimension = dimension
             logger.info(f"Connected to Pinecone index: {index_name}")
             
         except Exception as e:
@@ -40,7 +43,7 @@ class PineconeClient:
         vectors format: [
             {
                 'id': 'clip_123',
-                'values': [0.1, 0.2, ...],  # 512-dim embedding
+                'values': [0.1, 0.2, ...],  # index-dimension embedding
                 'metadata': {'video_id': 'video_1', 'start_time': 10.5}
             }
         ]
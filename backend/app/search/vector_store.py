@@ -0,0 +1,134 @@
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class VectorStore(ABC):
+    """
+    Interface shared by every vector store backend
+
+    Mirrors the PineconeClient surface so ingestion and search can run
+    against Pinecone or the in-process LocalVectorStore unchanged.
+    """
+
+    @abstractmethod
+    def upsert_vectors(
+        self,
+        vectors: List[Dict[str, Any]],
+        namespace: str = ""
+    ) -> bool:
+        """Insert or update vectors ({'id', 'values', 'metadata'} dicts)"""
+
+    @abstractmethod
+    def query(
+        self,
+        query_vector: np.ndarray,
+        top_k: int = 10,
+        filter: Optional[Dict[str, Any]] = None,
+        namespace: str = ""
+    ) -> List[Dict[str, Any]]:
+        """Return the top_k most similar vectors as {'id', 'score', 'metadata'} dicts"""
+
+    @abstractmethod
+    def delete_by_metadata(self, filter: Dict[str, Any], namespace: str = "") -> bool:
+        """Delete vectors whose metadata matches filter"""
+
+    @abstractmethod
+    def get_index_stats(self) -> Dict[str, Any]:
+        """Return index statistics"""
+
+    def flush(self) -> None:
+        """Persist buffered writes (hosted backends write through, so no-op)"""
+
+
+# Every embedding model gets its own index so vectors are only ever scored
+# against vectors of the same model and dimension
+MODALITIES = ("visual", "text")
+
+
+def modality_config(modality: str) -> Dict[str, Any]:
+    """Index name and dimension configured for a modality"""
+    if modality == "visual":
+        return {
+            "index_name": settings.PINECONE_VISUAL_INDEX_NAME or f"{settings.PINECONE_INDEX_NAME}-visual",
+            "dimension": settings.VISUAL_EMBEDDING_DIM,
+        }
+    if modality == "text":
+        return {
+            "index_name": settings.PINECONE_TEXT_INDEX_NAME or f"{settings.PINECONE_INDEX_NAME}-text",
+            "dimension": settings.TEXT_EMBEDDING_DIM,
+        }
+    raise ValueError(f"Unknown vector modality: {modality}")
+
+
+_stores: Dict[Tuple[str, str], VectorStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_vector_store(modality: str) -> VectorStore:
+    """
+    Return the process-wide vector store for a modality ("visual" or "text")
+
+    The backend is selected by VECTOR_STORE_BACKEND: "pinecone" (default)
+    connects to the hosted index for the modality; "local" serves an
+    in-process NumPy index, persisted to LOCAL_VECTOR_STORE_DIR when set.
+    """
+    backend = settings.VECTOR_STORE_BACKEND
+    key = (backend, modality)
+    store = _stores.get(key)
+    if store is not None:
+        return store
+
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is not None:
+            return store
+
+        config = modality_config(modality)
+        if backend == "local":
+            from app.search.local_vector_store import LocalVectorStore
+
+            persist_path = None
+            if settings.LOCAL_VECTOR_STORE_DIR:
+                persist_path = os.path.join(settings.LOCAL_VECTOR_STORE_DIR, f"{config['index_name']}.npz")
+            store = LocalVectorStore(dimension=config["dimension"], persist_path=persist_path)
+        elif backend == "pinecone":
+            from app.search.pinecone_client import PineconeClient
+
+            store = PineconeClient(
+                api_key=settings.PINECONE_API_KEY,
+                environment=settings.PINECONE_ENVIRONMENT,
+                index_name=config["index_name"],
+                dimension=config["dimension"]
+            )
+        else:
+            raise ValueError(f"Unknown vector store backend: {backend}")
+
+        _stores[key] = store
+        return store
+
+
+def upsert_vectors_by_modality(
+    vectors: List[Dict[str, Any]],
+    namespace: str = "",
+    batch_size: int = 100
+) -> bool:
+    """Route each vector to its modality's index using metadata['type']"""
+    grouped: Dict[str, List[Dict[str, Any]]] = {}
+    for vector in vectors:
+        grouped.setdefault(vector['metadata']['type'], []).append(vector)
+
+    success = True
+    for modality, modality_vectors in grouped.items():
+        store = get_vector_store(modality)
+        for i in range(0, len(modality_vectors), batch_size):
+            success = store.upsert_vectors(modality_vectors[i:i + batch_size], namespace) and success
+        store.flush()
+    return success
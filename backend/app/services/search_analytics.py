@@ -0,0 +1,104 @@
+import logging
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.write_behind import WriteBehindBuffer
+
+logger = logging.getLogger(__name__)
+
+
+def _flush_search_analytics(batch: List[Dict[str, Any]]) -> None:
+    """Persist a batch of searches and their results with one commit"""
+    from app.db.session import SessionLocal
+    from app.repositories.search_repository import SearchRepository
+
+    db = SessionLocal()
+    try:
+        SearchRepository(db).save_search_analytics_batch(batch)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _flush_interactions(batch: List[Dict[str, Any]]) -> None:
+    """
+    Persist a batch of clip interaction events with one multi-row insert
+
+    Buffered searches are written first, so interactions can link to
+    searches the client received a search_id for moments ago.
+    """
+    from app.db.session import SessionLocal
+    from app.repositories.search_repository import SearchRepository
+
+    search_analytics_writer.flush()
+
+    db = SessionLocal()
+    try:
+        SearchRepository(db).save_interactions_batch(batch)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+search_analytics_writer = WriteBehindBuffer(
+    name="search-analytics",
+    flush_fn=_flush_search_analytics,
+    max_size=settings.ANALYTICS_BUFFER_MAX_SIZE,
+    batch_size=settings.ANALYTICS_FLUSH_BATCH_SIZE,
+    flush_interval=settings.ANALYTICS_FLUSH_INTERVAL_SECONDS,
+)
+
+interaction_writer = WriteBehindBuffer(
+    name="clip-interactions",
+    flush_fn=_flush_interactions,
+    max_size=settings.ANALYTICS_BUFFER_MAX_SIZE,
+    batch_size=settings.ANALYTICS_FLUSH_BATCH_SIZE,
+    flush_interval=settings.INTERACTION_FLUSH_INTERVAL_SECONDS,
+)
+
+write_buffers = [search_analytics_writer, interaction_writer]
+
+
+def record_search(
+    search_id: str,
+    user_id: str,
+    query_text: str,
+    results_count: int,
+    processing_time_ms: float,
+    results: List[Dict[str, Any]]
+) -> bool:
+    """Queue a search and its ranked results for write-behind persistence"""
+    return search_analytics_writer.submit({
+        'search_id': search_id,
+        'user_id': user_id,
+        'query_text': query_text,
+        'results_count': results_count,
+        'processing_time_ms': processing_time_ms,
+        'results': results,
+        'created_at': datetime.utcnow(),
+    })
+
+
+def record_interaction(
+    user_id: str,
+    clip_id: str,
+    action: str,
+    search_query_id: Optional[str] = None,
+    duration_seconds: Optional[float] = None
+) -> bool:
+    """Queue a clip interaction event for batched insertion"""
+    return interaction_writer.submit({
+        'id': f"interaction_{uuid.uuid4().hex}",
+        'user_id': user_id,
+        'clip_id': clip_id,
+        'search_query_id': search_query_id,
+        'action': action,
+        'duration_seconds': duration_seconds,
+        'created_at': datetime.utcnow(),
+    })
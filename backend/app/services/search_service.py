@@ -1,47 +1,78 @@
+import asyncio
 import logging
 import time
 from typing import List, Optional, Dict, Any
+import numpy as np
 
-from app.schemas.search import SearchResponse, ClipResult, SearchFilters
+from app.schemas.search import SearchResponse, ClipResult
+from app.schemas.search_complete import SearchFilters
 from app.core.exceptions import SearchException
 from app.core.config import settings
 
 # Import AI models
-from app.ai.clip_model import CLIPEmbedder
-from app.ai.sentence_bert import SentenceBERTEmbedder
-from app.search.pinecone_client import PineconeClient
+from app.ai.embedding_cache import get_query_embedding_cache
+from app.ai.model_registry import clip_model_id, get_clip_embedder, get_text_embedder, text_model_id
+from app.ai.query_batcher import get_clip_query_batcher, get_text_query_batcher
+from app.search.vector_store import get_vector_store
 
 logger = logging.getLogger(__name__)
 
 
 class SearchService:
     def __init__(self):
-        # Initialize AI models (lazy loading in production)
+        # AI models are shared through the process-wide model registry
         self._clip_model = None
         self._text_embedder = None
-        self._pinecone_client = None
     
     @property
     def clip_model(self):
         if self._clip_model is None:
-            self._clip_model = CLIPEmbedder()
+            self._clip_model = get_clip_embedder()
         return self._clip_model
     
     @property
     def text_embedder(self):
         if self._text_embedder is None:
-            self._text_embedder = SentenceBERTEmbedder()
+            self._text_embedder = get_text_embedder()
         return self._text_embedder
     
+    def _encode_text_query(self, text: str) -> np.ndarray:
+        return self.text_embedder.encode(text)[0]
+    
+    def _embed_query_visual(self, query: str) -> np.ndarray:
+        """CLIP text embedding of the query (query cache, then micro-batcher); blocking"""
+        if settings.QUERY_BATCH_ENABLED:
+            encode = get_clip_query_batcher().encode
+        else:
+            encode = self.clip_model.encode_text
+        return get_query_embedding_cache().get_or_compute(query, clip_model_id(), encode)
+    
+    def _embed_query_text(self, query: str) -> np.ndarray:
+        """Sentence-BERT embedding of the query (cached and batched as above); blocking"""
+        if settings.QUERY_BATCH_ENABLED:
+            encode = get_text_query_batcher().encode
+        else:
+            encode = self._encode_text_query
+        return get_query_embedding_cache().get_or_compute(query, text_model_id(), encode)
+    
     @property
-    def pinecone_client(self):
-        if self._pinecone_client is None:
-            self._pinecone_client = PineconeClient(
-                api_key=settings.PINECONE_API_KEY,
-                environment=settings.PINECONE_ENVIRONMENT,
-                index_name=settings.PINECONE_INDEX_NAME
-            )
-        return self._pinecone_client
+    def visual_index(self):
+        """CLIP vectors (512-d)"""
+        return get_vector_store("visual")
+    
+    @property
+    def text_index(self):
+        """Sentence-BERT transcript vectors (384-d)"""
+        return get_vector_store("text")
+    
+    def warm_up(self) -> None:
+        """Load models and open both vector stores so the first search is fast"""
+        start_time = time.time()
+        self.clip_model.encode_text("warm up")
+        self.text_embedder.encode("warm up")
+        self.visual_index
+        self.text_index
+        logger.info(f"Search service warmed up in {(time.time() - start_time) * 1000:.0f}ms")
     
     async def search(
         self,
@@ -62,22 +93,26 @@ class SearchService:
             start_time = time.time()
             logger.info(f"AI-powered search: '{query}' by user {user_id}")
             
-            # Step 1: Generate query embeddings
-            # Try CLIP for visual search
-            clip_embedding = self.clip_model.encode_text(query)
-            
-            # Also use text embedding for transcript search
-            text_embedding = self.text_embedder.encode(query)
+            # Step 1: Generate query embeddings (CLIP for visual search,
+            # Sentence-BERT for transcript search). Cache lookups and
+            # encoding block, so they run on worker threads where concurrent
+            # requests can share micro-batches instead of holding the loop
+            clip_embedding, text_embedding = await asyncio.gather(
+                asyncio.to_thread(self._embed_query_visual, query),
+                asyncio.to_thread(self._embed_query_text, query),
+            )
             
             # Step 2: Search Pinecone with visual embedding
-            visual_results = self.pinecone_client.query(
+            visual_results = await asyncio.to_thread(
+                self.visual_index.query,
                 query_vector=clip_embedding,
                 top_k=limit,
                 filter={'type': 'visual'} if filters else None
             )
             
             # Step 3: Search Pinecone with text embedding
-            text_results = self.pinecone_client.query(
+            text_results = await asyncio.to_thread(
+                self.text_index.query,
                 query_vector=text_embedding,
                 top_k=limit,
                 filter={'type': 'text'} if filters else None
@@ -1,21 +1,26 @@
+import asyncio
 import logging
+import threading
 import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Dict, Any
+import numpy as np
 
-from app.schemas.search import SearchResponse, ClipResult, SearchFilters
+from app.schemas.search_complete import SearchResponse, ClipResult, SearchFilters
 from app.core.exceptions import SearchException
 from app.core.config import settings
 
 # Import AI models
-from app.ai.clip_model import CLIPEmbedder
-from app.ai.sentence_bert import SentenceBERTEmbedder
-from app.search.pinecone_client import PineconeClient
+from app.ai.embedding_cache import get_query_embedding_cache
+from app.ai.model_registry import clip_model_id, get_clip_embedder, get_text_embedder, text_model_id
+from app.ai.query_batcher import get_clip_query_batcher, get_text_query_batcher
+from app.search.vector_store import get_vector_store
 
 # Import storage and repositories
 from app.storage.s3_service import S3Service
-from app.repositories.video_repository import VideoRepository
-from app.repositories.clip_repository import ClipRepository
 from app.repositories.search_repository import SearchRepository
+from app.services.search_analytics import record_interaction, record_search
 from app.db.session import get_db
 
 logger = logging.getLogger(__name__)
@@ -23,33 +28,44 @@ logger = logging.getLogger(__name__)
 
 class SearchService:
     def __init__(self):
-        # Initialize AI models (lazy loading in production)
+        # AI models are shared through the process-wide model registry
         self._clip_model = None
         self._text_embedder = None
-        self._pinecone_client = None
         self._s3_service = None
+        # Bounded pool for the blocking embedding + vector query branches
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.SEARCH_EXECUTOR_WORKERS,
+            thread_name_prefix="search"
+        )
+        # Branches submitted but not finished, including ones whose caller
+        # already timed out (wait_for cannot stop an executor thread)
+        self._branches_in_flight = 0
+        self._branches_lock = threading.Lock()
     
     @property
     def clip_model(self):
         if self._clip_model is None:
-            self._clip_model = CLIPEmbedder()
+            self._clip_model = get_clip_embedder()
         return self._clip_model
     
     @property
     def text_embedder(self):
         if self._text_embedder is None:
-            self._text_embedder = SentenceBERTEmbedder()
+            self._text_embedder = get_text_embedder()
         return self._text_embedder
     
+    def _encode_text_query(self, text: str) -> np.ndarray:
+        return self.text_embedder.encode(text)[0]
+    
     @property
-    def pinecone_client(self):
-        if self._pinecone_client is None:
-            self._pinecone_client = PineconeClient(
-                api_key=settings.PINECONE_API_KEY,
-                environment=settings.PINECONE_ENVIRONMENT,
-                index_name=settings.PINECONE_INDEX_NAME
-            )
-        return self._pinecone_client
+    def visual_index(self):
+        """CLIP vectors (512-d)"""
+        return get_vector_store("visual")
+    
+    @property
+    def text_index(self):
+        """Sentence-BERT transcript vectors (384-d)"""
+        return get_vector_store("text")
     
     @property
     def s3_service(self):
@@ -57,6 +73,15 @@ class SearchService:
             self._s3_service = S3Service()
         return self._s3_service
     
+    def warm_up(self) -> None:
+        """Load models and open both vector stores so the first search is fast"""
+        start_time = time.time()
+        self.clip_model.encode_text("warm up")
+        self.text_embedder.encode("warm up")
+        self.visual_index
+        self.text_index
+        logger.info(f"Search service warmed up in {(time.time() - start_time) * 1000:.0f}ms")
+    
     async def search(
         self,
         query: str,
@@ -70,46 +95,41 @@ class SearchService:
         Flow:
         1. Generate query embeddings (CLIP + Sentence-BERT)
         2. Search Pinecone for similar vectors
+           (steps 1-2 run as concurrent visual and text branches; a branch
+           that times out is dropped and the response marked degraded)
         3. Enrich with PostgreSQL data (video titles, thumbnails)
         4. Generate presigned S3 URLs
-        5. Save search query and results for analytics
+        5. Queue search query and results for analytics (write-behind)
         6. Return complete results
         """
         try:
             start_time = time.time()
-            search_id = f"search_{int(time.time())}_{user_id[:8]}"
+            search_id = f"search_{int(time.time())}_{user_id[:8]}_{uuid.uuid4().hex[:8]}"
             
             logger.info(f"AI-powered search: '{query}' by user {user_id}")
             
-            # STEP 1: Generate query embeddings
-            logger.debug("Generating query embeddings")
-            clip_embedding = self.clip_model.encode_text(query)
-            text_embedding = self.text_embedder.encode(query)
-            
-            # STEP 2: Search Pinecone
-            logger.debug("Searching Pinecone")
-            
             # Build filter for Pinecone
             pinecone_filter = {'user_id': user_id}
             if filters and filters.video_ids:
                 pinecone_filter['video_id'] = {'$in': filters.video_ids}
             
-            # Search with visual embedding
-            visual_results = self.pinecone_client.query(
-                query_vector=clip_embedding,
-                top_k=limit * 2,  # Get more for merging
-                filter=pinecone_filter
+            # STEP 1+2: Embed the query and search Pinecone, one branch per
+            # modality, both running concurrently
+            logger.debug("Running visual and text search branches")
+            visual_results, text_results = await asyncio.gather(
+                self._run_branch("visual", self._visual_branch, query, limit * 2, pinecone_filter),
+                self._run_branch("text", self._text_branch, query, limit * 2, pinecone_filter),
             )
             
-            # Search with text embedding
-            text_results = self.pinecone_client.query(
-                query_vector=text_embedding,
-                top_k=limit * 2,
-                filter=pinecone_filter
-            )
+            degraded_modalities = [
+                name for name, results in (("visual", visual_results), ("text", text_results))
+                if results is None
+            ]
+            if len(degraded_modalities) == 2:
+                raise SearchException("All search branches failed")
             
             # STEP 3: Merge and rank results
-            merged_results = self._merge_results(visual_results, text_results, limit)
+            merged_results = self._merge_results(visual_results or [], text_results or [], limit)
             
             # STEP 4: Enrich with database data
             logger.debug("Enriching with database data")
@@ -117,32 +137,22 @@ class SearchService:
             
             processing_time = (time.time() - start_time) * 1000
             
-            # STEP 5: Save search query for analytics
-            db = next(get_db())
-            try:
-                search_repo = SearchRepository(db)
-                
-                # Save query
-                search_repo.create_search_query(
-                    search_id=search_id,
-                    user_id=user_id,
-                    query_text=query,
-                    results_count=len(enriched_clips),
-                    processing_time_ms=processing_time
-                )
-                
-                # Save results
-                results_for_analytics = [
+            # STEP 5: Queue search query and results for analytics
+            # (written in batches by the write-behind buffer)
+            record_search(
+                search_id=search_id,
+                user_id=user_id,
+                query_text=query,
+                results_count=len(enriched_clips),
+                processing_time_ms=processing_time,
+                results=[
                     {
                         'clip_id': clip.clip_id,
                         'relevance_score': clip.relevance_score
                     }
                     for clip in enriched_clips
                 ]
-                search_repo.save_search_results(search_id, results_for_analytics)
-                
-            finally:
-                db.close()
+            )
             
             logger.info(f"Search completed: {len(enriched_clips)} results in {processing_time:.2f}ms")
             
@@ -151,13 +161,100 @@ class SearchService:
                 total_results=len(enriched_clips),
                 clips=enriched_clips,
                 processing_time_ms=processing_time,
-                search_id=search_id  # Include for tracking
+                search_id=search_id,  # Include for tracking
+                degraded_modalities=degraded_modalities
             )
             
         except Exception as e:
             logger.error(f"Search error: {str(e)}", exc_info=True)
             raise SearchException(f"Search failed: {str(e)}")
     
+    def _visual_branch(self, query: str, top_k: int, pinecone_filter: Dict) -> List[Dict]:
+        """CLIP text embedding followed by the visual vector query"""
+        clip_embedding = self._embed_query_visual(query)
+        return self.visual_index.query(
+            query_vector=clip_embedding,
+            top_k=top_k,
+            filter=pinecone_filter
+        )
+    
+    def _text_branch(self, query: str, top_k: int, pinecone_filter: Dict) -> List[Dict]:
+        """Sentence-BERT embedding followed by the transcript vector query"""
+        text_embedding = self._embed_query_text(query)
+        return self.text_index.query(
+            query_vector=text_embedding,
+            top_k=top_k,
+            filter=pinecone_filter
+        )
+    
+    def _embed_query_visual(self, query: str) -> np.ndarray:
+        """
+        CLIP text embedding of the query
+        
+        Served from the query cache when possible; misses are encoded by the
+        micro-batcher together with other concurrent searches.
+        """
+        if settings.QUERY_BATCH_ENABLED:
+            encode = get_clip_query_batcher().encode
+        else:
+            encode = self.clip_model.encode_text
+        return get_query_embedding_cache().get_or_compute(query, clip_model_id(), encode)
+    
+    def _embed_query_text(self, query: str) -> np.ndarray:
+        """Sentence-BERT embedding of the query (cached and batched as above)"""
+        if settings.QUERY_BATCH_ENABLED:
+            encode = get_text_query_batcher().encode
+        else:
+            encode = self._encode_text_query
+        return get_query_embedding_cache().get_or_compute(query, text_model_id(), encode)
+    
+    async def _run_branch(self, name: str, branch, *args) -> Optional[List[Dict]]:
+        """
+        Run a blocking search branch in the executor
+        
+        Returns None if the branch times out or fails, so the caller can
+        fall back to single-modality results. A timed-out branch keeps its
+        executor thread until it finishes, so when every worker is still
+        busy with such stragglers new branches are rejected immediately
+        instead of queueing behind them.
+        """
+        with self._branches_lock:
+            if self._branches_in_flight >= settings.SEARCH_EXECUTOR_WORKERS:
+                logger.warning(
+                    f"{name} branch skipped: {self._branches_in_flight} branches still running, "
+                    f"returning degraded results"
+                )
+                return None
+            self._branches_in_flight += 1
+        
+        loop = asyncio.get_running_loop()
+        start_time = time.time()
+        future = loop.run_in_executor(self._executor, branch, *args)
+        future.add_done_callback(self._branch_finished)
+        try:
+            results = await asyncio.wait_for(
+                asyncio.shield(future),
+                timeout=settings.SEARCH_BRANCH_TIMEOUT_MS / 1000
+            )
+            logger.debug(f"{name} branch finished in {(time.time() - start_time) * 1000:.2f}ms")
+            return results
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"{name} branch exceeded {settings.SEARCH_BRANCH_TIMEOUT_MS}ms, "
+                f"returning degraded results"
+            )
+            return None
+        except Exception as e:
+            logger.error(f"{name} branch failed: {e}", exc_info=True)
+            return None
+    
+    def _branch_finished(self, future) -> None:
+        with self._branches_lock:
+            self._branches_in_flight -= 1
+        if not future.cancelled() and future.exception() is not None:
+            # Already logged by _run_branch unless its caller timed out
+            logger.debug(f"Search branch raised: {future.exception()}")
+    
     async def _enrich_results(
         self,
         pinecone_results: List[Dict],
@@ -166,6 +263,22 @@ class SearchService:
         """
         Enrich Pinecone results with PostgreSQL data and S3 URLs
         
+        The database query and presigning block, so they run in the search
+        executor rather than on the event loop.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self._build_clip_results, pinecone_results, user_id
+        )
+    
+    def _build_clip_results(
+        self,
+        pinecone_results: List[Dict],
+        user_id: str
+    ) -> List[ClipResult]:
+        """
+        Load clips and videos and presign their URLs; blocking
+        
         Returns complete ClipResult objects with:
         - Real video titles
         - Real thumbnail URLs (presigned)
@@ -173,64 +286,68 @@ class SearchService:
         - Complete transcript
         - All metadata
         """
+        # Map every Pinecone match back to its clip id, keeping rank order
+        clip_ids = [
+            result['id'].rsplit('_', 2)[0]  # Remove _visual_N or _text_N
+            for result in pinecone_results
+        ]
+        
         db = next(get_db())
         try:
-            video_repo = VideoRepository(db)
-            clip_repo = ClipRepository(db)
+            # One joined query for all clips and their videos (ownership is
+            # checked in SQL)
+            search_repo = SearchRepository(db)
+            rows = search_repo.get_clips_with_videos(clip_ids, user_id=user_id)
+        finally:
+            db.close()
+        
+        # Presigned URLs are generated once per video, however many of its
+        # clips matched
+        video_urls = {}
+        video_thumbnails = {}
+        
+        enriched_clips = []
+        
+        for result, clip_id_base in zip(pinecone_results, clip_ids):
+            row = rows.get(clip_id_base)
+            if not row:
+                logger.warning(f"Clip not found in DB: {clip_id_base}")
+                continue
+            clip, video = row
             
-            enriched_clips = []
+            if video.id not in video_urls:
+                video_urls[video.id] = self.s3_service.get_video_url(video.s3_key)
+                video_thumbnails[video.id] = (
+                    self.s3_service.get_video_url(video.thumbnail_url)
+                    if video.thumbnail_url else None
+                )
             
-            for result in pinecone_results:
-                metadata = result['metadata']
-                clip_id_base = result['id'].rsplit('_', 2)[0]  # Remove _visual_N or _text_N
-                
-                # Get clip from database
-                clip = clip_repo.get_by_id(clip_id_base)
-                if not clip:
-                    logger.warning(f"Clip not found in DB: {clip_id_base}")
-                    continue
-                
-                # Get video from database
-                video = video_repo.get_by_id(clip.video_id)
-                if not video:
-                    logger.warning(f"Video not found in DB: {clip.video_id}")
-                    continue
-                
-                # Verify ownership
-                if video.user_id != user_id:
-                    continue
-                
-                # Generate presigned URLs
-                thumbnail_url = None
-                if clip.thumbnail_url:
-                    thumbnail_url = self.s3_service.get_video_url(clip.thumbnail_url)
-                elif video.thumbnail_url:
-                    thumbnail_url = self.s3_service.get_video_url(video.thumbnail_url)
-                
-                # Generate clip playback URL
-                # For now, use video URL with timestamp
-                # In production, you'd extract the actual clip
-                video_url = self.s3_service.get_video_url(video.s3_key)
-                clip_url = f"{video_url}#t={clip.start_time},{clip.end_time}"
-                
-                enriched_clips.append(ClipResult(
-                    clip_id=clip.id,
-                    video_id=video.id,
-                    video_title=video.title,
-                    start_time=clip.start_time,
-                    end_time=clip.end_time,
-                    relevance_score=result['score'],
-                    thumbnail_url=thumbnail_url,
-                    transcript=clip.transcript or "",
-                    clip_url=clip_url,  # Presigned playback URL
-                    duration=clip.end_time - clip.start_time,
-                    created_at=clip.created_at
-                ))
+            # Generate presigned URLs
+            if clip.thumbnail_url:
+                thumbnail_url = self.s3_service.get_video_url(clip.thumbnail_url)
+            else:
+                thumbnail_url = video_thumbnails[video.id]
             
-            return enriched_clips
+            # Generate clip playback URL
+            # For now, use video URL with timestamp
+            # In production, you'd extract the actual clip
+            clip_url = f"{video_urls[video.id]}#t={clip.start_time},{clip.end_time}"
             
-        finally:
-            db.close()
+            enriched_clips.append(ClipResult(
+                clip_id=clip.id,
+                video_id=video.id,
+                video_title=video.title,
+                start_time=clip.start_time,
+                end_time=clip.end_time,
+                relevance_score=result['score'],
+                thumbnail_url=thumbnail_url,
+                transcript=clip.transcript or "",
+                clip_url=clip_url,  # Presigned playback URL
+                duration=clip.end_time - clip.start_time,
+                created_at=clip.created_at
+            ))
+        
+        return enriched_clips
     
     def _merge_results(
         self,
@@ -272,7 +389,11 @@ class SearchService:
         user_id: str,
         limit: int = 50
     ) -> List[Dict[str, Any]]:
-        """Get user's search history"""
+        """Get user's search history (the query runs in the search executor)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._load_search_history, user_id, limit)
+    
+    def _load_search_history(self, user_id: str, limit: int) -> List[Dict[str, Any]]:
         db = next(get_db())
         try:
             search_repo = SearchRepository(db)
@@ -298,24 +419,36 @@ class SearchService:
         search_query_id: Optional[str] = None,
         duration_seconds: Optional[float] = None
     ) -> bool:
-        """Track when user views a clip"""
-        db = next(get_db())
-        try:
-            search_repo = SearchRepository(db)
-            interaction_id = f"interaction_{int(time.time())}_{user_id[:8]}"
-            
-            search_repo.track_interaction(
-                interaction_id=interaction_id,
+        """
+        Track when user views a clip
+        
+        The event is queued and inserted in a batch by the interaction
+        write-behind buffer; returns False if the buffer is full.
+        """
+        accepted = record_interaction(
+            user_id=user_id,
+            clip_id=clip_id,
+            action="viewed",
+            search_query_id=search_query_id,
+            duration_seconds=duration_seconds
+        )
+        if not accepted:
+            logger.warning(f"Dropped view event for clip {clip_id}: interaction buffer full")
+        return accepted
+    
+    async def track_clip_views(
+        self,
+        user_id: str,
+        events: List[Dict[str, Any]]
+    ) -> int:
+        """Track a batch of view events; returns how many were accepted"""
+        accepted = 0
+        for event in events:
+            if await self.track_clip_view(
                 user_id=user_id,
-                clip_id=clip_id,
-                action="viewed",
-                search_query_id=search_query_id,
-                duration_seconds=duration_seconds
-            )
-            
-            return True
-        except Exception as e:
-            logger.error(f"Failed to track interaction: {e}")
-            return False
-        finally:
-            db.close()
+                clip_id=event['clip_id'],
+                search_query_id=event.get('search_query_id'),
+                duration_seconds=event.get('duration_seconds')
+            ):
+                accepted += 1
+        return accepted
@@ -0,0 +1,186 @@
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer:
+    """
+    Bounded in-process buffer that persists items in batches off the request path
+
+    Producers call submit(), which never touches the database. A background
+    thread drains the queue and hands batches to flush_fn whenever
+    batch_size items are waiting or flush_interval seconds have passed since
+    the first item of the batch arrived. When the queue is full new items
+    are dropped (or the producer waits, if it passes a timeout) and the
+    drop is counted. After stop() further submits are rejected until
+    start() is called again. A batch whose flush fails is logged as one
+    line (count and error, never the items) and counted in failed_items.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        flush_fn: Callable[[List[Any]], None],
+        max_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 2.0
+    ):
+        self.name = name
+        self.flush_fn = flush_fn
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_size)
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+        self._submitted = 0
+        self._dropped = 0
+        self._flushed = 0
+        self._flushes = 0
+        self._flush_failures = 0
+        self._failed_items = 0
+        self._last_flush_ms = 0.0
+
+    def start(self) -> None:
+        """Start the flush thread (idempotent)"""
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self._run,
+                name=f"write-behind-{self.name}",
+                daemon=True
+            )
+            self._thread.start()
+            logger.info(f"Write-behind buffer started: {self.name}")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop the flush thread after writing everything still queued"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        # Anything submitted after the thread exited
+        self.flush()
+        logger.info(f"Write-behind buffer stopped: {self.name} {self.stats()}")
+
+    def submit(self, item: Any, timeout: Optional[float] = None) -> bool:
+        """
+        Queue an item for persistence
+
+        With timeout=None the call never blocks and drops the item if the
+        buffer is full. With a timeout the caller waits up to that long for
+        space (backpressure) before dropping.
+        """
+        if self._stopped.is_set():
+            with self._stats_lock:
+                self._dropped += 1
+                dropped = self._dropped
+            if dropped % 1000 == 1:
+                logger.warning(f"Write-behind buffer {self.name} is stopped, dropped {dropped} items")
+            return False
+        if self._thread is None:
+            self.start()
+
+        try:
+            if timeout is None:
+                self._queue.put_nowait(item)
+            else:
+                self._queue.put(item, timeout=timeout)
+        except queue.Full:
+            with self._stats_lock:
+                self._dropped += 1
+                dropped = self._dropped
+            if dropped % 1000 == 1:
+                logger.warning(f"Write-behind buffer {self.name} full, dropped {dropped} items")
+            return False
+
+        with self._stats_lock:
+            self._submitted += 1
+        return True
+
+    def flush(self) -> int:
+        """
+        Synchronously write everything currently queued; returns items written
+
+        Also waits for a batch the flush thread is writing at the time, so
+        every item submitted before the call has been handed to flush_fn.
+        """
+        written = 0
+        while True:
+            batch = self._drain(timeout=0)
+            if not batch:
+                break
+            self._write(batch)
+            written += len(batch)
+        with self._flush_lock:
+            return written
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "queue_depth": self._queue.qsize(),
+            "submitted": self._submitted,
+            "flushed": self._flushed,
+            "dropped": self._dropped,
+            "flushes": self._flushes,
+            "flush_failures": self._flush_failures,
+            "failed_items": self._failed_items,
+            "last_flush_ms": round(self._last_flush_ms, 2),
+        }
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            batch = self._drain(timeout=self.flush_interval)
+            if batch:
+                self._write(batch)
+        self.flush()
+
+    def _drain(self, timeout: float) -> List[Any]:
+        """Collect up to batch_size items, waiting at most timeout after the first"""
+        try:
+            first = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+        except queue.Empty:
+            return []
+
+        batch = [first]
+        deadline = time.monotonic() + timeout
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0 and not self._stopped.is_set():
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[Any]) -> None:
+        start_time = time.perf_counter()
+        with self._flush_lock:
+            try:
+                self.flush_fn(batch)
+                failed = False
+            except Exception as e:
+                failed = True
+                logger.error(f"Write-behind flush failed for {self.name}, dropped {len(batch)} items: {e}")
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+
+        with self._stats_lock:
+            self._flushes += 1
+            self._last_flush_ms = elapsed_ms
+            if failed:
+                self._flush_failures += 1
+                self._failed_items += len(batch)
+            else:
+                self._flushed += len(batch)
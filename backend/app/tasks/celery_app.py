@@ -1,6 +1,10 @@
 from celery import Celery
+from celery.signals import worker_process_init
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
 celery_app = Celery(
     "clipmind",
     broker=os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/1"),
@@ -14,3 +18,19 @@ celery_app.conf.update(
     timezone="UTC",
     enable_utc=True,
 )
+
+
+@worker_process_init.connect
+def preload_models(**kwargs):
+    """Load AI models once per worker process instead of once per task"""
+    from app.core.config import settings
+    from app.ai.model_registry import preload_worker_models
+    
+    if not settings.PRELOAD_WORKER_MODELS:
+        return
+    
+    try:
+        preload_worker_models()
+    except Exception as e:
+        # Tasks will load lazily through the registry instead
+        logger.error(f"Model preload failed: {e}", exc_info=True)
@@ -6,10 +6,13 @@ import logging
 # Import AI models and processors
 from app.workers.video_processor import VideoProcessor
 from app.workers.scene_detector import SceneDetector
-from app.ai.clip_model import CLIPEmbedder
-from app.ai.whisper_model import WhisperTranscriber
-from app.ai.sentence_bert import SentenceBERTEmbedder
-from app.search.pinecone_client import PineconeClient
+from app.workers.frame_sampler import embed_scene_frames
+from app.ai.model_registry import (
+    get_clip_embedder,
+    get_text_embedder,
+    get_whisper_handle,
+)
+from app.search.vector_store import get_vector_store, upsert_vectors_by_modality
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -30,11 +33,10 @@ def process_video_task(self, video_id: str, video_url: str):
     
     Steps:
     1. Extract metadata (FFmpeg)
-    2. Generate thumbnail
-    3. Extract audio
+    2-3. Generate thumbnail and extract audio (one FFmpeg decode)
     4. Detect scenes (PySceneDetect)
     5. Transcribe audio (Whisper)
-    6. Generate visual embeddings (CLIP)
+    6. Generate visual embeddings for K sampled frames per scene (CLIP)
     7. Generate text embeddings (Sentence-BERT)
     8. Index in Pinecone
     """
@@ -49,100 +51,88 @@ def process_video_task(self, video_id: str, video_url: str):
         logger.info(f"Extracting metadata for {video_id}")
         metadata = video_processor.extract_metadata(video_url)
         
-        # Step 2: Generate thumbnail
-        logger.info(f"Generating thumbnail for {video_id}")
-        thumbnail_path = f"/tmp/{video_id}_thumb.jpg"
-        video_processor.generate_thumbnail(video_url, thumbnail_path)
-        
-        # Step 3: Extract audio
-        logger.info(f"Extracting audio for {video_id}")
-        audio_path = f"/tmp/{video_id}_audio.wav"
-        video_processor.extract_audio(video_url, audio_path)
+        # Steps 2 and 3: Thumbnail and audio from a single decode
+        # (audio is piped straight into memory, no temporary WAV)
+        logger.info(f"Extracting thumbnail and audio for {video_id}")
+        media = video_processor.extract_media(
+            video_url,
+            thumbnail_path=f"/tmp/{video_id}_thumb.jpg",
+            decode_audio=True
+        )
         
         # Step 4: Detect scenes
         logger.info(f"Detecting scenes for {video_id}")
         scenes = scene_detector.detect_scenes_adaptive(video_url)
         
-        # Step 5: Transcribe audio (Whisper)
+        # Step 5: Transcribe audio (Whisper; long audio is split on silences across processes)
         logger.info(f"Transcribing audio for {video_id}")
-        transcriber = WhisperTranscriber(model_size="base")
-        transcription = transcriber.transcribe(audio_path)
+        whisper = get_whisper_handle()
+        with whisper.lock:
+            transcription = whisper.model.transcribe(media["audio"])
         
-        # Step 6: Extract frames for each scene
-        logger.info(f"Extracting frames for {video_id}")
-        frames_dir = f"/tmp/{video_id}_frames"
-        frames = video_processor.extract_frames(
+        # Step 6: Generate visual embeddings (CLIP) for frames sampled inside each scene
+        logger.info(f"Generating visual embeddings for {video_id}")
+        clip_model = get_clip_embedder()
+        visual_embeddings, dedup_stats = embed_scene_frames(
+            video_processor,
+            clip_model,
             video_url,
-            frames_dir,
-            fps=1  # 1 frame per second
+            scenes,
+            frames_per_scene=settings.FRAMES_PER_SCENE,
+            pool=settings.POOL_SCENE_EMBEDDINGS,
+            duration=metadata.get("duration"),
+            dedup=settings.FRAME_DEDUP_ENABLED,
+            dedup_max_distance=settings.FRAME_DEDUP_MAX_DISTANCE
         )
         
-        # Step 7: Generate visual embeddings (CLIP)
-        logger.info(f"Generating visual embeddings for {video_id}")
-        clip_model = CLIPEmbedder()
-        visual_embeddings = clip_model.encode_images_batch(frames, batch_size=8)
-        
-        # Step 8: Generate text embeddings (Sentence-BERT)
+        # Step 7: Generate text embeddings (Sentence-BERT)
         logger.info(f"Generating text embeddings for {video_id}")
-        text_embedder = SentenceBERTEmbedder()
-        
-        # Embed full transcript
-        full_text_embedding = text_embedder.encode(transcription["text"])
-        
-        # Embed each segment
-        segment_embeddings = []
-        for segment in transcription["segments"]:
-            seg_embedding = text_embedder.encode(segment["text"])
-            segment_embeddings.append({
-                "text": segment["text"],
-                "start": segment["start"],
-                "end": segment["end"],
-                "embedding": seg_embedding
-            })
+        text_embedder = get_text_embedder()
+        
+        # Embed every transcript segment in one batched pass
+        segment_matrix, segments = text_embedder.encode_segments(transcription["segments"])
         
-        # Step 9: Index in Pinecone
+        # Step 8: Index in Pinecone
         logger.info(f"Indexing embeddings in Pinecone for {video_id}")
-        pinecone_client = PineconeClient(
-            api_key=settings.PINECONE_API_KEY,
-            environment=settings.PINECONE_ENVIRONMENT,
-            index_name=settings.PINECONE_INDEX_NAME
-        )
         
         # Prepare vectors for Pinecone
         vectors = []
         
-        # Add visual embeddings (one per frame/scene)
-        for i, (embedding, scene) in enumerate(zip(visual_embeddings, scenes)):
+        # Add visual embeddings (one per sampled frame, or per scene when pooled)
+        for i, data in enumerate(visual_embeddings):
+            metadata_fields = {
+                'video_id': video_id,
+                'type': 'visual',
+                'start_time': data['start_time'],
+                'end_time': data['end_time'],
+                'scene_number': data['scene_number']
+            }
+            if data['timestamp'] is not None:
+                metadata_fields['timestamp'] = data['timestamp']
             vectors.append({
                 'id': f"{video_id}_scene_{i}",
-                'values': embedding.tolist(),
-                'metadata': {
-                    'video_id': video_id,
-                    'type': 'visual',
-                    'start_time': scene['start_time'],
-                    'end_time': scene['end_time'],
-                    'scene_number': scene['scene_number']
-                }
+                'values': data['embedding'].tolist(),
+                'metadata': metadata_fields
             })
         
         # Add text embeddings (one per transcript segment)
-        for i, seg_data in enumerate(segment_embeddings):
+        for i, (embedding, segment) in enumerate(zip(segment_matrix, segments)):
             vectors.append({
                 'id': f"{video_id}_text_{i}",
-                'values': seg_data['embedding'].tolist(),
+                'values': embedding.tolist(),
                 'metadata': {
                     'video_id': video_id,
                     'type': 'text',
-                    'start_time': seg_data['start'],
-                    'end_time': seg_data['end'],
-                    'text': seg_data['text'][:500]  # Limit text length
+                    'start_time': segment['start'],
+                    'end_time': segment['end'],
+                    'text': segment['text'][:500]  # Limit text length
                 }
             })
         
-        # Upsert to Pinecone
-        pinecone_client.upsert_vectors(vectors)
+        # Upsert to Pinecone, visual and text vectors into their own indexes
+        upsert_vectors_by_modality(vectors)
         
-        # Step 10: Save to database
+        # Step 9: Save to database
         # TODO: Update database with metadata, scenes, transcription, etc.
         
         logger.info(f"Video processing completed: {video_id}")
@@ -151,8 +141,10 @@ def process_video_task(self, video_id: str, video_url: str):
             "video_id": video_id,
             "status": "completed",
             "scenes_count": len(scenes),
-            "frames_count": len(frames),
+            "frames_count": len(visual_embeddings),
+            "frame_dedup_ratio": dedup_stats["dedup_ratio"],
             "transcript_length": len(transcription["text"]),
+            "audio_skipped_fraction": transcription.get("vad", {}).get("skipped_fraction", 0.0),
             "embeddings_indexed": len(vectors)
         }
         
@@ -165,21 +157,19 @@ def process_video_task(self, video_id: str, video_url: str):
 def generate_clip_embeddings_task(clip_id: str, frame_path: str):
     """Generate embeddings for a single clip"""
     try:
-        clip_model = CLIPEmbedder()
+        clip_model = get_clip_embedder()
+        # Raises on an unreadable frame, so nothing is indexed for this clip
         embedding = clip_model.encode_image(frame_path)
         
-        # Index in Pinecone
-        pinecone_client = PineconeClient(
-            api_key=settings.PINECONE_API_KEY,
-            environment=settings.PINECONE_ENVIRONMENT,
-            index_name=settings.PINECONE_INDEX_NAME
-        )
+        # Index in Pinecone (visual index)
+        pinecone_client = get_vector_store("visual")
         
         pinecone_client.upsert_vectors([{
             'id': clip_id,
             'values': embedding.tolist(),
-            'metadata': {'clip_id': clip_id}
+            'metadata': {'clip_id': clip_id, 'type': 'visual'}
         }])
+        pinecone_client.flush()
         
         return {"clip_id": clip_id, "status": "indexed"}
         
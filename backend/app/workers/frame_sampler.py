@@ -0,0 +1,173 @@
+import logging
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+
+from app.ai.embedding_pipeline import VisualEmbeddingPipeline
+from app.ai.frame_dedup import NearDuplicateFilter
+
+logger = logging.getLogger(__name__)
+
+
+def sample_scene_timestamps(
+    scenes: List[Dict[str, Any]],
+    frames_per_scene: int = 3,
+    duration: Optional[float] = None
+) -> List[Dict[str, Any]]:
+    """
+    Pick representative timestamps inside each detected scene
+
+    Each scene is split into frames_per_scene equal slices and the centre of
+    every slice is sampled, so frames avoid the cut itself (where fades and
+    transitions live). Each sample covers its own slice of the scene. When
+    no scenes were detected the whole video, given its duration, is treated
+    as a single scene.
+
+    Returns one dict per sample:
+        {'timestamp', 'scene_number', 'start_time', 'end_time'}
+    """
+    if not scenes and duration:
+        scenes = [{
+            "scene_number": 1,
+            "start_time": 0.0,
+            "end_time": duration,
+            "duration": duration,
+        }]
+
+    samples = []
+    for scene in scenes:
+        start, end = scene["start_time"], scene["end_time"]
+        length = max(end - start, 0.0)
+        for k in range(frames_per_scene):
+            samples.append({
+                "timestamp": start + length * (k + 0.5) / frames_per_scene,
+                "scene_number": scene["scene_number"],
+                "start_time": start + length * k / frames_per_scene,
+                "end_time": start + length * (k + 1) / frames_per_scene,
+            })
+
+    logger.info(f"Sampled {len(samples)} frames from {len(scenes)} scenes")
+    return samples
+
+
+def pool_scene_embeddings(
+    embeddings: np.ndarray,
+    valid: np.ndarray,
+    samples: List[Dict[str, Any]]
+) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+    """
+    Mean-pool the frame embeddings of each scene into one unit vector
+
+    Rows flagged invalid are ignored; scenes without any valid frame are
+    dropped. A scene spans the union of its frames' time spans.
+
+    Returns:
+        (scene_embeddings, scenes) with one row per retained scene
+    """
+    groups: Dict[int, List[int]] = {}
+    scene_info: Dict[int, Dict[str, Any]] = {}
+    for i, sample in enumerate(samples):
+        if not valid[i]:
+            continue
+        scene_number = sample["scene_number"]
+        groups.setdefault(scene_number, []).append(i)
+        info = scene_info.setdefault(scene_number, {
+            "scene_number": scene_number,
+            "start_time": sample["start_time"],
+            "end_time": sample["end_time"],
+        })
+        info["start_time"] = min(info["start_time"], sample["start_time"])
+        info["end_time"] = max(info["end_time"], sample["end_time"])
+
+    if not groups:
+        return np.empty((0, embeddings.shape[1]), dtype=np.float32), []
+
+    pooled = np.stack([embeddings[rows].mean(axis=0) for rows in groups.values()]).astype(np.float32)
+    norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return pooled / norms, [scene_info[n] for n in groups]
+
+
+def embed_scene_frames(
+    video_processor,
+    clip_model,
+    video_path: str,
+    scenes: List[Dict[str, Any]],
+    frames_per_scene: int = 3,
+    pool: bool = False,
+    duration: Optional[float] = None,
+    dedup: bool = True,
+    dedup_max_distance: int = 5,
+    batch_size: int = 32
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Sample, decode and CLIP-embed representative frames for every scene
+
+    Frames are streamed as CLIP-sized RGB arrays from FFmpeg pipes
+    (VideoProcessor.stream_frames), so nothing is written to disk, and run
+    through a VisualEmbeddingPipeline so decoding, preprocessing and
+    inference overlap. With dedup enabled, frames that are near-duplicates
+    of the previously kept frame of the same scene are dropped before
+    embedding and the kept frame's span is extended over them.
+
+    Returns:
+        (vectors, dedup_stats) where each vector is
+        {'embedding', 'scene_number', 'start_time', 'end_time', 'timestamp'}
+        and 'timestamp' is None for mean-pooled scene vectors
+    """
+    samples = sample_scene_timestamps(scenes, frames_per_scene, duration)
+    dedup_filter = NearDuplicateFilter(max_distance=dedup_max_distance) if dedup else None
+
+    kept_samples: List[Dict[str, Any]] = []
+    kept_embeddings: List[np.ndarray] = []
+    if samples:
+        source = video_processor.stream_frames(
+            video_path,
+            timestamps=[sample["timestamp"] for sample in samples],
+            size=getattr(clip_model, "image_size", 224),
+            batch_size=batch_size
+        )
+
+        def unique_batches():
+            frames_iter = iter(source)
+            try:
+                for frames, positions in frames_iter:
+                    rows = list(range(len(positions)))
+                    if dedup_filter is not None:
+                        rows = [row for row in rows if dedup_filter.keep(frames[row], samples[positions[row]])]
+                    if rows:
+                        # Fancy indexing copies out of the reusable decode buffer
+                        yield frames[rows], [samples[positions[row]] for row in rows]
+            finally:
+                # Stops the decoder thread if the pipeline exits early
+                frames_iter.close()
+
+        pipeline = VisualEmbeddingPipeline(clip_model)
+        for embeddings, batch_samples in pipeline.run(unique_batches()):
+            kept_embeddings.append(embeddings)
+            kept_samples.extend(batch_samples)
+        logger.info(f"Visual embedding pipeline for {video_path}: {pipeline.stats()}")
+
+    if dedup_filter is not None:
+        dedup_stats = dedup_filter.stats()
+    else:
+        dedup_stats = {"total": len(kept_samples), "kept": len(kept_samples), "dropped": 0, "dedup_ratio": 0.0}
+    logger.info(f"Frame dedup for {video_path}: {dedup_stats}")
+
+    if not kept_samples:
+        return [], dedup_stats
+
+    embeddings = np.concatenate(kept_embeddings)
+
+    if pool:
+        pooled, pooled_scenes = pool_scene_embeddings(
+            embeddings, np.ones(len(kept_samples), dtype=bool), kept_samples
+        )
+        return [
+            dict(scene, embedding=embedding, timestamp=None)
+            for embedding, scene in zip(pooled, pooled_scenes)
+        ], dedup_stats
+
+    return [
+        dict(sample, embedding=embedding)
+        for sample, embedding in zip(kept_samples, embeddings)
+    ], dedup_stats
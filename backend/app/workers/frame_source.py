@@ -0,0 +1,197 @@
+import logging
+import queue
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Same geometry as the CLIP processor: shortest side to size, centre crop
+_SCALE_FILTER = "scale={size}:{size}:force_original_aspect_ratio=increase:flags=bicubic,crop={size}:{size}"
+
+
+class FrameSource:
+    """
+    Decoded RGB frames streamed from FFmpeg rawvideo pipes in fixed-size batches
+
+    Frames are either sampled at given timestamps (one input-side seek per
+    frame) or at a constant fps over the whole video (one continuous pipe).
+    FFmpeg scales and centre-crops to size x size, so frames never touch
+    disk and need no PIL decoding or resizing.
+
+    A producer thread fills a small ring of preallocated uint8 batch buffers
+    while the consumer works on the previous batch. Each yielded batch is a
+    view into one of those buffers and is only valid until the next
+    iteration; copy it to keep it.
+
+    Iterating yields (frames, positions): frames has shape (n, size, size, 3)
+    and positions holds the index of each frame in timestamps (or the frame
+    number in fps mode). Frames that fail to decode are skipped.
+    """
+
+    def __init__(
+        self,
+        video_path: str,
+        timestamps: Optional[List[float]] = None,
+        fps: float = 1.0,
+        size: int = 224,
+        batch_size: int = 32,
+        prefetch: int = 2,
+        seek_workers: int = 4,
+        ffmpeg_path: str = "ffmpeg"
+    ):
+        self.video_path = video_path
+        self.timestamps = timestamps
+        self.fps = fps
+        self.size = size
+        self.batch_size = batch_size
+        self.prefetch = prefetch
+        self.seek_workers = seek_workers
+        self.ffmpeg_path = ffmpeg_path
+        self.frame_bytes = size * size * 3
+
+        self.frames_decoded = 0
+        self.frames_failed = 0
+
+    def __iter__(self) -> Iterator[Tuple[np.ndarray, List[int]]]:
+        # The consumer holds one batch and the queue up to prefetch more,
+        # so prefetch + 2 buffers guarantee the producer never overwrites
+        # a batch that is still in use
+        buffers = [
+            np.empty((self.batch_size, self.size, self.size, 3), dtype=np.uint8)
+            for _ in range(self.prefetch + 2)
+        ]
+        batches: "queue.Queue" = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+
+        producer = threading.Thread(
+            target=self._produce,
+            args=(buffers, batches, stop),
+            name="frame-source",
+            daemon=True
+        )
+        producer.start()
+
+        try:
+            while True:
+                item = batches.get()
+                if item is None:
+                    return
+                buffer_index, count, positions = item
+                yield buffers[buffer_index][:count], positions
+        finally:
+            stop.set()
+            producer.join(timeout=5.0)
+
+    def _produce(self, buffers: List[np.ndarray], batches: "queue.Queue", stop: threading.Event) -> None:
+        fill = self._fill_at_timestamps if self.timestamps is not None else self._fill_at_fps
+        ring = 0
+        filled = fill(buffers, lambda: ring, stop)
+        try:
+            for count, positions in filled:
+                if not self._put(batches, (ring, count, positions), stop):
+                    return
+                ring = (ring + 1) % len(buffers)
+        except Exception as e:
+            logger.error(f"Frame decoding failed for {self.video_path}: {e}")
+        finally:
+            # Kills the FFmpeg pipe / waits for in-flight seeks right away
+            filled.close()
+            self._put(batches, None, stop)
+
+    @staticmethod
+    def _put(batches: "queue.Queue", item, stop: threading.Event) -> bool:
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _fill_at_timestamps(self, buffers, current_ring, stop):
+        """Seek to each timestamp in parallel, filling one batch buffer at a time"""
+        with ThreadPoolExecutor(max_workers=self.seek_workers) as pool:
+            for start in range(0, len(self.timestamps), self.batch_size):
+                if stop.is_set():
+                    return
+                indices = range(start, min(start + self.batch_size, len(self.timestamps)))
+                raw_frames = list(pool.map(lambda i: self._decode_at(self.timestamps[i]), indices))
+
+                buffer = buffers[current_ring()]
+                count = 0
+                positions = []
+                for i, raw in zip(indices, raw_frames):
+                    if raw is None:
+                        self.frames_failed += 1
+                        continue
+                    buffer[count] = np.frombuffer(raw, dtype=np.uint8).reshape(self.size, self.size, 3)
+                    positions.append(i)
+                    count += 1
+                self.frames_decoded += count
+                if count:
+                    yield count, positions
+
+    def _decode_at(self, timestamp: float) -> Optional[bytes]:
+        cmd = [
+            self.ffmpeg_path,
+            "-nostdin",
+            "-v", "error",
+            "-ss", f"{timestamp:.3f}",
+            "-i", self.video_path,
+            "-frames:v", "1",
+            "-vf", _SCALE_FILTER.format(size=self.size),
+            "-f", "rawvideo",
+            "-pix_fmt", "rgb24",
+            "pipe:1"
+        ]
+        try:
+            completed = subprocess.run(cmd, check=True, capture_output=True)
+        except Exception as e:
+            logger.warning(f"Frame decode at {timestamp:.3f}s failed: {e}")
+            return None
+        if len(completed.stdout) < self.frame_bytes:
+            return None
+        return completed.stdout[:self.frame_bytes]
+
+    def _fill_at_fps(self, buffers, current_ring, stop):
+        """Read a continuous fps-sampled rawvideo stream straight into batch buffers"""
+        cmd = [
+            self.ffmpeg_path,
+            "-nostdin",
+            "-v", "error",
+            "-i", self.video_path,
+            "-vf", f"fps={self.fps}," + _SCALE_FILTER.format(size=self.size),
+            "-f", "rawvideo",
+            "-pix_fmt", "rgb24",
+            "pipe:1"
+        ]
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        try:
+            frame_number = 0
+            while not stop.is_set():
+                buffer = buffers[current_ring()]
+                count = 0
+                while count < self.batch_size and self._read_frame(process.stdout, buffer[count]):
+                    count += 1
+                if count:
+                    self.frames_decoded += count
+                    yield count, list(range(frame_number, frame_number + count))
+                    frame_number += count
+                if count < self.batch_size:
+                    break
+        finally:
+            process.kill()
+            process.wait()
+
+    def _read_frame(self, stream, row: np.ndarray) -> bool:
+        view = memoryview(row.reshape(-1))
+        filled = 0
+        while filled < self.frame_bytes:
+            read = stream.readinto(view[filled:])
+            if not read:
+                return False
+            filled += read
+        return True
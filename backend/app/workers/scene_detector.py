@@ -1,14 +1,176 @@
+import json
 import logging
-from typing import List, Dict, Any
-from scenedetect import VideoManager, SceneManager
+import multiprocessing
+import os
+import subprocess
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+import cv2
+import numpy as np
+from scenedetect import SceneManager, open_video
 from scenedetect.detectors import ContentDetector
+from scenedetect.scene_detector import FlashFilter
+
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Frames that must pass after a cut before the next one (ContentDetector default)
+MIN_SCENE_LEN = 15
+
+# Adaptive detection aims for a scene count in this range, searching
+# thresholds between the bounds the fixed fallbacks used to jump to
+ADAPTIVE_MIN_SCENES = 5
+ADAPTIVE_MAX_SCENES = 100
+ADAPTIVE_MIN_THRESHOLD = 15.0
+ADAPTIVE_MAX_THRESHOLD = 50.0
+ADAPTIVE_THRESHOLD_STEP = 2.5
+
+# Frames are downscaled to roughly this width before scoring, with the same
+# factor and interpolation as SceneManager's automatic downscale
+SCORE_FRAME_WIDTH = 256
+
+# Content scores kept per SceneDetector (most recently used videos)
+SCORE_CACHE_SIZE = 8
+
+
+def _score_cache_key(video_path: str) -> Optional[Tuple[str, int, int]]:
+    """(path, mtime, size) of a local file, so a rewritten file is rescored; None for URLs"""
+    try:
+        stat = os.stat(video_path)
+    except OSError:
+        return None
+    return video_path, stat.st_mtime_ns, stat.st_size
+
+
+def _prepare_frame(frame: np.ndarray) -> np.ndarray:
+    """Downscale a BGR frame and convert it to HSV for content scoring"""
+    height, width = frame.shape[:2]
+    factor = max(1, width // SCORE_FRAME_WIDTH)
+    if factor > 1:
+        frame = cv2.resize(frame, (round(width / factor), round(height / factor)), interpolation=cv2.INTER_LINEAR)
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+
+
+def _content_score(previous: np.ndarray, current: np.ndarray) -> float:
+    """
+    ContentDetector frame score: mean absolute change of hue, saturation and
+    luminance, equally weighted
+    """
+    return float(np.abs(current.astype(np.int16) - previous.astype(np.int16)).mean())
+
+
+def scenes_from_scores(
+    scores: np.ndarray,
+    fps: float,
+    threshold: float,
+    min_scene_len: int = MIN_SCENE_LEN
+) -> List[Dict[str, Any]]:
+    """
+    Derive the scene list for a threshold from per-frame content scores
+    
+    Cuts are decided by PySceneDetect's own FlashFilter in the mode and
+    length ContentDetector uses, so the result matches detect_scenes. Like
+    detect_scenes, returns no scenes when there are no cuts.
+    """
+    above = np.flatnonzero(scores >= threshold)
+    # Below-threshold frames only change the filter's state on the first
+    # frame and, while merging, min_scene_len frames after an above-threshold
+    # frame; every other frame can be skipped
+    frames = np.union1d(above, above + min_scene_len)
+    frames = np.union1d(frames[frames < len(scores)], [0]) if len(scores) else frames
+    
+    flash_filter = FlashFilter(mode=FlashFilter.Mode.MERGE, length=min_scene_len)
+    cuts = []
+    for frame_num in frames:
+        cuts += flash_filter.filter(frame_num=int(frame_num), above_threshold=bool(scores[frame_num] >= threshold))
+    cuts = sorted(set(cuts))
+    
+    if not cuts:
+        return []
+    
+    boundaries = [0] + cuts + [len(scores)]
+    scenes = []
+    for i, (start, end) in enumerate(zip(boundaries[:-1], boundaries[1:])):
+        start_time = start / fps
+        end_time = end / fps
+        scenes.append({
+            "scene_number": i + 1,
+            "start_time": start_time,
+            "end_time": end_time,
+            "duration": end_time - start_time,
+        })
+    return scenes
+
+
+# Chunk workers seek this far before their start time, then skip forward
+# by frame timestamp, so an approximate (frame-rate based) seek never lands
+# past the first frame of the chunk
+CHUNK_SEEK_MARGIN_SECONDS = 2.0
+
+
+def _score_frame_range(
+    video_path: str,
+    start_time: float,
+    end_time: Optional[float]
+) -> Tuple[np.ndarray, Optional[np.ndarray], Optional[np.ndarray]]:
+    """
+    Content scores for the frames whose timestamps fall in [start_time, end_time)
+    
+    Runs in a worker process. Times are container presentation times in
+    seconds from the start of the stream, so chunk boundaries hold for
+    variable frame rate video and streams with a non-zero start time. The
+    first frame of the range has no predecessor here, so its score is left
+    at 0.0; the prepared first and last frames are returned so the parent
+    can score the chunk boundary.
+    
+    Returns (scores, first_frame, last_frame)
+    """
+    start_ms = start_time * 1000 - 0.5
+    end_ms = end_time * 1000 - 0.5 if end_time is not None else None
+    
+    capture = cv2.VideoCapture(video_path)
+    try:
+        margin = CHUNK_SEEK_MARGIN_SECONDS
+        while True:
+            seek_ms = max(start_time - margin, 0.0) * 1000
+            if seek_ms > 0:
+                capture.set(cv2.CAP_PROP_POS_MSEC, seek_ms)
+            ok, frame = capture.read()
+            frame_ms = capture.get(cv2.CAP_PROP_POS_MSEC)
+            if not ok or seek_ms == 0 or frame_ms <= start_ms:
+                break
+            # Landed past the chunk start: seek further back and retry
+            margin *= 2
+            capture.release()
+            capture = cv2.VideoCapture(video_path)
+        
+        scores = []
+        first = previous = None
+        while ok and (end_ms is None or frame_ms < end_ms):
+            if frame_ms >= start_ms:
+                current = _prepare_frame(frame)
+                if previous is None:
+                    first = current
+                    scores.append(0.0)
+                else:
+                    scores.append(_content_score(previous, current))
+                previous = current
+            ok, frame = capture.read()
+            frame_ms = capture.get(cv2.CAP_PROP_POS_MSEC)
+    finally:
+        capture.release()
+    
+    return np.asarray(scores, dtype=np.float32), first, previous
+
 
 class SceneDetector:
     def __init__(self, threshold: float = 30.0):
         self.threshold = threshold
+        self.ffprobe_path = "ffprobe"
+        # (path, mtime, size) -> (float32 per-frame content scores, fps), LRU
+        self._score_cache: "OrderedDict[Tuple[str, int, int], Tuple[np.ndarray, float]]" = OrderedDict()
     
     def detect_scenes(self, video_path: str) -> List[Dict[str, Any]]:
         """
@@ -17,20 +179,16 @@ class SceneDetector:
         Returns list of scenes with start/end timestamps
         """
         try:
-            video_manager = VideoManager([video_path])
-            scene_manager = SceneManager()
+            video = open_video(video_path)
+            scene_manager = SceneManager()  # Downscales automatically
             
             # Add ContentDetector algorithm (detects fast cuts)
             scene_manager.add_detector(
                 ContentDetector(threshold=self.threshold)
             )
             
-            # Start video manager
-            video_manager.set_downscale_factor()
-            video_manager.start()
-            
             # Perform scene detection
-            scene_manager.detect_scenes(frame_source=video_manager)
+            scene_manager.detect_scenes(video=video)
             
             # Get scene list
             scene_list = scene_manager.get_scene_list()
@@ -54,21 +212,215 @@ class SceneDetector:
             logger.error(f"Scene detection failed: {e}")
             return []
     
+    def compute_content_scores(self, video_path: str) -> Tuple[np.ndarray, float]:
+        """
+        Decode the video once and return its per-frame content scores
+        
+        Returns (scores, fps) where scores is a float32 array with one entry
+        per frame (0.0 for the first). Results for local files are cached
+        (keyed by path, mtime and size; the SCORE_CACHE_SIZE most recent
+        videos), so any number of thresholds can be evaluated without
+        decoding again.
+        """
+        cache_key = _score_cache_key(video_path)
+        cached = self._score_cache.get(cache_key) if cache_key is not None else None
+        if cached is not None:
+            self._score_cache.move_to_end(cache_key)
+            return cached
+        
+        if settings.SCENE_DETECTION_WORKERS > 1:
+            try:
+                result = self._compute_content_scores_parallel(video_path)
+                if result is not None:
+                    self._cache_scores(cache_key, result)
+                    return result
+            except Exception as e:
+                logger.warning(f"Parallel scene scoring failed, falling back to one process: {e}")
+        
+        capture = cv2.VideoCapture(video_path)
+        if not capture.isOpened():
+            raise IOError(f"Could not open video: {video_path}")
+        
+        try:
+            fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+            frame_count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+            scores = np.zeros(max(frame_count, 0), dtype=np.float32)
+            
+            previous = None
+            frame_num = 0
+            while True:
+                ok, frame = capture.read()
+                if not ok:
+                    break
+                current = _prepare_frame(frame)
+                if frame_num >= len(scores):
+                    # Container frame count was an underestimate
+                    scores = np.resize(scores, max(16, len(scores) * 2))
+                scores[frame_num] = 0.0 if previous is None else _content_score(previous, current)
+                previous = current
+                frame_num += 1
+        finally:
+            capture.release()
+        
+        scores = np.ascontiguousarray(scores[:frame_num])
+        self._cache_scores(cache_key, (scores, fps))
+        logger.info(f"Computed content scores for {frame_num} frames of {video_path}")
+        return scores, fps
+    
+    def _cache_scores(self, cache_key: Optional[Tuple[str, int, int]], result: Tuple[np.ndarray, float]) -> None:
+        if cache_key is None:
+            return
+        self._score_cache[cache_key] = result
+        self._score_cache.move_to_end(cache_key)
+        while len(self._score_cache) > SCORE_CACHE_SIZE:
+            self._score_cache.popitem(last=False)
+    
+    def detect_scenes_parallel(self, video_path: str) -> List[Dict[str, Any]]:
+        """
+        Scene detection at self.threshold, scoring keyframe-aligned chunks of
+        the video in a process pool
+        
+        Falls back to a single-process decode for short videos or when the
+        pool cannot be used.
+        """
+        try:
+            scores, fps = self.compute_content_scores(video_path)
+        except Exception as e:
+            logger.error(f"Scene detection failed: {e}")
+            return []
+        
+        scenes = scenes_from_scores(scores, fps, self.threshold)
+        logger.info(f"Detected {len(scenes)} scenes in {video_path}")
+        return scenes
+    
+    def _compute_content_scores_parallel(self, video_path: str) -> Optional[Tuple[np.ndarray, float]]:
+        """
+        Score the video in chunks across SCENE_DETECTION_WORKERS processes
+        
+        Chunks start on keyframes, located by container timestamp, so each
+        worker seeks close to its first frame and decodes little it does not
+        score. Every worker scores its own frames; the score of each
+        chunk's first frame (a possible cut on the chunk edge) is computed
+        here from the neighbouring chunk's last frame, so the stitched
+        array is identical to a single sequential pass.
+        
+        Returns None when the video is too short to be worth splitting.
+        """
+        capture = cv2.VideoCapture(video_path)
+        try:
+            fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+            frame_count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        finally:
+            capture.release()
+        
+        duration = frame_count / fps if frame_count > 0 else 0.0
+        if duration < settings.SCENE_DETECTION_PARALLEL_MIN_SECONDS:
+            return None
+        
+        start_times = self._plan_chunks(video_path, duration)
+        if len(start_times) < 2:
+            return None
+        
+        end_times = start_times[1:] + [None]
+        workers = min(settings.SCENE_DETECTION_WORKERS, len(start_times))
+        # spawn, not fork: the parent may already hold torch / CUDA state
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            chunks = list(pool.map(
+                _score_frame_range,
+                [video_path] * len(start_times),
+                start_times,
+                end_times
+            ))
+        
+        # Stitch chunks back together in order, scoring each chunk edge
+        parts = []
+        previous_last = None
+        for chunk_scores, first, last in chunks:
+            if len(chunk_scores) == 0:
+                continue
+            if previous_last is not None and first is not None:
+                chunk_scores[0] = _content_score(previous_last, first)
+            parts.append(chunk_scores)
+            previous_last = last
+        
+        scores = np.ascontiguousarray(np.concatenate(parts)) if parts else np.zeros(0, dtype=np.float32)
+        logger.info(
+            f"Computed content scores for {len(scores)} frames of {video_path} "
+            f"in {len(start_times)} chunks on {workers} processes"
+        )
+        return scores, fps
+    
+    def _plan_chunks(self, video_path: str, duration: float) -> List[float]:
+        """Start time of each chunk (seconds from stream start), snapped to the next keyframe"""
+        keyframes = self._keyframe_times(video_path)
+        chunk_seconds = settings.SCENE_DETECTION_CHUNK_SECONDS
+        
+        start_times = [0.0]
+        target = chunk_seconds
+        for keyframe in keyframes:
+            if keyframe >= duration:
+                break
+            if keyframe >= target:
+                start_times.append(keyframe)
+                target = keyframe + chunk_seconds
+        return start_times
+    
+    def _keyframe_times(self, video_path: str) -> List[float]:
+        """
+        Keyframe presentation times relative to the stream start, read from
+        packet flags (no decode)
+        """
+        cmd = [
+            self.ffprobe_path,
+            "-v", "error",
+            "-select_streams", "v:0",
+            "-show_entries", "stream=start_time:packet=pts_time,flags",
+            "-of", "json",
+            video_path
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        probe = json.loads(result.stdout)
+        
+        streams = probe.get("streams") or [{}]
+        stream_start = float(streams[0].get("start_time") or 0.0)
+        
+        keyframes = []
+        for packet in probe.get("packets", []):
+            pts_time = packet.get("pts_time")
+            if "K" in packet.get("flags", "") and pts_time not in (None, "N/A"):
+                keyframes.append(float(pts_time) - stream_start)
+        return sorted(keyframes)
+    
     def detect_scenes_adaptive(self, video_path: str) -> List[Dict[str, Any]]:
         """
         Adaptive scene detection that adjusts threshold based on content
+        
+        The video is decoded once into per-frame content scores; thresholds
+        are then searched over the cached scores, starting from
+        self.threshold and moving down for static content (too few scenes)
+        or up for fast-cut content (too many), until the scene count falls
+        within [ADAPTIVE_MIN_SCENES, ADAPTIVE_MAX_SCENES] or the search
+        bound is reached.
         """
-        # Try with default threshold first
-        scenes = self.detect_scenes(video_path)
+        try:
+            scores, fps = self.compute_content_scores(video_path)
+        except Exception as e:
+            logger.error(f"Scene detection failed: {e}")
+            return []
+        
+        threshold = self.threshold
+        scenes = scenes_from_scores(scores, fps, threshold)
         
-        # If too few or too many scenes, adjust
-        if len(scenes) < 5:
+        if len(scenes) < ADAPTIVE_MIN_SCENES:
             # Content might be static, lower threshold
-            detector = SceneDetector(threshold=15.0)
-            scenes = detector.detect_scenes(video_path)
-        elif len(scenes) > 100:
+            while len(scenes) < ADAPTIVE_MIN_SCENES and threshold > ADAPTIVE_MIN_THRESHOLD:
+                threshold = max(threshold - ADAPTIVE_THRESHOLD_STEP, ADAPTIVE_MIN_THRESHOLD)
+                scenes = scenes_from_scores(scores, fps, threshold)
+        elif len(scenes) > ADAPTIVE_MAX_SCENES:
             # Too many cuts, raise threshold
-            detector = SceneDetector(threshold=50.0)
-            scenes = detector.detect_scenes(video_path)
+            while len(scenes) > ADAPTIVE_MAX_SCENES and threshold < ADAPTIVE_MAX_THRESHOLD:
+                threshold = min(threshold + ADAPTIVE_THRESHOLD_STEP, ADAPTIVE_MAX_THRESHOLD)
+                scenes = scenes_from_scores(scores, fps, threshold)
         
+        logger.info(f"Detected {len(scenes)} scenes in {video_path} (threshold {threshold})")
         return scenes
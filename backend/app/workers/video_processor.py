@@ -1,11 +1,51 @@
 import subprocess
 import logging
 import os
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, List, Optional
+import numpy as np
+
+from app.workers.frame_source import FrameSource
 
 logger = logging.getLogger(__name__)
 
 
+AUDIO_SAMPLE_RATE = 16000  # Whisper input rate
+
+
+def _pcm_s16le_to_float32(raw) -> np.ndarray:
+    """Convert little-endian 16-bit PCM bytes to float32 samples in [-1, 1)"""
+    samples = np.frombuffer(raw, dtype="<i2", count=len(raw) // 2)
+    return samples.astype(np.float32) / 32768.0
+
+
+def _read_pcm_stream(stream, sample_rate: int = AUDIO_SAMPLE_RATE, chunk_bytes: int = 1 << 20) -> np.ndarray:
+    """
+    Read pcm_s16le from a pipe into float32 samples, chunk by chunk
+    
+    Only one chunk of raw bytes is held at a time; samples go into a buffer
+    that doubles as needed (starting at one minute).
+    """
+    buffer = np.empty(sample_rate * 60, dtype=np.float32)
+    size = 0
+    carry = b""
+    while True:
+        chunk = stream.read(chunk_bytes)
+        if not chunk:
+            break
+        # Keep a dangling odd byte for the next read
+        chunk = carry + chunk
+        usable = len(chunk) - len(chunk) % 2
+        carry = chunk[usable:]
+        samples = _pcm_s16le_to_float32(chunk[:usable])
+        
+        if size + len(samples) > len(buffer):
+            buffer = np.resize(buffer, max(len(buffer) * 2, size + len(samples)))
+        buffer[size:size + len(samples)] = samples
+        size += len(samples)
+    return buffer[:size].copy()
+
+
 class VideoProcessor:
     def __init__(self):
         self.ffmpeg_path = "ffmpeg"  # Assumes ffmpeg is in PATH
@@ -83,6 +123,75 @@ class VideoProcessor:
             logger.error(f"Audio extraction failed: {e}")
             return False
     
+    def decode_audio(
+        self,
+        video_path: str,
+        sample_rate: int = AUDIO_SAMPLE_RATE,
+        chunk_bytes: int = 1 << 20
+    ) -> Optional[np.ndarray]:
+        """
+        Decode the audio track to mono float32 samples through a pipe
+        
+        FFmpeg writes raw pcm_s16le to stdout, which is converted chunk by
+        chunk into a growing float32 buffer, so nothing touches disk and the
+        samples can go straight to Whisper or the VAD.
+        
+        Returns:
+            float32 array at sample_rate, or None if decoding failed
+        """
+        cmd = [
+            self.ffmpeg_path,
+            "-nostdin",
+            "-v", "error",
+            "-i", video_path,
+            "-map", "0:a:0",
+            "-f", "s16le",
+            "-acodec", "pcm_s16le",
+            "-ar", str(sample_rate),
+            "-ac", "1",
+            "pipe:1"
+        ]
+        
+        try:
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        except Exception as e:
+            logger.error(f"Audio decoding failed: {e}")
+            return None
+        
+        with process:
+            audio = _read_pcm_stream(process.stdout, sample_rate, chunk_bytes)
+            stderr = process.stderr.read()
+        
+        if process.returncode != 0:
+            logger.error(f"Audio decoding failed: {stderr.decode(errors='replace').strip()}")
+            return None
+        
+        logger.info(f"Decoded {len(audio) / sample_rate:.1f}s of audio from {video_path}")
+        return audio
+    
+    def stream_frames(
+        self,
+        video_path: str,
+        timestamps: Optional[List[float]] = None,
+        fps: float = 1.0,
+        size: int = 224,
+        batch_size: int = 32
+    ) -> FrameSource:
+        """
+        Stream size x size RGB frames in batches without writing images to disk
+        
+        Samples at the given timestamps, or at fps over the whole video when
+        timestamps is None. See FrameSource for the batch format.
+        """
+        return FrameSource(
+            video_path,
+            timestamps=timestamps,
+            fps=fps,
+            size=size,
+            batch_size=batch_size,
+            ffmpeg_path=self.ffmpeg_path
+        )
+    
     def extract_frames(self, video_path: str, output_dir: str, fps: float = 1.0) -> list[str]:
         """Extract frames at specified FPS"""
         try:
@@ -110,6 +219,157 @@ class VideoProcessor:
             logger.error(f"Frame extraction failed: {e}")
             return []
     
+    def has_audio_stream(self, video_path: str) -> Optional[bool]:
+        """Whether the file has an audio stream (None if ffprobe could not tell)"""
+        cmd = [
+            self.ffprobe_path,
+            "-v", "error",
+            "-select_streams", "a",
+            "-show_entries", "stream=index",
+            "-of", "csv=p=0",
+            video_path
+        ]
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        except Exception as e:
+            logger.warning(f"Audio stream probe failed for {video_path}: {e}")
+            return None
+        return bool(result.stdout.strip())
+    
+    def _run_extraction(self, cmd: List[str], pipe_audio: bool) -> Optional[np.ndarray]:
+        """Run an extraction command; returns the piped audio samples when pipe_audio"""
+        if not pipe_audio:
+            subprocess.run(cmd, check=True, capture_output=True)
+            return None
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE) as process:
+            audio = _read_pcm_stream(process.stdout)
+            stderr = process.stderr.read()
+        if process.returncode != 0:
+            raise RuntimeError(stderr.decode(errors="replace").strip())
+        return audio
+    
+    def extract_media(
+        self,
+        video_path: str,
+        thumbnail_path: Optional[str] = None,
+        audio_path: Optional[str] = None,
+        frames_dir: Optional[str] = None,
+        fps: float = 1.0,
+        thumbnail_timestamp: float = 1.0,
+        decode_audio: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Extract thumbnail, 16 kHz mono audio and sampled frames in one pass
+        
+        The input is demuxed and decoded once; a single filter graph feeds
+        every requested output. Pass None to skip an output. With
+        decode_audio the audio is piped back as float32 samples instead of
+        being written to audio_path.
+        
+        Returns:
+            {
+                'thumbnail_path': path or None,
+                'audio_path': path or None,
+                'audio': float32 samples or None (decode_audio only;
+                         None when the video has no audio track),
+                'frames': sorted frame paths,
+                'timings': seconds from start until each output was last
+                           written, plus 'total' for the whole pass
+            }
+        """
+        result = {"thumbnail_path": None, "audio_path": None, "audio": None, "frames": [], "timings": {}}
+        
+        video_outputs = []
+        if thumbnail_path:
+            video_outputs.append("thumb")
+        if frames_dir:
+            video_outputs.append("frames")
+            os.makedirs(frames_dir, exist_ok=True)
+        
+        filters = []
+        if len(video_outputs) == 2:
+            filters.append("[0:v]split=2[vthumb][vframes]")
+            sources = {"thumb": "[vthumb]", "frames": "[vframes]"}
+        else:
+            sources = {name: "[0:v]" for name in video_outputs}
+        if thumbnail_path:
+            filters.append(f"{sources['thumb']}trim=start={thumbnail_timestamp},setpts=PTS-STARTPTS[thumb]")
+        if frames_dir:
+            filters.append(f"{sources['frames']}fps={fps}[frames]")
+        
+        # "0:a:0?" alone is not enough: an audio output with no stream fails
+        # the whole command, so leave it out for videos without audio
+        include_audio = bool(audio_path or decode_audio)
+        has_audio = self.has_audio_stream(video_path) if include_audio else None
+        if has_audio is False:
+            logger.info(f"No audio stream in {video_path}, skipping audio output")
+            include_audio = False
+        
+        def build_command(with_audio: bool) -> List[str]:
+            cmd = [self.ffmpeg_path, "-y", "-nostdin", "-v", "error", "-i", video_path]
+            if filters:
+                cmd += ["-filter_complex", ";".join(filters)]
+            if thumbnail_path:
+                cmd += ["-map", "[thumb]", "-frames:v", "1", "-q:v", "2", thumbnail_path]
+            if with_audio:
+                cmd += [
+                    "-map", "0:a:0",
+                    "-acodec", "pcm_s16le",  # WAV format for Whisper
+                    "-ar", str(AUDIO_SAMPLE_RATE),  # 16kHz sample rate
+                    "-ac", "1",  # Mono
+                ]
+                cmd += ["-f", "s16le", "pipe:1"] if decode_audio else [audio_path]
+            if frames_dir:
+                cmd += ["-map", "[frames]", os.path.join(frames_dir, "frame_%04d.jpg")]
+            return cmd
+        
+        if not (video_outputs or include_audio):
+            return result
+        
+        start = time.time()
+        audio = None
+        try:
+            audio = self._run_extraction(build_command(include_audio), decode_audio and include_audio)
+        except Exception as e:
+            if not (include_audio and has_audio is None and video_outputs):
+                logger.error(f"Fused media extraction failed: {e}")
+                return result
+            # The audio probe was inconclusive; keep the video outputs
+            logger.warning(f"Fused media extraction failed, retrying without audio: {e}")
+            try:
+                self._run_extraction(build_command(False), False)
+            except Exception as retry_error:
+                logger.error(f"Fused media extraction failed: {retry_error}")
+                return result
+        result["timings"]["total"] = time.time() - start
+        
+        if audio is not None and len(audio):
+            result["audio"] = audio
+            result["timings"]["audio"] = result["timings"]["total"]
+        
+        if thumbnail_path and os.path.exists(thumbnail_path):
+            result["thumbnail_path"] = thumbnail_path
+            result["timings"]["thumbnail"] = os.path.getmtime(thumbnail_path) - start
+        
+        if audio_path and os.path.exists(audio_path):
+            result["audio_path"] = audio_path
+            result["timings"]["audio"] = os.path.getmtime(audio_path) - start
+        
+        if frames_dir:
+            result["frames"] = sorted([
+                os.path.join(frames_dir, f)
+                for f in os.listdir(frames_dir)
+                if f.startswith("frame_") and f.endswith(".jpg")
+            ])
+            if result["frames"]:
+                result["timings"]["frames"] = max(os.path.getmtime(f) for f in result["frames"]) - start
+        
+        logger.info(
+            f"Extracted media from {video_path} in one pass: "
+            f"{len(result['frames'])} frames, timings {result['timings']}"
+        )
+        return result
+    
     def transcode_video(
         self,
         input_path: str,
@@ -12,3 +12,25 @@ def test_list_videos(client):
     response = client.get("/api/v1/videos/")
     assert response.status_code == 200
     assert "videos" in response.json()
+
+def test_search_warm_up_retries_until_it_succeeds(monkeypatch):
+    import asyncio
+    from types import SimpleNamespace
+    from app import main
+
+    class FlakyService:
+        calls = 0
+
+        def warm_up(self):
+            self.calls += 1
+            if self.calls < 3:
+                raise ConnectionError("vector database unavailable")
+
+    monkeypatch.setattr(main.settings, "SEARCH_WARMUP_RETRY_SECONDS", 0.0)
+    service = FlakyService()
+    state = SimpleNamespace(search_service=service, search_ready=False)
+
+    asyncio.run(main._warm_up_search(SimpleNamespace(state=state)))
+
+    assert state.search_ready
+    assert service.calls == 3
@@ -0,0 +1,84 @@
+import numpy as np
+
+from app.ai.audio_segmentation import (
+    SAMPLE_RATE,
+    compact_speech,
+    detect_speech_regions,
+    find_silences,
+    plan_chunks,
+    remap_segments,
+)
+
+
+def _speech(seconds, seed=0):
+    rng = np.random.default_rng(seed)
+    return (0.3 * rng.standard_normal(int(seconds * SAMPLE_RATE))).astype(np.float32)
+
+
+def _silence(seconds):
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+
+def test_find_silences_ignores_short_pauses():
+    audio = np.concatenate([_speech(2), _silence(0.2), _speech(2), _silence(1.0), _speech(1)])
+
+    silences = find_silences(audio, min_silence_seconds=0.5)
+
+    assert len(silences) == 1
+    start, end = silences[0]
+    assert abs(start / SAMPLE_RATE - 4.2) < 0.05
+    assert abs(end / SAMPLE_RATE - 5.2) < 0.05
+
+
+def test_plan_chunks_cuts_in_silences_near_target():
+    audio = np.concatenate([
+        _speech(8), _silence(1), _speech(3), _silence(1), _speech(8), _silence(1), _speech(8)
+    ])
+
+    chunks = plan_chunks(audio, target_seconds=10, max_seconds=15)
+
+    assert chunks[0][0] == 0 and chunks[-1][1] == len(audio)
+    assert all(a[1] == b[0] for a, b in zip(chunks, chunks[1:]))
+    # Every cut lands inside a silent stretch
+    assert all(not np.any(audio[end - 160:end + 160]) for _, end in chunks[:-1])
+    assert abs(chunks[0][1] / SAMPLE_RATE - 8.5) < 0.05
+
+
+def test_plan_chunks_hard_cuts_without_silence():
+    chunks = plan_chunks(_speech(25), target_seconds=10, max_seconds=12)
+
+    assert [end - start for start, end in chunks[:-1]] == [12 * SAMPLE_RATE, 12 * SAMPLE_RATE]
+    assert chunks[-1][1] == 25 * SAMPLE_RATE
+
+
+def test_vad_keeps_padded_speech_and_drops_clicks():
+    click = _silence(3)
+    click[SAMPLE_RATE:SAMPLE_RATE + 160] = 0.5
+    audio = np.concatenate([_silence(5), _speech(2), click, _speech(1, seed=1), _silence(4)])
+
+    regions = detect_speech_regions(audio, padding_seconds=0.2)
+
+    # Edges are accurate to one 30 ms analysis frame
+    expected = [(4.8, 7.2), (9.8, 11.2)]
+    assert len(regions) == len(expected)
+    assert np.allclose(np.array(regions) / SAMPLE_RATE, expected, atol=0.03)
+
+
+def test_compacted_timestamps_map_back_to_original_time():
+    audio = np.concatenate([_silence(10), _speech(2), _silence(20), _speech(3, seed=1)])
+    regions = detect_speech_regions(audio, padding_seconds=0.0)
+
+    compact, mapping = compact_speech(audio, regions, gap_seconds=0.5)
+
+    assert abs(len(compact) / SAMPLE_RATE - 5.5) < 0.05
+    segments = [
+        {"start": 0.5, "end": 1.5, "text": " a", "words": [{"word": "a", "start": 0.5, "end": 0.7}]},
+        {"start": 3.0, "end": 4.0, "text": " b"},
+    ]
+    remapped = remap_segments(segments, mapping)
+
+    times = [remapped[0]["start"], remapped[0]["end"], remapped[0]["words"][0]["end"],
+             remapped[1]["start"], remapped[1]["end"]]
+    assert np.allclose(times, [10.5, 11.5, 10.7, 32.5, 33.5], atol=0.03)
+    # The input segments are not modified
+    assert segments[0]["start"] == 0.5
@@ -0,0 +1,57 @@
+import numpy as np
+
+from app.ai.embedding_cache import QueryEmbeddingCache, normalize_query
+
+
+class FakeEncoder:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, text):
+        self.calls.append(text)
+        return np.full(4, len(text), dtype=np.float32)
+
+
+def test_normalized_queries_share_an_entry():
+    cache = QueryEmbeddingCache()
+    encode = FakeEncoder()
+
+    first = cache.get_or_compute("  Dog  on the BEACH", "clip:test", encode)
+    second = cache.get_or_compute("dog on the beach", "clip:test", encode)
+
+    assert normalize_query("  Dog  on the BEACH") == "dog on the beach"
+    assert encode.calls == ["dog on the beach"]
+    assert second.dtype == np.float32
+    assert np.array_equal(first, second)
+    assert cache.stats()["local_hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_key_includes_model_and_version():
+    cache = QueryEmbeddingCache(version="1")
+
+    assert cache.key("cat", "clip:a") != cache.key("cat", "sbert:a")
+    assert cache.key("cat", "clip:a") != QueryEmbeddingCache(version="2").key("cat", "clip:a")
+
+
+def test_lru_eviction_and_ttl_expiry():
+    cache = QueryEmbeddingCache(max_entries=2)
+    encode = FakeEncoder()
+    for text in ("a", "b", "a", "c"):
+        cache.get_or_compute(text, "m", encode)
+
+    # "b" was least recently used when "c" arrived
+    assert cache.get(cache.key("b", "m")) is None
+    assert cache.get(cache.key("a", "m")) is not None
+    assert cache.stats()["evictions"] == 1
+
+    expired = QueryEmbeddingCache(ttl_seconds=0)
+    expired.get_or_compute("a", "m", encode)
+    assert expired.get(expired.key("a", "m")) is None
+
+
+def test_zero_vectors_are_not_cached():
+    cache = QueryEmbeddingCache()
+    cache.get_or_compute("broken", "m", lambda text: np.zeros(4))
+
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,96 @@
+import sys
+import threading
+import time
+import types
+
+import numpy as np
+
+from app.ai.embedding_pipeline import VisualEmbeddingPipeline
+
+
+class SlowEncoder:
+    """Stands in for CLIPEmbedder: preprocess on workers, encode on the caller"""
+
+    def __init__(self, fail_tag=None):
+        self.fail_tag = fail_tag
+        self.preprocess_threads = set()
+
+    def preprocess_frames(self, frames):
+        self.preprocess_threads.add(threading.current_thread().name)
+        time.sleep(0.01)
+        return frames.astype(np.float32)
+
+    def encode_pixels(self, pixels):
+        if pixels[0, 0] == self.fail_tag:
+            raise RuntimeError("boom")
+        time.sleep(0.01)
+        return pixels[:, :1]
+
+
+def _batches(count, size=4):
+    for tag in range(count):
+        yield np.full((size, 3), tag, dtype=np.uint8), tag
+
+
+def test_results_keep_input_order_and_stats_are_reported():
+    encoder = SlowEncoder()
+    pipeline = VisualEmbeddingPipeline(encoder, preprocess_workers=3, queue_size=2, inference_threads=0)
+
+    results = list(pipeline.run(_batches(10)))
+
+    assert [tag for _, tag in results] == list(range(10))
+    assert all(np.all(embeddings == tag) for embeddings, tag in results)
+    assert all(name.startswith("clip-preprocess") for name in encoder.preprocess_threads)
+    stats = pipeline.stats()
+    assert stats["frames"] == 40 and stats["batches"] == 10
+    assert stats["frames_per_second"] > 0
+    assert stats["queue_depth_max"] <= 2
+
+
+def test_failed_batches_are_skipped():
+    pipeline = VisualEmbeddingPipeline(SlowEncoder(fail_tag=3), preprocess_workers=2, queue_size=2, inference_threads=0)
+
+    tags = [tag for _, tag in pipeline.run(_batches(5))]
+
+    assert tags == [0, 1, 2, 4]
+    assert pipeline.stats()["failed_batches"] == 1
+
+
+def test_stopping_early_releases_the_feeder():
+    pipeline = VisualEmbeddingPipeline(SlowEncoder(), preprocess_workers=2, queue_size=1, inference_threads=0)
+    before = threading.active_count()
+
+    for _ in pipeline.run(_batches(100)):
+        break
+    time.sleep(0.3)
+
+    assert threading.active_count() <= before + 2
+
+
+def test_stopping_early_closes_the_source():
+    closed = threading.Event()
+
+    def source():
+        try:
+            yield from _batches(100)
+        finally:
+            closed.set()
+
+    pipeline = VisualEmbeddingPipeline(SlowEncoder(), preprocess_workers=2, queue_size=1, inference_threads=0)
+    for _ in pipeline.run(source()):
+        break
+
+    assert closed.wait(timeout=2.0)
+
+
+def test_torch_thread_count_is_restored_after_the_run(monkeypatch):
+    settings = []
+    torch = types.SimpleNamespace(get_num_threads=lambda: 16, set_num_threads=settings.append)
+    monkeypatch.setitem(sys.modules, "torch", torch)
+    pipeline = VisualEmbeddingPipeline(SlowEncoder(), inference_threads=2)
+
+    results = pipeline.run(_batches(3))
+    next(results)
+    results.close()
+
+    assert settings == [2, 16]
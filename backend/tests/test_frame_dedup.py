@@ -0,0 +1,62 @@
+import numpy as np
+from PIL import Image
+
+from app.ai.frame_dedup import NearDuplicateFilter, dhash
+
+
+def _frame(tmp_path, name, pixels, start, end, scene_number=1):
+    path = tmp_path / f"{name}.png"
+    Image.fromarray(pixels.astype(np.uint8)).save(path)
+    return {"path": str(path), "start_time": start, "end_time": end, "scene_number": scene_number}
+
+
+def _dedup(frames):
+    dedup_filter = NearDuplicateFilter()
+    kept = [frame for frame in frames if dedup_filter.keep(frame["path"], frame)]
+    return kept, dedup_filter.stats()
+
+
+def test_identical_frames_collapse_into_one_span(tmp_path):
+    rng = np.random.default_rng(0)
+    slide = rng.integers(0, 255, size=(90, 160, 3))
+    other = rng.integers(0, 255, size=(90, 160, 3))
+    frames = [
+        _frame(tmp_path, "a", slide, 0.0, 1.0),
+        # Same slide with a little encoder noise
+        _frame(tmp_path, "b", np.clip(slide + rng.integers(-2, 3, slide.shape), 0, 255), 1.0, 2.0),
+        _frame(tmp_path, "c", slide, 2.0, 3.0),
+        _frame(tmp_path, "d", other, 3.0, 4.0),
+    ]
+
+    kept, stats = _dedup(frames)
+
+    assert [f["path"] for f in kept] == [frames[0]["path"], frames[3]["path"]]
+    assert (kept[0]["start_time"], kept[0]["end_time"]) == (0.0, 3.0)
+    assert stats == {"total": 4, "kept": 2, "dropped": 2, "dedup_ratio": 0.5}
+
+
+def test_duplicates_are_not_merged_across_scenes(tmp_path):
+    slide = np.random.default_rng(0).integers(0, 255, size=(90, 160, 3))
+    frames = [
+        _frame(tmp_path, "a", slide, 0.0, 1.0, scene_number=1),
+        _frame(tmp_path, "b", slide, 1.0, 2.0, scene_number=1),
+        _frame(tmp_path, "c", slide, 2.0, 3.0, scene_number=2),
+    ]
+
+    kept, stats = _dedup(frames)
+
+    assert [f["path"] for f in kept] == [frames[0]["path"], frames[2]["path"]]
+    assert kept[0]["end_time"] == 2.0
+    assert stats["dropped"] == 1
+
+
+def test_unreadable_frames_are_kept(tmp_path):
+    frames = [
+        {"path": str(tmp_path / "missing.jpg"), "start_time": 0.0, "end_time": 1.0},
+        {"path": str(tmp_path / "missing.jpg"), "start_time": 1.0, "end_time": 2.0},
+    ]
+
+    kept, stats = _dedup(frames)
+
+    assert dhash(frames[0]["path"]) is None
+    assert len(kept) == 2 and stats["dedup_ratio"] == 0.0
@@ -0,0 +1,38 @@
+import numpy as np
+
+from app.workers.frame_sampler import pool_scene_embeddings, sample_scene_timestamps
+
+
+SCENES = [
+    {"scene_number": 1, "start_time": 0.0, "end_time": 6.0},
+    {"scene_number": 2, "start_time": 6.0, "end_time": 9.0},
+]
+
+
+def test_samples_are_centred_inside_each_scene():
+    samples = sample_scene_timestamps(SCENES, frames_per_scene=3)
+
+    assert [s["timestamp"] for s in samples] == [1.0, 3.0, 5.0, 6.5, 7.5, 8.5]
+    assert [s["scene_number"] for s in samples] == [1, 1, 1, 2, 2, 2]
+    assert (samples[0]["start_time"], samples[0]["end_time"]) == (0.0, 2.0)
+    assert (samples[4]["start_time"], samples[4]["end_time"]) == (7.0, 8.0)
+
+
+def test_no_scenes_samples_the_whole_video():
+    samples = sample_scene_timestamps([], frames_per_scene=2, duration=10.0)
+
+    assert [s["timestamp"] for s in samples] == [2.5, 7.5]
+    assert sample_scene_timestamps([], frames_per_scene=2) == []
+
+
+def test_pooling_averages_valid_frames_per_scene():
+    samples = sample_scene_timestamps(SCENES, frames_per_scene=2)
+    embeddings = np.array([[1, 0], [0, 1], [1, 0], [5, 5]], dtype=np.float32)
+    valid = np.array([True, True, True, False])
+
+    pooled, scenes = pool_scene_embeddings(embeddings, valid, samples)
+
+    assert [s["scene_number"] for s in scenes] == [1, 2]
+    assert (scenes[1]["start_time"], scenes[1]["end_time"]) == (6.0, 7.5)
+    np.testing.assert_allclose(pooled[0], [np.sqrt(0.5), np.sqrt(0.5)], rtol=1e-6)
+    np.testing.assert_allclose(pooled[1], [1.0, 0.0])
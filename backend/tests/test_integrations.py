@@ -1,10 +1,13 @@
 import pytest
 import os
+import numpy as np
 from app.workers.video_processor import VideoProcessor
 from app.workers.scene_detector import SceneDetector
 from app.ai.clip_model import CLIPEmbedder
+from app.ai.sentence_bert import SentenceBERTEmbedder
 from app.ai.whisper_model import WhisperTranscriber
 from app.workers.compilation_renderer import CompilationRenderer
+from app.core.config import settings
 
 
 # Mark all tests as integration tests
@@ -27,6 +30,29 @@ class TestVideoProcessor:
         success = processor.generate_thumbnail(sample_video_path, output_path)
         assert success
         assert os.path.exists(output_path)
+    
+    def test_stream_frames(self, sample_video_path):
+        processor = VideoProcessor()
+        source = processor.stream_frames(sample_video_path, timestamps=[0.5, 1.0, 1.5], batch_size=2)
+        
+        batches = [(frames.copy(), positions) for frames, positions in source]
+        
+        assert [positions for _, positions in batches] == [[0, 1], [2]]
+        assert batches[0][0].shape == (2, 224, 224, 3)
+    
+    def test_extract_media_without_audio_track(self, silent_video_path, tmp_path):
+        processor = VideoProcessor()
+        
+        result = processor.extract_media(
+            silent_video_path,
+            thumbnail_path=str(tmp_path / "thumb.jpg"),
+            frames_dir=str(tmp_path / "frames"),
+            decode_audio=True
+        )
+        
+        assert result["audio"] is None
+        assert result["thumbnail_path"] is not None
+        assert len(result["frames"]) == 3
 
 
 class TestSceneDetector:
@@ -47,6 +73,22 @@ class TestCLIPModel:
         
         assert embedding.shape == (512,)
     
+    def test_encode_image_raises_on_unreadable_file(self, tmp_path):
+        model = CLIPEmbedder()
+        broken = tmp_path / "broken.jpg"
+        broken.write_bytes(b"not an image")
+        
+        with pytest.raises(Exception):
+            model.encode_image(str(broken))
+    
+    def test_encode_frames(self):
+        model = CLIPEmbedder()
+        frames = np.zeros((2, model.image_size, model.image_size, 3), dtype=np.uint8)
+        embeddings = model.encode_frames(frames)
+        
+        assert embeddings.shape == (2, 512)
+        assert np.allclose(np.linalg.norm(embeddings, axis=1), 1.0, atol=1e-5)
+    
     def test_encode_text(self):
         model = CLIPEmbedder()
         embedding = model.encode_text("a happy person")
@@ -54,6 +96,69 @@ class TestCLIPModel:
         assert embedding.shape == (512,)
 
 
+PARITY_TEXTS = [
+    "a dog running on the beach",
+    "quarterly revenue grew by twelve percent",
+    "someone writes equations on a whiteboard",
+]
+
+# Minimum cosine similarity to the fp32 torch reference
+PARITY_MIN_COSINE = {"torch-int8": 0.95, "onnx": 0.999}
+
+
+def _min_cosine(reference, candidate):
+    reference = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    candidate = candidate / np.linalg.norm(candidate, axis=1, keepdims=True)
+    return float(np.min(np.sum(reference * candidate, axis=1)))
+
+
+def _parity_frames():
+    gradient = np.linspace(0, 255, 224, dtype=np.uint8)
+    frames = np.zeros((3, 224, 224, 3), dtype=np.uint8)
+    frames[0, :, :, 0] = gradient
+    frames[1, :, :, 1] = gradient[:, None]
+    frames[2] = np.random.default_rng(0).integers(0, 255, size=(224, 224, 3))
+    return frames
+
+
+@pytest.fixture(scope="module")
+def reference_clip():
+    return CLIPEmbedder(backend="torch")
+
+
+@pytest.fixture(scope="module")
+def reference_sbert():
+    return SentenceBERTEmbedder(backend="torch")
+
+
+@pytest.mark.parametrize("backend", ["torch-int8", "onnx"])
+class TestInferenceBackendParity:
+    def test_clip_backend_matches_fp32(self, backend, reference_clip, tmp_path, monkeypatch):
+        if backend == "onnx":
+            pytest.importorskip("onnxruntime")
+            monkeypatch.setattr(settings, "ONNX_MODEL_DIR", str(tmp_path))
+        model = CLIPEmbedder(backend=backend)
+        assert model.backend == backend
+        
+        frames = _parity_frames()
+        assert _min_cosine(reference_clip.encode_frames(frames), model.encode_frames(frames)) >= PARITY_MIN_COSINE[backend]
+        
+        reference_text = np.stack([reference_clip.encode_text(t) for t in PARITY_TEXTS])
+        text = np.stack([model.encode_text(t) for t in PARITY_TEXTS])
+        assert _min_cosine(reference_text, text) >= PARITY_MIN_COSINE[backend]
+    
+    def test_sbert_backend_matches_fp32(self, backend, reference_sbert, tmp_path, monkeypatch):
+        if backend == "onnx":
+            pytest.importorskip("onnxruntime")
+            monkeypatch.setattr(settings, "ONNX_MODEL_DIR", str(tmp_path))
+        model = SentenceBERTEmbedder(backend=backend)
+        assert model.backend == backend
+        
+        assert _min_cosine(
+            reference_sbert.encode_batch(PARITY_TEXTS), model.encode_batch(PARITY_TEXTS)
+        ) >= PARITY_MIN_COSINE[backend]
+
+
 class TestWhisperModel:
     def test_transcribe(self, sample_audio_path):
         transcriber = WhisperTranscriber(model_size="tiny")
@@ -69,6 +174,18 @@ def sample_video_path():
     # TODO: Add path to test video
     return "tests/fixtures/sample.mp4"
 
+@pytest.fixture
+def silent_video_path(tmp_path):
+    """Three seconds of test pattern with no audio stream"""
+    import subprocess
+    
+    path = str(tmp_path / "silent.mp4")
+    subprocess.run(
+        ["ffmpeg", "-y", "-v", "error", "-f", "lavfi", "-i", "testsrc=size=160x120:rate=10:duration=3", path],
+        check=True
+    )
+    return path
+
 @pytest.fixture
 def sample_audio_path():
     return "tests/fixtures/sample.wav"
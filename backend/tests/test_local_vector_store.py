@@ -0,0 +1,89 @@
+import numpy as np
+
+from app.search.local_vector_store import LocalVectorStore
+
+
+def _vectors():
+    return [
+        {'id': 'a', 'values': [1.0, 0.0, 0.0], 'metadata': {'video_id': 'v1', 'type': 'visual'}},
+        {'id': 'b', 'values': [0.8, 0.6, 0.0], 'metadata': {'video_id': 'v1', 'type': 'text'}},
+        {'id': 'c', 'values': [0.0, 0.0, 2.0], 'metadata': {'video_id': 'v2', 'type': 'visual'}},
+    ]
+
+
+def test_query_returns_cosine_top_k_in_order():
+    store = LocalVectorStore()
+    store.upsert_vectors(_vectors())
+
+    matches = store.query(np.array([1.0, 0.1, 0.0]), top_k=2)
+
+    assert [m['id'] for m in matches] == ['a', 'b']
+    assert matches[0]['score'] > matches[1]['score']
+    assert matches[0]['metadata']['video_id'] == 'v1'
+
+
+def test_query_applies_metadata_filters():
+    store = LocalVectorStore()
+    store.upsert_vectors(_vectors())
+
+    visual = store.query(np.array([1.0, 0.0, 0.0]), top_k=5, filter={'type': 'visual'})
+    in_v2 = store.query(np.array([1.0, 0.0, 0.0]), top_k=5, filter={'video_id': {'$in': ['v2']}})
+
+    assert [m['id'] for m in visual] == ['a', 'c']
+    assert [m['id'] for m in in_v2] == ['c']
+
+
+def test_upsert_replaces_and_delete_removes():
+    store = LocalVectorStore()
+    store.upsert_vectors(_vectors())
+    store.upsert_vectors([{'id': 'c', 'values': [1.0, 0.0, 0.0], 'metadata': {'video_id': 'v2'}}])
+
+    assert store.query(np.array([1.0, 0.0, 0.0]), top_k=1, filter={'video_id': 'v2'})[0]['score'] > 0.99
+
+    store.delete_by_metadata({'video_id': 'v1'})
+
+    assert store.get_index_stats()['total_vector_count'] == 1
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "index.npz")
+    store = LocalVectorStore(persist_path=path)
+    store.upsert_vectors(_vectors(), namespace="tenant-1")
+    store.flush()
+
+    restored = LocalVectorStore(persist_path=path)
+
+    assert restored.get_index_stats()['namespaces'] == {'tenant-1': {'vector_count': 3}}
+    assert restored.query(np.array([0.0, 0.0, 1.0]), top_k=1, namespace="tenant-1")[0]['id'] == 'c'
+
+
+def test_repeated_id_in_one_batch_keeps_the_last():
+    store = LocalVectorStore()
+    batch = [
+        {'id': 'x', 'values': [1.0, 0.0, 0.0], 'metadata': {'n': 1}},
+        {'id': 'x', 'values': [0.0, 1.0, 0.0], 'metadata': {'n': 2}},
+    ]
+
+    assert store.upsert_vectors(batch)
+    assert store.upsert_vectors(batch)
+
+    matches = store.query(np.array([0.0, 1.0, 0.0]), top_k=5)
+    assert [(m['id'], m['metadata']['n']) for m in matches] == [('x', 2)]
+
+
+def test_writers_sharing_a_snapshot_merge_and_flush_on_demand(tmp_path):
+    path = str(tmp_path / "index.npz")
+    first = LocalVectorStore(persist_path=path, flush_interval_seconds=3600)
+    second = LocalVectorStore(persist_path=path, flush_interval_seconds=3600)
+
+    first.upsert_vectors([{'id': 'x', 'values': [1.0, 0.0, 0.0]}])
+    second.upsert_vectors([{'id': 'y', 'values': [0.0, 1.0, 0.0]}])
+    assert not (tmp_path / "index.npz").exists()
+
+    first.flush()
+    second.flush()
+
+    reloaded = LocalVectorStore(persist_path=path)
+    assert sorted(m['id'] for m in reloaded.query(np.array([1.0, 1.0, 0.0]), top_k=5)) == ['x', 'y']
+    # first picks up second's write on its next query
+    assert len(first.query(np.array([1.0, 1.0, 0.0]), top_k=5)) == 2
@@ -0,0 +1,37 @@
+import threading
+
+from app.ai.model_registry import ModelRegistry
+
+
+def test_model_loaded_once_across_threads():
+    registry = ModelRegistry()
+    loads = []
+
+    def factory():
+        loads.append(1)
+        return object()
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(registry.get("clip", factory)))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(loads) == 1
+    assert all(r is results[0] for r in results)
+
+
+def test_warmup_runs_and_stats_reported():
+    registry = ModelRegistry()
+    warmed = []
+
+    registry.get("sbert", lambda: "model", warmup=warmed.append)
+
+    assert warmed == ["model"]
+    stats = registry.stats()
+    assert stats["models"][0]["key"] == "sbert"
+    assert registry.is_loaded("sbert")
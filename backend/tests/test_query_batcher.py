@@ -0,0 +1,71 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from app.ai.query_batcher import QueryEncodeBatcher
+
+
+class RecordingEncoder:
+    """Stands in for encode_texts: one row per text, remembers batch sizes"""
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def __call__(self, texts):
+        with self.lock:
+            self.batches.append(list(texts))
+        time.sleep(self.delay)
+        return np.array([[len(text), i] for i, text in enumerate(texts)], dtype=np.float32)
+
+
+def test_concurrent_queries_share_batches_and_get_their_own_rows():
+    encoder = RecordingEncoder()
+    batcher = QueryEncodeBatcher(encoder, max_batch=8, max_wait_ms=20)
+    texts = ["q" * n for n in range(1, 25)]
+
+    try:
+        with ThreadPoolExecutor(max_workers=24) as pool:
+            results = list(pool.map(batcher.encode, texts))
+    finally:
+        batcher.stop()
+
+    assert [int(row[0]) for row in results] == [len(text) for text in texts]
+    assert max(len(batch) for batch in encoder.batches) <= 8
+    assert len(encoder.batches) < len(texts)
+
+    stats = batcher.stats()
+    assert stats["queries"] == 24
+    assert sum(int(size) * count for size, count in stats["batch_size_histogram"].items()) == 24
+
+
+def test_single_query_waits_at_most_max_wait():
+    batcher = QueryEncodeBatcher(RecordingEncoder(delay=0), max_batch=8, max_wait_ms=5)
+    try:
+        start = time.perf_counter()
+        batcher.encode("alone", timeout=1.0)
+        assert time.perf_counter() - start < 0.5
+    finally:
+        batcher.stop()
+
+    assert batcher.stats()["batch_size_histogram"] == {"1": 1}
+
+
+def test_failed_batch_fails_every_caller():
+    def broken(texts):
+        raise RuntimeError("boom")
+
+    batcher = QueryEncodeBatcher(broken, max_wait_ms=1)
+    try:
+        with pytest.raises(RuntimeError):
+            batcher.encode("query", timeout=1.0)
+    finally:
+        batcher.stop()
+
+    assert batcher.stats()["failed_batches"] == 1
+    with pytest.raises(RuntimeError):
+        batcher.encode("after stop", timeout=1.0)
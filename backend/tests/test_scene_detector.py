@@ -0,0 +1,121 @@
+import cv2
+import pytest
+import numpy as np
+from scenedetect import SceneManager, StatsManager, open_video
+from scenedetect.detectors import ContentDetector
+
+from app.workers import scene_detector
+from app.workers.scene_detector import SCORE_CACHE_SIZE, SceneDetector, _score_cache_key, scenes_from_scores
+
+
+def _scores(cuts, length=300, value=40.0):
+    scores = np.zeros(length, dtype=np.float32)
+    scores[cuts] = value
+    return scores
+
+
+def test_scenes_from_scores_respects_threshold_and_min_scene_len():
+    scores = _scores([50, 55, 200])
+
+    scenes = scenes_from_scores(scores, fps=25.0, threshold=30.0)
+
+    # Frame 55 is within min_scene_len of the cut at 50
+    assert [s["start_time"] for s in scenes] == [0.0, 2.0, 8.0]
+    assert scenes[-1]["end_time"] == 12.0
+    assert scenes_from_scores(scores, fps=25.0, threshold=45.0) == []
+
+
+def test_adaptive_detection_searches_cached_scores(tmp_path):
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"not decoded")
+    detector = SceneDetector(threshold=30.0)
+    # Soft cuts only visible below the default threshold
+    scores = _scores(list(range(20, 300, 20)), value=20.0)
+    detector._cache_scores(_score_cache_key(str(video)), (scores, 25.0))
+
+    scenes = detector.detect_scenes_adaptive(str(video))
+
+    assert len(scenes) == 15
+
+
+def test_score_cache_is_bounded_and_keyed_on_file_state(tmp_path):
+    detector = SceneDetector()
+    paths = []
+    for i in range(SCORE_CACHE_SIZE + 1):
+        path = tmp_path / f"video_{i}.mp4"
+        path.write_bytes(b"x")
+        paths.append(str(path))
+        detector._cache_scores(_score_cache_key(str(path)), (_scores([]), 25.0))
+
+    assert len(detector._score_cache) == SCORE_CACHE_SIZE
+    assert _score_cache_key(paths[0]) not in detector._score_cache
+
+    key = _score_cache_key(paths[-1])
+    (tmp_path / f"video_{SCORE_CACHE_SIZE}.mp4").write_bytes(b"rewritten")
+    assert _score_cache_key(paths[-1]) != key
+    assert _score_cache_key("https://example.com/video.mp4") is None
+
+
+def _write_video(path, frames=60, fps=10.0):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), fps, (64, 48))
+    rng = np.random.default_rng(0)
+    colour = rng.integers(0, 256, 3)
+    for i in range(frames):
+        if i % 7 == 0:
+            colour = rng.integers(0, 256, 3)
+        frame = np.empty((48, 64, 3), dtype=np.uint8)
+        frame[:] = colour
+        frame[: (i % 48) + 1, : (i % 64) + 1] = 255 - colour
+        writer.write(frame)
+    writer.release()
+
+
+def test_parallel_chunk_scores_match_a_serial_pass(tmp_path, monkeypatch):
+    video = tmp_path / "video.avi"
+    _write_video(video)
+    monkeypatch.setattr(scene_detector.settings, "SCENE_DETECTION_WORKERS", 1)
+    serial, fps = SceneDetector().compute_content_scores(str(video))
+
+    monkeypatch.setattr(scene_detector.settings, "SCENE_DETECTION_WORKERS", 2)
+    monkeypatch.setattr(scene_detector.settings, "SCENE_DETECTION_PARALLEL_MIN_SECONDS", 0.0)
+    monkeypatch.setattr(scene_detector.settings, "SCENE_DETECTION_CHUNK_SECONDS", 1.5)
+    detector = SceneDetector()
+    # Every MJPG frame is a keyframe; chunk edges fall mid-scene and on a cut
+    monkeypatch.setattr(detector, "_keyframe_times", lambda path: [i / fps for i in range(60)])
+
+    parallel = detector._compute_content_scores_parallel(str(video))
+
+    assert parallel is not None
+    assert len(serial) == 60
+    assert np.array_equal(parallel[0], serial)
+
+
+def test_cached_scoring_matches_content_detector(tmp_path, monkeypatch):
+    # 640 px wide, so the automatic 2x downscale applies; hard cuts, one
+    # inside min_scene_len of the previous (merged by the flash filter),
+    # and steady motion in between
+    path = tmp_path / "cuts.avi"
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 25.0, (640, 360))
+    rng = np.random.default_rng(1)
+    for i in range(250):
+        if i in (0, 40, 90, 100, 160, 170, 230):
+            blocks = rng.integers(0, 256, (36, 64, 3), dtype=np.uint8)
+            base = cv2.resize(blocks, (640, 360), interpolation=cv2.INTER_NEAREST)
+        writer.write(np.roll(base, i * 2, axis=1))
+    writer.release()
+    monkeypatch.setattr(scene_detector.settings, "SCENE_DETECTION_WORKERS", 1)
+
+    stats = StatsManager()
+    manager = SceneManager(stats_manager=stats)
+    manager.add_detector(ContentDetector())
+    manager.detect_scenes(video=open_video(str(path)))
+    library_scores = [stats.get_metrics(i, ["content_val"])[0] or 0.0 for i in range(250)]
+
+    scores, fps = SceneDetector().compute_content_scores(str(path))
+
+    np.testing.assert_allclose(scores, library_scores, atol=1e-4)
+    # At 15 the motion alone stays above threshold, so every cut is merged away
+    for threshold in (15.0, 20.0, 30.0, 45.0):
+        expected = SceneDetector(threshold=threshold).detect_scenes(str(path))
+        assert scenes_from_scores(scores, fps, threshold) == pytest.approx(expected)
+    assert len(expected) == 5
@@ -0,0 +1,52 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base, Clip, User, Video
+from app.models.search_query import ClipInteraction, ClipViewDaily, SearchQuery
+from app.repositories.search_repository import SearchRepository
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    event.listen(engine, "connect", lambda conn, record: conn.execute("PRAGMA foreign_keys=ON"))
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        User(id="user-1", email="demo@clipmind.com", hashed_password="x"),
+        Video(id="video-1", user_id="user-1", filename="a.mp4", s3_key="videos/a.mp4"),
+        Clip(id="clip-1", video_id="video-1", start_time=0.0, end_time=5.0),
+        SearchQuery(id="search-saved", user_id="user-1", query_text="dog"),
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+
+def _view(interaction_id, search_query_id):
+    return {
+        'id': interaction_id,
+        'user_id': "user-1",
+        'clip_id': "clip-1",
+        'search_query_id': search_query_id,
+        'action': "viewed",
+        'duration_seconds': None,
+        'created_at': datetime.utcnow(),
+    }
+
+
+def test_interactions_for_unpersisted_searches_keep_the_batch(db):
+    # "search-pending" is still in the analytics write-behind buffer
+    saved = SearchRepository(db).save_interactions_batch([
+        _view("i-1", "search-saved"),
+        _view("i-2", "search-pending"),
+        _view("i-3", None),
+    ])
+
+    assert saved == 3
+    links = {row.id: row.search_query_id for row in db.query(ClipInteraction).all()}
+    assert links == {"i-1": "search-saved", "i-2": None, "i-3": None}
+    assert db.query(ClipViewDaily).one().view_count == 3
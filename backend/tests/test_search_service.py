@@ -0,0 +1,56 @@
+import asyncio
+import threading
+import time
+
+import numpy as np
+
+from app.ai.embedding_cache import QueryEmbeddingCache
+from app.ai.query_batcher import QueryEncodeBatcher
+from app.services import search_service
+
+
+class RecordingEncoder:
+    def __init__(self):
+        self.batch_sizes = []
+        self.lock = threading.Lock()
+
+    def __call__(self, texts):
+        with self.lock:
+            self.batch_sizes.append(len(texts))
+        time.sleep(0.02)
+        return np.ones((len(texts), 4), dtype=np.float32)
+
+
+class EmptyStore:
+    def query(self, query_vector, top_k=10, filter=None, namespace=""):
+        return []
+
+
+def test_concurrent_searches_share_encoder_batches(monkeypatch):
+    clip_encoder, text_encoder = RecordingEncoder(), RecordingEncoder()
+    clip_batcher = QueryEncodeBatcher(clip_encoder, max_batch=16, max_wait_ms=50)
+    text_batcher = QueryEncodeBatcher(text_encoder, max_batch=16, max_wait_ms=50)
+    cache = QueryEmbeddingCache()
+    monkeypatch.setattr(search_service.settings, "QUERY_BATCH_ENABLED", True)
+    monkeypatch.setattr(search_service, "get_clip_query_batcher", lambda: clip_batcher)
+    monkeypatch.setattr(search_service, "get_text_query_batcher", lambda: text_batcher)
+    monkeypatch.setattr(search_service, "get_query_embedding_cache", lambda: cache)
+    monkeypatch.setattr(search_service, "get_vector_store", lambda modality: EmptyStore())
+    monkeypatch.setattr(search_service, "clip_model_id", lambda: "clip:test")
+    monkeypatch.setattr(search_service, "text_model_id", lambda: "sbert:test")
+    service = search_service.SearchService()
+
+    async def run():
+        return await asyncio.gather(*(service.search(f"query {i}", "user-1") for i in range(6)))
+
+    try:
+        responses = asyncio.run(run())
+    finally:
+        clip_batcher.stop()
+        text_batcher.stop()
+
+    assert [response.total_results for response in responses] == [0] * 6
+    # Encoding ran off the event loop, so requests met in shared batches
+    assert sum(clip_encoder.batch_sizes) == 6
+    assert max(clip_encoder.batch_sizes) > 1
+    assert max(text_encoder.batch_sizes) > 1
@@ -0,0 +1,108 @@
+import asyncio
+import importlib
+import sys
+import threading
+import types
+
+
+def _stub_if_missing(name, **attrs):
+    """Register a stand-in module when the real one cannot be imported here"""
+    try:
+        importlib.import_module(name)
+    except ImportError:
+        module = types.ModuleType(name)
+        module.__dict__.update(attrs)
+        sys.modules[name] = module
+
+
+# The service imports S3 storage and a Postgres session at module level; both
+# are replaced per test, so only their names need to exist
+_stub_if_missing("app.storage", __path__=[])
+_stub_if_missing("app.storage.s3_service", S3Service=object)
+_stub_if_missing("app.db.session", get_db=None, SessionLocal=None)
+
+from app.services import search_service_complete  # noqa: E402
+from app.schemas.search_complete import SearchResponse  # noqa: E402
+
+
+def _service(monkeypatch, visual_branch, text_branch, timeout_ms=100, workers=8):
+    monkeypatch.setattr(search_service_complete.settings, "SEARCH_BRANCH_TIMEOUT_MS", timeout_ms)
+    monkeypatch.setattr(search_service_complete.settings, "SEARCH_EXECUTOR_WORKERS", workers)
+    monkeypatch.setattr(search_service_complete, "record_search", lambda **kwargs: True)
+    service = search_service_complete.SearchService()
+    monkeypatch.setattr(service, "_visual_branch", visual_branch)
+    monkeypatch.setattr(service, "_text_branch", text_branch)
+
+    async def no_enrichment(results, user_id):
+        return []
+
+    monkeypatch.setattr(service, "_enrich_results", no_enrichment)
+    return service
+
+
+def test_timed_out_branch_is_reported_in_the_response(monkeypatch):
+    release = threading.Event()
+    service = _service(
+        monkeypatch,
+        visual_branch=lambda query, top_k, flt: release.wait(5.0) and [],
+        text_branch=lambda query, top_k, flt: [],
+    )
+
+    try:
+        response = asyncio.run(service.search("dog", "user-1"))
+    finally:
+        release.set()
+
+    assert isinstance(response, SearchResponse)
+    assert response.degraded_modalities == ["visual"]
+    assert response.model_dump()["degraded_modalities"] == ["visual"]
+    assert response.search_id
+
+
+def test_branches_are_rejected_while_stragglers_hold_every_worker(monkeypatch):
+    release = threading.Event()
+    slow = lambda query, top_k, flt: release.wait(5.0) and []
+    service = _service(monkeypatch, visual_branch=slow, text_branch=slow, workers=2)
+
+    async def run():
+        first = await asyncio.gather(
+            service._run_branch("visual", service._visual_branch, "q", 10, {}),
+            service._run_branch("text", service._text_branch, "q", 10, {}),
+        )
+        # Both timed out but their threads are still running
+        assert service._branches_in_flight == 2
+        second = await service._run_branch("visual", lambda *args: [], "q", 10, {})
+        return first, second
+
+    try:
+        first, second = asyncio.run(run())
+    finally:
+        release.set()
+
+    assert first == [None, None]
+    assert second is None
+
+
+def test_enrichment_runs_off_the_event_loop(monkeypatch):
+    service = search_service_complete.SearchService()
+    threads = []
+
+    class Repository:
+        def __init__(self, db):
+            pass
+
+        def get_clips_with_videos(self, clip_ids, user_id=None):
+            threads.append(threading.current_thread())
+            return {}
+
+    class Session:
+        def close(self):
+            pass
+
+    monkeypatch.setattr(search_service_complete, "SearchRepository", Repository)
+    monkeypatch.setattr(search_service_complete, "get_db", lambda: iter([Session()]))
+
+    clips = asyncio.run(service._enrich_results([{"id": "clip-1_visual_0", "score": 0.9}], "user-1"))
+
+    assert clips == []
+    assert threads and threads[0] is not threading.main_thread()
@@ -0,0 +1,53 @@
+import os
+
+import numpy as np
+
+from app.ai.transcript_cache import TranscriptCache, audio_cache_key
+
+
+def test_key_depends_on_samples_and_options():
+    audio = np.linspace(-1, 1, 16000, dtype=np.float32)
+
+    key = audio_cache_key(audio, model="base", language=None)
+
+    assert key == audio_cache_key(audio.copy(), language=None, model="base")
+    assert key != audio_cache_key(audio, model="small", language=None)
+    assert key != audio_cache_key(audio[::-1], model="base", language=None)
+
+
+def test_round_trip_and_hit_counters(tmp_path):
+    cache = TranscriptCache(str(tmp_path))
+    result = {
+        "text": " hello",
+        "segments": [{"id": 0, "start": np.float32(0.5), "end": 1.0, "text": " hello"}],
+        "language": "en",
+    }
+
+    assert cache.get("ab12") is None
+    cache.put("ab12", result)
+    cached = cache.get("ab12")
+
+    assert cached["segments"][0]["start"] == 0.5
+    assert cached["language"] == "en"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_sweep_evicts_least_recently_used_entries(tmp_path):
+    cache = TranscriptCache(str(tmp_path))
+    result = {"text": "x" * 100, "segments": [], "language": "en"}
+    for i, key in enumerate(["aa01", "bb02", "cc03"]):
+        cache.put(key, result)
+        path = cache._path(key)
+        os.utime(path, (1000 + i, 1000 + i))
+    entry_size = os.path.getsize(cache._path("aa01"))
+
+    # A hit makes the oldest entry the most recently used
+    assert cache.get("aa01") is not None
+    cache.max_bytes = 2 * entry_size
+    cache.put("dd04", result)
+
+    assert cache.get("bb02") is None
+    assert cache.get("cc03") is None
+    assert cache.get("aa01") is not None
+    assert cache.get("dd04") is not None
+    assert cache.evictions == 2
@@ -0,0 +1,69 @@
+from app.services.write_behind import WriteBehindBuffer
+
+
+def test_flushes_in_batches_on_stop():
+    batches = []
+    buffer = WriteBehindBuffer("test", batches.append, batch_size=3, flush_interval=0.05)
+
+    for i in range(7):
+        assert buffer.submit(i)
+    buffer.stop()
+
+    assert sorted(item for batch in batches for item in batch) == list(range(7))
+    assert all(len(batch) <= 3 for batch in batches)
+    assert buffer.stats()["flushed"] == 7
+
+
+def test_drops_when_full():
+    buffer = WriteBehindBuffer("test", lambda batch: None, max_size=2)
+    # Keep the flush thread from draining so the queue fills up
+    buffer._thread = object()
+
+    assert buffer.submit(1)
+    assert buffer.submit(2)
+    assert not buffer.submit(3)
+    assert buffer.stats()["dropped"] == 1
+
+
+def test_failed_flush_is_counted():
+    def fail(batch):
+        raise RuntimeError("db down")
+
+    buffer = WriteBehindBuffer("test", fail)
+    buffer._thread = object()
+    buffer.submit(1)
+
+    buffer.flush()
+
+    stats = buffer.stats()
+    assert stats["flush_failures"] == 1
+    assert stats["failed_items"] == 1
+    assert stats["flushed"] == 0
+
+
+def test_failed_flush_logs_a_summary_without_payloads(caplog):
+    def fail(batch):
+        raise RuntimeError("db down")
+
+    buffer = WriteBehindBuffer("test", fail)
+    buffer._thread = object()
+    for i in range(3):
+        buffer.submit({"user_id": "user-1", "query_text": f"private query {i}"})
+
+    buffer.flush()
+
+    assert len(caplog.records) == 1
+    assert "dropped 3 items: db down" in caplog.text
+    assert "private query" not in caplog.text
+
+
+def test_submit_after_stop_is_rejected():
+    batches = []
+    buffer = WriteBehindBuffer("test", batches.append, flush_interval=0.05)
+    buffer.submit(1)
+    buffer.stop()
+
+    assert not buffer.submit(2)
+    assert buffer._thread is None
+    assert [item for batch in batches for item in batch] == [1]
+    assert buffer.stats()["dropped"] == 1